@@ -1,8 +1,8 @@
 from logging.config import fileConfig
+import asyncio
 import os
 from dotenv import load_dotenv
 
-from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 
 from alembic import context
@@ -15,15 +15,16 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from app.models.base import Base
-from app.models import user, mechanic, car, service, appointment, document
+from app.models import user, mechanic, car, service, appointment, document, login_activity
+from app.dependencies.engine import async_url, build_engine
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
 
-# Get database URL from environment variable for Alembic (sync version)
-alembic_database_url = os.getenv("ALEMBIC_DATABASE_URL")
-config.set_main_option("sqlalchemy.url", alembic_database_url)
+# Same database as the app; ALEMBIC_DATABASE_URL can still override it
+alembic_database_url = os.getenv("ALEMBIC_DATABASE_URL") or os.getenv("DATABASE_URL")
+config.set_main_option("sqlalchemy.url", async_url(alembic_database_url).render_as_string(hide_password=False))
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
@@ -64,6 +65,29 @@ def run_migrations_offline() -> None:
         context.run_migrations()
 
 
+def do_run_migrations(connection) -> None:
+    context.configure(
+        connection=connection, target_metadata=target_metadata
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_async_migrations() -> None:
+    """Runs migrations on an engine from the app's engine factory"""
+    connectable = build_engine(
+        config.get_main_option("sqlalchemy.url"),
+        migrations=True,
+        poolclass=pool.NullPool,
+    )
+
+    async with connectable.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+
+    await connectable.dispose()
+
+
 def run_migrations_online() -> None:
     """Run migrations in 'online' mode.
 
@@ -71,31 +95,7 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
-    # Get database URL
-    url = config.get_main_option("sqlalchemy.url")
-    
-    # Create engine with appropriate settings for SQLite
-    if "sqlite" in url:
-        connectable = engine_from_config(
-            config.get_section(config.config_ini_section, {}),
-            prefix="sqlalchemy.",
-            poolclass=pool.NullPool,
-            connect_args={"check_same_thread": False}
-        )
-    else:
-        connectable = engine_from_config(
-            config.get_section(config.config_ini_section, {}),
-            prefix="sqlalchemy.",
-            poolclass=pool.NullPool,
-        )
-
-    with connectable.connect() as connection:
-        context.configure(
-            connection=connection, target_metadata=target_metadata
-        )
-
-        with context.begin_transaction():
-            context.run_migrations()
+    asyncio.run(run_async_migrations())
 
 
 if context.is_offline_mode():
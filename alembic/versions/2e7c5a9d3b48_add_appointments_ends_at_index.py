@@ -0,0 +1,27 @@
+"""Add an index on appointments.ends_at for the booking lookback
+
+Revision ID: 2e7c5a9d3b48
+Revises: 9b4f2c8e6a31
+Create Date: 2026-10-17 22:14:36.508127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2e7c5a9d3b48'
+down_revision: Union[str, Sequence[str], None] = '9b4f2c8e6a31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_appointments_ends_at'), 'appointments', ['ends_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_appointments_ends_at'), table_name='appointments')
@@ -0,0 +1,42 @@
+"""Add users.last_login and login_activity table
+
+Revision ID: 3f9a1c7e2b54
+Revises: cee61dd40002
+Create Date: 2026-10-17 19:40:12.318406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a1c7e2b54'
+down_revision: Union[str, Sequence[str], None] = 'cee61dd40002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('last_login', sa.DateTime(), nullable=True))
+    op.create_table('login_activity',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('ip_address', sa.String(length=45), nullable=True),
+    sa.Column('logged_in_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_login_activity_id'), 'login_activity', ['id'], unique=False)
+    op.create_index(op.f('ix_login_activity_user_id'), 'login_activity', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_login_activity_user_id'), table_name='login_activity')
+    op.drop_index(op.f('ix_login_activity_id'), table_name='login_activity')
+    op.drop_table('login_activity')
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('last_login')
@@ -0,0 +1,52 @@
+"""Add appointments.ends_at for overlap checks
+
+Revision ID: 5c7e9a2d4b16
+Revises: 8d2e4b6a1f03
+Create Date: 2026-10-17 20:21:08.415926
+
+"""
+from datetime import timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c7e9a2d4b16'
+down_revision: Union[str, Sequence[str], None] = '8d2e4b6a1f03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('appointments') as batch_op:
+        batch_op.add_column(sa.Column('ends_at', sa.DateTime(), nullable=True))
+
+    # Backfill from each booking's service duration; done in Python to stay dialect-neutral
+    bind = op.get_bind()
+    appointments = sa.table(
+        'appointments',
+        sa.column('id', sa.Integer), sa.column('appointment_date', sa.DateTime), sa.column('ends_at', sa.DateTime),
+        sa.column('service_id', sa.Integer),
+    )
+    services = sa.table('services', sa.column('id', sa.Integer), sa.column('duration_minutes', sa.Integer))
+    rows = bind.execute(
+        sa.select(appointments.c.id, appointments.c.appointment_date, services.c.duration_minutes)
+        .select_from(appointments.outerjoin(services, services.c.id == appointments.c.service_id))
+    ).all()
+    if rows:
+        bind.execute(
+            appointments.update().where(appointments.c.id == sa.bindparam('appointment_id')),
+            [
+                {'appointment_id': id_, 'ends_at': date + timedelta(minutes=minutes or 60)}
+                for id_, date, minutes in rows
+            ],
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('appointments') as batch_op:
+        batch_op.drop_column('ends_at')
@@ -0,0 +1,39 @@
+"""Add indexes for hot appointment, car and document queries
+
+Revision ID: 8d2e4b6a1f03
+Revises: 3f9a1c7e2b54
+Create Date: 2026-10-17 20:05:41.927310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2e4b6a1f03'
+down_revision: Union[str, Sequence[str], None] = '3f9a1c7e2b54'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_appointments_user_id_appointment_date', 'appointments', ['user_id', 'appointment_date'], unique=False)
+    op.create_index('ix_appointments_mechanic_id_appointment_date', 'appointments', ['mechanic_id', 'appointment_date'], unique=False)
+    op.create_index('ix_appointments_status_appointment_date', 'appointments', ['status', 'appointment_date'], unique=False)
+    op.create_index(op.f('ix_appointments_car_id'), 'appointments', ['car_id'], unique=False)
+    op.create_index(op.f('ix_appointments_service_id'), 'appointments', ['service_id'], unique=False)
+    op.create_index(op.f('ix_cars_user_id'), 'cars', ['user_id'], unique=False)
+    op.create_index(op.f('ix_documents_mechanic_id'), 'documents', ['mechanic_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_documents_mechanic_id'), table_name='documents')
+    op.drop_index(op.f('ix_cars_user_id'), table_name='cars')
+    op.drop_index(op.f('ix_appointments_service_id'), table_name='appointments')
+    op.drop_index(op.f('ix_appointments_car_id'), table_name='appointments')
+    op.drop_index('ix_appointments_status_appointment_date', table_name='appointments')
+    op.drop_index('ix_appointments_mechanic_id_appointment_date', table_name='appointments')
+    op.drop_index('ix_appointments_user_id_appointment_date', table_name='appointments')
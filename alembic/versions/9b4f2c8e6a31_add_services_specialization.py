@@ -0,0 +1,29 @@
+"""Add services.specialization for mechanic auto-assignment
+
+Revision ID: 9b4f2c8e6a31
+Revises: 5c7e9a2d4b16
+Create Date: 2026-10-17 21:05:42.903117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b4f2c8e6a31'
+down_revision: Union[str, Sequence[str], None] = '5c7e9a2d4b16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('services', sa.Column('specialization', sa.String(length=255), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('services') as batch_op:
+        batch_op.drop_column('specialization')
@@ -1,10 +1,24 @@
 import os
+from datetime import time
 from pydantic_settings import BaseSettings
 from typing import Optional, List, Any
 
 class DatabaseSettings(BaseSettings):
     DATABASE_URL: str
-    DB_ECHO: bool = True
+    DATABASE_READ_URL: Optional[str] = None
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 0  # PostgreSQL/MySQL only, 0 disables
+    DB_STATEMENT_CACHE_SIZE: int = 256
+    DB_SYNCHRONOUS: str = "NORMAL"
+    DB_BUSY_TIMEOUT_MS: int = 5000
+    DB_CACHE_SIZE_KB: int = 20000
+    DB_MMAP_SIZE: int = 268435456
+    DB_READ_POOL_SIZE: int = 5
 
 class EmailSettings(BaseSettings):
     SMTP_SERVER: Optional[str] = None
@@ -27,14 +41,85 @@ class RedisSettings(BaseSettings):
     REDIS_DB: int = 0
     REDIS_URL: Optional[str] = None
     REDIS_USE_SSL: bool = False
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_SOCKET_TIMEOUT: float = 1.0
+    REDIS_CONNECT_TIMEOUT: float = 1.0
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30
+    REDIS_CALL_TIMEOUT: float = 0.1
+    REDIS_BREAKER_FAILURES: int = 5
+    REDIS_BREAKER_RESET_TIMEOUT: float = 5.0
     class Config:
         env_file = ".env"
 
-class AppSettings(DatabaseSettings, RedisSettings, FrontendSettings, EmailSettings):
+class CacheSettings(BaseSettings):
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_LOCAL_TTL: int = 30
+    PRINCIPAL_CACHE_REDIS_TTL: int = 300
+    JWT_CACHE_ENABLED: bool = True
+    JWT_CACHE_SIZE: int = 10000
+
+class RevocationSettings(BaseSettings):
+    REVOCATION_BLOOM_CAPACITY: int = 100000
+    REVOCATION_BLOOM_ERROR_RATE: float = 0.001
+    REVOCATION_SYNC_INTERVAL: float = 1.0
+    REVOCATION_REBUILD_INTERVAL: float = 600.0
+
+class LoginActivitySettings(BaseSettings):
+    LOGIN_ACTIVITY_FLUSH_INTERVAL: float = 5.0
+    LOGIN_ACTIVITY_FLUSH_SIZE: int = 500
+
+class ThrottleSettings(BaseSettings):
+    THROTTLE_REDIS_TIMEOUT: float = 0.05
+    THROTTLE_LOGIN_LIMIT_PER_IP: int = 20
+    THROTTLE_LOGIN_LIMIT_PER_EMAIL: int = 5
+    THROTTLE_LOGIN_WINDOW: int = 60
+    THROTTLE_RECOVERY_LIMIT_PER_IP: int = 5
+    THROTTLE_RECOVERY_LIMIT_PER_EMAIL: int = 3
+    THROTTLE_RECOVERY_WINDOW: int = 900
+
+class HashingSettings(BaseSettings):
+    HASH_POOL_KIND: str = "thread"
+    HASH_POOL_SIZE: int = 4
+    HASH_POOL_QUEUE_SIZE: int = 64
+
+class GroupCommitSettings(BaseSettings):
+    GROUP_COMMIT_ENABLED: bool = False
+    GROUP_COMMIT_MAX_BATCH: int = 256
+    GROUP_COMMIT_MAX_DELAY_MS: float = 1.0
+
+class PaginationSettings(BaseSettings):
+    PAGE_SIZE_DEFAULT: int = 50
+    PAGE_SIZE_MAX: int = 200
+
+class ExportSettings(BaseSettings):
+    EXPORT_BATCH_SIZE: int = 1000  # rows fetched from the server-side cursor per chunk
+    EXPORT_GZIP_LEVEL: int = 6
+
+class SchedulingSettings(BaseSettings):
+    WORKDAY_START: time = time(9, 0)
+    WORKDAY_END: time = time(18, 0)
+    WORKING_DAYS: str = "0,1,2,3,4"  # weekday numbers, Monday is 0
+    SLOT_STEP_MINUTES: int = 30
+    AVAILABILITY_MAX_DAYS: int = 31
+    SLOT_HOLD_TTL_SECONDS: int = 600  # how long a slot stays reserved for a customer during checkout
+    SLOT_HOLD_MAX_PER_USER: int = 3
+    AUTO_ASSIGN_INTERVAL_MINUTES: int = 0  # background auto-assignment of mechanics; 0 disables it
+    AUTO_ASSIGN_HORIZON_HOURS: int = 48  # how far ahead the background run looks for unassigned bookings
+
+class TimingSettings(BaseSettings):
+    SERVER_TIMING_ENABLED: bool = True
+    SLOW_REQUEST_THRESHOLD_MS: float = 0  # 0 disables the slow request log
+    SLOW_QUERY_THRESHOLD_MS: float = 100  # 0 disables the slow query log
+    N_PLUS_ONE_THRESHOLD: int = 10  # same statement shape this many times in one request; 0 disables
+
+class AppSettings(DatabaseSettings, RedisSettings, CacheSettings, RevocationSettings, HashingSettings, ThrottleSettings, LoginActivitySettings, GroupCommitSettings, PaginationSettings, ExportSettings, SchedulingSettings, TimingSettings, FrontendSettings, EmailSettings):
     ALLOWED_ORIGINS: str = "*"
     CORS_ALLOW_ALL: bool = True
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
+    JWT_KEYS_DIR: Optional[str] = None
+    JWT_ACTIVE_KID: Optional[str] = None
+    JWKS_MAX_AGE: int = 300
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     RESET_TOKEN_EXPIRE_MINUTES: int = 30
@@ -1,22 +1,100 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Optional
+
 import redis.asyncio as aioredis
 
 from app.config import config
+from app.utils.metrics import metrics
+from app.utils.timing import timed
+
+logger = logging.getLogger("app")
+
+
+class RedisUnavailable(Exception):
+    """Redis call failed, timed out or was short-circuited by the breaker"""
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive failures and lets a single
+    probe through every `reset_timeout` seconds until one succeeds."""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._set_state(self.CLOSED)
+
+    def _set_state(self, state: str):
+        if state != self.state:
+            logger.warning(f"Redis circuit breaker {self.state} -> {state}")
+        self.state = state
+        metrics.set_gauge("redis.circuit_open", {self.CLOSED: 0, self.HALF_OPEN: 0.5, self.OPEN: 1}[state])
+
+    def allow(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self._set_state(self.HALF_OPEN)
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        if self.state != self.CLOSED:
+            self._set_state(self.CLOSED)
+
+    def record_failure(self):
+        self.failures += 1
+        metrics.inc("redis.failures")
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self._set_state(self.OPEN)
+
 
 class RedisClient:
     """Менеджер для роботи з Redis у FastAPI"""
 
     def __init__(self):
         self.redis = None
+        self.pool = None
+        self.breaker = CircuitBreaker(
+            failure_threshold=config.REDIS_BREAKER_FAILURES,
+            reset_timeout=config.REDIS_BREAKER_RESET_TIMEOUT,
+        )
+
+    @staticmethod
+    def _url() -> str:
+        url = config.REDIS_URL
+        if config.REDIS_USE_SSL and url.startswith("redis://"):
+            url = "rediss://" + url[len("redis://"):]
+        return url
 
     async def init_redis(self):
-        """Ініціалізація Redis-клієнта (тільки один екземпляр)"""
+        """Ініціалізація Redis-клієнта з пулом з'єднань (тільки один екземпляр)"""
         if self.redis is None:
-            self.redis = await aioredis.from_url(
-                f"redis://{config.REDIS_HOST}:{config.REDIS_PORT}",
-                password=config.REDIS_PASSWORD,
-                db=0,
+            url = self._url()
+            if url.startswith("fakeredis://"):
+                # In-memory stand-in for tests and local runs without a Redis server
+                import fakeredis
+
+                self.redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+                return self.redis
+            self.pool = aioredis.ConnectionPool.from_url(
+                url,
+                max_connections=config.REDIS_MAX_CONNECTIONS,
+                socket_timeout=config.REDIS_SOCKET_TIMEOUT,
+                socket_connect_timeout=config.REDIS_CONNECT_TIMEOUT,
+                health_check_interval=config.REDIS_HEALTH_CHECK_INTERVAL,
                 decode_responses=True,
             )
+            self.redis = aioredis.Redis(connection_pool=self.pool)
         return self.redis
 
     async def get_redis(self):
@@ -25,10 +103,40 @@ class RedisClient:
             await self.init_redis()
         return self.redis
 
+    async def run(self, call: Callable[[aioredis.Redis], Awaitable], timeout: Optional[float] = None):
+        """Виконує виклик Redis через circuit breaker з жорстким тайм-аутом.
+
+        Raises RedisUnavailable when the breaker is open or the call fails, so
+        callers can fall back to process-local state instead of hanging.
+        """
+        if not self.breaker.allow():
+            metrics.inc("redis.short_circuited")
+            raise RedisUnavailable("circuit open")
+        redis = await self.get_redis()
+        try:
+            with timed("redis"):
+                result = await asyncio.wait_for(call(redis), timeout=timeout or config.REDIS_CALL_TIMEOUT)
+        except (aioredis.RedisError, OSError, asyncio.TimeoutError) as e:
+            self.breaker.record_failure()
+            raise RedisUnavailable(repr(e)) from e
+        self.breaker.record_success()
+        return result
+
+    @asynccontextmanager
+    async def pipeline(self, transaction: bool = False):
+        """Збирає кілька команд і відправляє їх одним запитом при виході з блоку"""
+        redis = await self.get_redis()
+        async with redis.pipeline(transaction=transaction) as pipe:
+            yield pipe
+            await self.run(lambda _: pipe.execute())
+
     async def close_redis(self):
         """Закриває підключення до Redis перед виходом"""
         if self.redis:
-            await self.redis.close()
+            await self.redis.aclose()
             self.redis = None
+        if self.pool:
+            await self.pool.disconnect()
+            self.pool = None
 
 redis_client = RedisClient()
@@ -1,44 +1,55 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
+from fastapi import Request
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-import os
+from sqlalchemy.ext.asyncio import AsyncSession
 from dotenv import load_dotenv
 
+from app.config import config
+from app.dependencies.engine import BEGIN_IMMEDIATE, build_engine, build_read_engine
+
 # Load environment variables
 load_dotenv()
 
-# Get database URL from environment variable
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./car_service.db")
+# Database URL from settings; any SQLAlchemy async URL works, SQLite is the default
+DATABASE_URL = config.DATABASE_URL
 
-# Ensure we're using SQLite
-if not DATABASE_URL.startswith("sqlite"):
-    DATABASE_URL = "sqlite+aiosqlite:///./car_service.db"
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
 
-# Create async engine
-engine = create_async_engine(
-    DATABASE_URL,
-    echo=os.getenv("DB_ECHO", "True").lower() == "true",  # Set to False in production
-    connect_args={"check_same_thread": False}
-)
+# Writer engine: on SQLite, WAL lets readers proceed while a write transaction is open
+engine = build_engine(DATABASE_URL)
+
+# Read-only pool for GET requests so readers never queue behind the writer
+read_engine = build_read_engine(DATABASE_URL, config.DATABASE_READ_URL, writer=engine)
 
-# Create session factory
+# Create session factories
 AsyncSessionLocal = sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )
+ReadSessionLocal = sessionmaker(
+    read_engine, class_=AsyncSession, expire_on_commit=False, autoflush=False
+)
 
 # Import Base from models
 from app.models.base import Base
 
 # Dependency to get database session
-async def get_db():
-    async with AsyncSessionLocal() as session:
+async def get_db(request: Request):
+    """Read-only session for GET/HEAD/OPTIONS, a writer session otherwise"""
+    session_factory = ReadSessionLocal if request.method in READ_METHODS else AsyncSessionLocal
+    async with session_factory() as session:
         try:
             yield session
         finally:
             await session.close()
 
 
+async def begin_write(session: AsyncSession):
+    """Starts the session's transaction holding the write lock (SQLite; a plain BEGIN elsewhere)"""
+    if session.in_transaction():
+        # Reads done so far ran in a deferred transaction; the write gets its own
+        await session.commit()
+    await session.connection(execution_options={BEGIN_IMMEDIATE: True})
+
+
 async def init_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
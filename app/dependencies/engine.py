@@ -0,0 +1,147 @@
+import os
+from typing import Optional
+
+from sqlalchemy import event, pool
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.config import config
+from app.utils.timing import instrument_engine
+
+# Async drivers used when a plain (sync) URL such as ALEMBIC_DATABASE_URL is given
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+}
+
+# Execution option for transactions that read and then write: on SQLite they take
+# the write lock at BEGIN, since a deferred transaction fails with "database is
+# locked" if another writer commits between its first read and its first write
+BEGIN_IMMEDIATE = "sqlite_begin_immediate"
+
+
+def async_url(url: str | URL) -> URL:
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.drivername)
+    return parsed.set(drivername=driver) if driver else parsed
+
+
+def _is_memory_sqlite(url: URL) -> bool:
+    return url.get_backend_name() == "sqlite" and (not url.database or url.database == ":memory:")
+
+
+def sqlite_read_only_url(url: str | URL) -> Optional[URL]:
+    """The same SQLite file opened with mode=ro, or None for in-memory databases"""
+    parsed = make_url(url)
+    if _is_memory_sqlite(parsed) or parsed.database.startswith("file:"):
+        return None
+    path = os.path.abspath(parsed.database)
+    return parsed.set(database=f"file:{path}", query={**parsed.query, "mode": "ro", "uri": "true"})
+
+
+def _apply_sqlite_pragmas(dbapi_connection, read_only: bool, migrations: bool):
+    """Per-connection SQLite settings; journal_mode is persistent and set by the writer"""
+    cursor = dbapi_connection.cursor()
+    if not read_only:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={config.DB_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={config.DB_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA cache_size=-{config.DB_CACHE_SIZE_KB}")
+    cursor.execute(f"PRAGMA mmap_size={config.DB_MMAP_SIZE}")
+    # Batch migrations copy and drop tables, which must not fire ON DELETE actions
+    cursor.execute(f"PRAGMA foreign_keys={'OFF' if migrations else 'ON'}")
+    if read_only:
+        cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
+
+
+def _sqlite_options(url: URL, read_only: bool, pool_size: Optional[int]) -> tuple[URL, dict]:
+    options = {"connect_args": {"check_same_thread": False, "cached_statements": config.DB_STATEMENT_CACHE_SIZE}}
+    if not _is_memory_sqlite(url):
+        options["pool_size"] = pool_size or (config.DB_READ_POOL_SIZE if read_only else config.DB_POOL_SIZE)
+        options["max_overflow"] = config.DB_MAX_OVERFLOW
+        options["pool_timeout"] = config.DB_POOL_TIMEOUT
+    return url, options
+
+
+def _server_options(url: URL, pool_size: Optional[int]) -> tuple[URL, dict]:
+    connect_args: dict = {}
+    backend, driver = url.get_backend_name(), url.get_driver_name()
+    timeout_ms = config.DB_STATEMENT_TIMEOUT_MS
+    if backend == "postgresql" and driver == "asyncpg":
+        url = url.update_query_dict({"prepared_statement_cache_size": str(config.DB_STATEMENT_CACHE_SIZE)})
+        if timeout_ms:
+            connect_args["server_settings"] = {"statement_timeout": str(timeout_ms)}
+    elif backend == "postgresql" and timeout_ms:
+        connect_args["options"] = f"-c statement_timeout={timeout_ms}"
+    elif backend == "mysql" and timeout_ms:
+        connect_args["init_command"] = f"SET SESSION max_execution_time={timeout_ms}"
+
+    return url, {
+        "connect_args": connect_args,
+        "pool_size": pool_size or config.DB_POOL_SIZE,
+        "max_overflow": config.DB_MAX_OVERFLOW,
+        "pool_timeout": config.DB_POOL_TIMEOUT,
+        "pool_recycle": config.DB_POOL_RECYCLE,
+        "pool_pre_ping": config.DB_POOL_PRE_PING,
+    }
+
+
+def build_engine(
+    url: str | URL,
+    *,
+    read_only: bool = False,
+    migrations: bool = False,
+    pool_size: Optional[int] = None,
+    **kwargs,
+) -> AsyncEngine:
+    """Creates an async engine for any DATABASE_URL with the configured pool profile.
+
+    SQLite gets the WAL/pragmas profile on every connection; server databases
+    get pool sizing, recycling, pre-ping and a statement timeout. Migrations
+    and scripts pass `poolclass=pool.NullPool` through `kwargs`.
+    """
+    parsed = async_url(url)
+    sqlite = parsed.get_backend_name() == "sqlite"
+    if sqlite:
+        parsed, options = _sqlite_options(parsed, read_only, pool_size)
+    else:
+        parsed, options = _server_options(parsed, pool_size)
+    if kwargs.get("poolclass") is pool.NullPool:
+        for key in ("pool_size", "max_overflow", "pool_timeout"):
+            options.pop(key, None)
+    options.update(kwargs)
+
+    engine = create_async_engine(parsed, echo=config.DB_ECHO and not migrations, **options)
+
+    if sqlite:
+        @event.listens_for(engine.sync_engine, "connect")
+        def on_connect(dbapi_connection, connection_record):
+            _apply_sqlite_pragmas(dbapi_connection, read_only, migrations)
+            if not read_only and not migrations:
+                # Let SQLAlchemy emit BEGIN itself; pysqlite's implicit BEGIN breaks SAVEPOINTs
+                dbapi_connection.isolation_level = None
+
+        if not read_only and not migrations:
+            @event.listens_for(engine.sync_engine, "begin")
+            def on_begin(connection):
+                immediate = connection.get_execution_options().get(BEGIN_IMMEDIATE)
+                connection.exec_driver_sql("BEGIN IMMEDIATE" if immediate else "BEGIN")
+
+    instrument_engine(engine.sync_engine)
+    return engine
+
+
+def build_read_engine(url: str | URL, read_url: Optional[str], writer: AsyncEngine) -> AsyncEngine:
+    """Engine for read-only requests: a replica, the SQLite file opened read-only, or the writer"""
+    if read_url:
+        return build_engine(read_url, read_only=True, pool_size=config.DB_READ_POOL_SIZE)
+    if async_url(url).get_backend_name() == "sqlite":
+        sqlite_read_url = sqlite_read_only_url(url)
+        if sqlite_read_url is not None:
+            return build_engine(sqlite_read_url, read_only=True)
+    return writer
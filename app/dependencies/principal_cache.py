@@ -0,0 +1,139 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from app.config import config
+from app.dependencies.cache import RedisUnavailable, redis_client
+from app.utils.tokens import token_digest
+
+logger = logging.getLogger("app")
+
+
+class Principal(NamedTuple):
+    """Compact record of an authenticated user or mechanic"""
+
+    id: int
+    type: str
+    role: str
+    is_active: bool
+
+    @classmethod
+    def from_entity(cls, entity) -> "Principal":
+        # Mechanic rows have no role column, their role is always "mechanic"
+        if hasattr(entity, "role"):
+            return cls(entity.id, "user", entity.role, bool(entity.is_active))
+        return cls(entity.id, "mechanic", "mechanic", bool(entity.is_active))
+
+    def dump(self) -> str:
+        return f"{self.id}:{self.type}:{self.role}:{int(self.is_active)}"
+
+    @classmethod
+    def load(cls, raw: str) -> "Principal":
+        principal_id, principal_type, role, is_active = raw.split(":")
+        return cls(int(principal_id), principal_type, role, is_active == "1")
+
+
+class PrincipalCache:
+    """Two-tier principal cache: in-process LRU with TTL in front of Redis.
+
+    Entries are keyed by the token digest. Invalidation by principal drops the
+    local entries of this worker and the Redis entries of all workers; other
+    workers' local entries expire after `local_ttl` seconds at most. While Redis
+    is unavailable only the local tier is used.
+    """
+
+    def __init__(self, maxsize: int, local_ttl: int, redis_ttl: int):
+        self.maxsize = maxsize
+        self.local_ttl = local_ttl
+        self.redis_ttl = redis_ttl
+        self._entries: "OrderedDict[str, tuple[float, Principal]]" = OrderedDict()
+        self._by_principal: dict[tuple[str, int], set[str]] = {}
+
+    @staticmethod
+    def _key(digest: str) -> str:
+        return f"principal:{digest}"
+
+    @staticmethod
+    def _index_key(principal_type: str, principal_id: int) -> str:
+        return f"principal_tokens:{principal_type}:{principal_id}"
+
+    def _get_local(self, digest: str) -> Optional[Principal]:
+        entry = self._entries.get(digest)
+        if entry is None:
+            return None
+        expires_at, principal = entry
+        if expires_at < time.monotonic():
+            self._drop_local(digest)
+            return None
+        self._entries.move_to_end(digest)
+        return principal
+
+    def _set_local(self, digest: str, principal: Principal):
+        self._drop_local(digest)
+        self._entries[digest] = (time.monotonic() + self.local_ttl, principal)
+        self._by_principal.setdefault((principal.type, principal.id), set()).add(digest)
+        while len(self._entries) > self.maxsize:
+            self._drop_local(next(iter(self._entries)))
+
+    def _drop_local(self, digest: str):
+        entry = self._entries.pop(digest, None)
+        if entry is None:
+            return
+        principal = entry[1]
+        digests = self._by_principal.get((principal.type, principal.id))
+        if digests is not None:
+            digests.discard(digest)
+            if not digests:
+                del self._by_principal[(principal.type, principal.id)]
+
+    async def get(self, token: str) -> Optional[Principal]:
+        """Returns the cached principal for a token, checking the local tier first"""
+        digest = token_digest(token)
+        principal = self._get_local(digest)
+        if principal is not None:
+            return principal
+        try:
+            raw = await redis_client.run(lambda redis: redis.get(self._key(digest)))
+        except RedisUnavailable:
+            return None
+        if raw is None:
+            return None
+        principal = Principal.load(raw)
+        self._set_local(digest, principal)
+        return principal
+
+    def set(self, token: str, principal: Principal, pipe):
+        """Stores the principal locally and queues the Redis writes on a pipeline"""
+        digest = token_digest(token)
+        self._set_local(digest, principal)
+        index_key = self._index_key(principal.type, principal.id)
+        pipe.set(self._key(digest), principal.dump(), ex=self.redis_ttl)
+        pipe.sadd(index_key, digest)
+        pipe.expire(index_key, self.redis_ttl)
+
+    async def invalidate(self, principal_type: str, principal_id: int):
+        """Drops every cached token of a principal after its role or status changed"""
+        for digest in list(self._by_principal.get((principal_type, principal_id), ())):
+            self._drop_local(digest)
+        index_key = self._index_key(principal_type, principal_id)
+        try:
+            digests = await redis_client.run(lambda redis: redis.smembers(index_key))
+            await redis_client.run(
+                lambda redis: redis.delete(index_key, *(self._key(digest) for digest in digests))
+            )
+        except RedisUnavailable as e:
+            logger.error(f"Could not invalidate cached {principal_type} {principal_id} in Redis: {e}")
+
+    def invalidate_token(self, token: str, pipe):
+        """Drops a single token, e.g. on logout; the Redis delete is queued on a pipeline"""
+        digest = token_digest(token)
+        self._drop_local(digest)
+        pipe.delete(self._key(digest))
+
+
+principal_cache = PrincipalCache(
+    maxsize=config.PRINCIPAL_CACHE_SIZE,
+    local_ttl=config.PRINCIPAL_CACHE_LOCAL_TTL,
+    redis_ttl=config.PRINCIPAL_CACHE_REDIS_TTL,
+)
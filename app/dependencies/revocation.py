@@ -0,0 +1,152 @@
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from typing import Optional
+
+from app.config import config
+from app.dependencies.cache import RedisUnavailable, redis_client
+from app.utils.metrics import metrics
+
+logger = logging.getLogger("app")
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (no false negatives)"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RevocationList:
+    """Revoked token ids (jti) in Redis, pre-checked against a local Bloom filter.
+
+    Each revocation is stored as `revoked:{jti}` with a TTL equal to the token's
+    remaining life and appended to a sorted set scored by revocation time, which
+    every worker polls to keep its own filter in sync. A jti missing from the
+    filter is definitely not revoked, so the common case needs no round trip.
+    While Redis is unavailable the last synced filter is the answer.
+    """
+
+    LOG_KEY = "revocations"
+
+    def __init__(self, capacity: int, error_rate: float, sync_interval: float, rebuild_interval: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self.rebuild_interval = rebuild_interval
+        self._filter = BloomFilter(capacity, error_rate)
+        self._synced_until = 0.0
+        self._ready = False
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _key(jti: str) -> str:
+        return f"revoked:{jti}"
+
+    def revoke(self, jti: str, exp: float, pipe):
+        """Adds the jti to the local filter and queues the Redis writes on a pipeline"""
+        now = time.time()
+        ttl = math.ceil(exp - now)
+        if ttl <= 0:
+            return
+        self._filter.add(jti)
+        pipe.set(self._key(jti), "1", ex=ttl)
+        pipe.zadd(self.LOG_KEY, {f"{jti}:{int(exp)}": now})
+
+    async def is_revoked(self, jti: str) -> bool:
+        # Until the first rebuild the filter knows nothing, so ask Redis directly
+        if self._ready and jti not in self._filter:
+            return False
+        try:
+            return bool(await redis_client.run(lambda redis: redis.exists(self._key(jti))))
+        except RedisUnavailable:
+            metrics.inc("revocation.fallback")
+            return jti in self._filter
+
+    async def sync(self):
+        """Adds revocations made by other workers since the last sync"""
+        # Overlap the window a little to tolerate clock skew between workers
+        since = max(0.0, self._synced_until - 5)
+        entries = await redis_client.run(
+            lambda redis: redis.zrangebyscore(self.LOG_KEY, since, "+inf", withscores=True)
+        )
+        for member, revoked_at in entries:
+            self._filter.add(member.rsplit(":", 1)[0])
+            self._synced_until = max(self._synced_until, revoked_at)
+
+    async def rebuild(self):
+        """Recreates the filter from live revocations, dropping expired jtis"""
+        now = time.time()
+        max_lifetime = config.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
+        await redis_client.run(lambda redis: redis.zremrangebyscore(self.LOG_KEY, 0, now - max_lifetime))
+        entries = await redis_client.run(
+            lambda redis: redis.zrange(self.LOG_KEY, 0, -1, withscores=True),
+            timeout=config.REDIS_SOCKET_TIMEOUT,
+        )
+        bloom = BloomFilter(self.capacity, self.error_rate)
+        synced_until = 0.0
+        for member, revoked_at in entries:
+            jti, exp = member.rsplit(":", 1)
+            if int(exp) > now:
+                bloom.add(jti)
+            synced_until = max(synced_until, revoked_at)
+        self._filter = bloom
+        self._synced_until = synced_until
+        self._ready = True
+        logger.info(f"Revocation filter rebuilt with {len(entries)} entries")
+
+    async def _run(self):
+        last_rebuild = None
+        while True:
+            try:
+                if last_rebuild is None or time.monotonic() - last_rebuild >= self.rebuild_interval:
+                    await self.rebuild()
+                    last_rebuild = time.monotonic()
+                else:
+                    await self.sync()
+            except asyncio.CancelledError:
+                raise
+            except RedisUnavailable as e:
+                # Breaker transitions are logged already; keep serving the last snapshot
+                logger.debug(f"Revocation sync skipped: {e}")
+            except Exception as e:
+                logger.error(f"Revocation sync failed: {e}")
+            await asyncio.sleep(self.sync_interval)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+revocation_list = RevocationList(
+    capacity=config.REVOCATION_BLOOM_CAPACITY,
+    error_rate=config.REVOCATION_BLOOM_ERROR_RATE,
+    sync_interval=config.REVOCATION_SYNC_INTERVAL,
+    rebuild_interval=config.REVOCATION_REBUILD_INTERVAL,
+)
@@ -0,0 +1,136 @@
+import hashlib
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional
+
+from fastapi import HTTPException, Request, status
+
+from app.config import config
+from app.dependencies.cache import RedisUnavailable, redis_client
+from app.utils.metrics import metrics
+
+logger = logging.getLogger("app")
+
+# Sliding-window log over every key at once: either all keys accept the hit or
+# none of them records it. Returns 0 when allowed, otherwise the wait in ms.
+SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local member = ARGV[3]
+local retry = 0
+for i, key in ipairs(KEYS) do
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    if redis.call('ZCARD', key) >= tonumber(ARGV[3 + i]) then
+        local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+        retry = math.max(retry, tonumber(oldest[2]) + window - now, 1)
+    end
+end
+if retry > 0 then
+    return retry
+end
+for i, key in ipairs(KEYS) do
+    redis.call('ZADD', key, now, member)
+    redis.call('PEXPIRE', key, window)
+end
+return 0
+"""
+
+
+class LocalTokenBuckets:
+    """Process-local token buckets used while Redis is slow or unavailable"""
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._buckets: "OrderedDict[str, tuple[float, float]]" = OrderedDict()
+
+    def hit(self, limits: dict[str, int], window: float) -> float:
+        """Consumes one token from every bucket; returns 0 or the wait in seconds"""
+        now = time.monotonic()
+        levels = {}
+        retry = 0.0
+        for key, limit in limits.items():
+            rate = limit / window
+            tokens, updated = self._buckets.get(key, (float(limit), now))
+            tokens = min(float(limit), tokens + (now - updated) * rate)
+            levels[key] = tokens
+            if tokens < 1:
+                retry = max(retry, (1 - tokens) / rate)
+        if retry:
+            return retry
+        for key, tokens in levels.items():
+            self._buckets[key] = (tokens - 1, now)
+            self._buckets.move_to_end(key)
+        while len(self._buckets) > self.maxsize:
+            self._buckets.popitem(last=False)
+        return 0.0
+
+
+class Throttle:
+    """Per-IP and per-email sliding-window throttle backed by an atomic Redis script.
+
+    Call `enforce` before any DB query or password hash so that rejected
+    requests cost a single Redis round trip (or none, on the local fallback).
+    """
+
+    def __init__(self, scope: str, limit_per_ip: int, limit_per_email: int, window: int):
+        self.scope = scope
+        self.limit_per_ip = limit_per_ip
+        self.limit_per_email = limit_per_email
+        self.window = window
+        self._script = None
+        self._local = LocalTokenBuckets()
+
+    def _limits(self, ip_address: Optional[str], email: Optional[str]) -> dict[str, int]:
+        limits = {}
+        if ip_address:
+            limits[f"throttle:{self.scope}:ip:{ip_address}"] = self.limit_per_ip
+        if email:
+            digest = hashlib.blake2b(email.lower().encode(), digest_size=16).hexdigest()
+            limits[f"throttle:{self.scope}:email:{digest}"] = self.limit_per_email
+        return limits
+
+    async def _redis_hit(self, redis, limits: dict[str, int]) -> float:
+        if self._script is None or self._script.registered_client is not redis:
+            self._script = redis.register_script(SLIDING_WINDOW_SCRIPT)
+        retry_ms = await self._script(
+            keys=list(limits),
+            args=[int(time.time() * 1000), self.window * 1000, uuid.uuid4().hex, *limits.values()],
+        )
+        return int(retry_ms) / 1000
+
+    async def enforce(self, request: Request, email: Optional[str] = None):
+        limits = self._limits(request.client.host if request.client else None, email)
+        if not limits:
+            return
+        try:
+            retry = await redis_client.run(
+                lambda redis: self._redis_hit(redis, limits), timeout=config.THROTTLE_REDIS_TIMEOUT
+            )
+        except RedisUnavailable as e:
+            metrics.inc("throttle.fallback")
+            logger.warning(f"Throttle {self.scope} fell back to local buckets: {e}")
+            retry = self._local.hit(limits, self.window)
+        if retry:
+            metrics.inc(f"throttle.{self.scope}.rejected")
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many attempts, try again later",
+                headers={"Retry-After": str(max(1, round(retry)))},
+            )
+
+
+login_throttle = Throttle(
+    "login",
+    limit_per_ip=config.THROTTLE_LOGIN_LIMIT_PER_IP,
+    limit_per_email=config.THROTTLE_LOGIN_LIMIT_PER_EMAIL,
+    window=config.THROTTLE_LOGIN_WINDOW,
+)
+
+recovery_throttle = Throttle(
+    "password_recovery",
+    limit_per_ip=config.THROTTLE_RECOVERY_LIMIT_PER_IP,
+    limit_per_email=config.THROTTLE_RECOVERY_LIMIT_PER_EMAIL,
+    window=config.THROTTLE_RECOVERY_WINDOW,
+)
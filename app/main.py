@@ -1,5 +1,6 @@
 import logging
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from app.routers.auth_router import router as auth_router
 from app.routers.users_router import router as users_router
 from app.routers.cars_router import router as cars_router
@@ -8,9 +9,16 @@ from app.routers.mechanics_router import router as mechanics_router
 from app.routers.documents_router import router as documents_router
 from app.routers.appointments_router import router as appointments_router
 from app.routers.admin_router import router as admin_router
+from app.routers.jwks_router import router as jwks_router
 from contextlib import asynccontextmanager
 from app.middlewares.middlewares import setup_middlewares
 from app.services.init_admin import create_initial_admin, create_initial_admin_mechanic
+from app.utils.hashing import hashing_pool
+from app.dependencies.cache import redis_client
+from app.dependencies.revocation import revocation_list
+from app.services.login_activity import login_activity
+from app.services.group_commit import group_commit
+from app.services.assignment import auto_assign_job
 
 # Configure logging
 logging.basicConfig(
@@ -23,12 +31,19 @@ logger = logging.getLogger("app")
 async def lifespan(app: FastAPI):
     """Manage application lifecycle resources"""
     try:
+        await redis_client.init_redis()
+
         # Initialize admin users if they don't exist
         logger.info("🔧 Checking for initial admin users...")
         await create_initial_admin()
         await create_initial_admin_mechanic()
         logger.info("✅ Admin initialization completed")
 
+        revocation_list.start()
+        login_activity.start()
+        group_commit.start()
+        auto_assign_job.start()
+
         yield
 
     except Exception as e:
@@ -36,6 +51,12 @@ async def lifespan(app: FastAPI):
         raise e
 
     finally:
+        await auto_assign_job.stop()
+        await group_commit.stop()
+        await login_activity.stop()
+        await revocation_list.stop()
+        hashing_pool.shutdown()
+        await redis_client.close_redis()
         logger.info("🔴 Application shutdown complete")
 
 app = FastAPI(
@@ -44,6 +65,7 @@ app = FastAPI(
     description="API for managing car service appointments",
     version="1.0.0",
     swagger_ui_parameters={"persistAuthorization": True},
+    default_response_class=ORJSONResponse,
 )
 
 setup_middlewares(app)
@@ -56,5 +78,6 @@ app.include_router(mechanics_router)
 app.include_router(documents_router)
 app.include_router(appointments_router)
 app.include_router(admin_router)
+app.include_router(jwks_router)
 
 logger.info("✅ Car Service API successfully started!")
@@ -1,6 +1,61 @@
 import logging
 
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.datastructures import MutableHeaders
+
+from app.config import config
+from app.utils.metrics import metrics
+from app.utils.timing import start_request
+
+logger = logging.getLogger("app")
+
+
+class ServerTimingMiddleware:
+    """Reports per-phase request timings in a `Server-Timing` response header.
+
+    Pure ASGI so the timings context set here is the one the route handler
+    sees. Requests slower than SLOW_REQUEST_THRESHOLD_MS are logged with their
+    query summary, and statement shapes repeated N_PLUS_ONE_THRESHOLD times
+    within one request are reported as a likely N+1.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.slow_threshold = config.SLOW_REQUEST_THRESHOLD_MS / 1000
+        self.n_plus_one_threshold = config.N_PLUS_ONE_THRESHOLD
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = start_request()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", timings.header(timings.total()))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            total = timings.total()
+            metrics.observe("http.request", total)
+            metrics.observe("http.request.db", timings.phases.get("db", 0.0))
+            metrics.inc("db.queries", timings.queries)
+            if self.slow_threshold and total >= self.slow_threshold:
+                logger.warning(
+                    f"Slow request {scope['method']} {scope['path']} -> {status_code}: "
+                    f"{timings.header(total)}; {timings.db_summary()}"
+                )
+            if self.n_plus_one_threshold:
+                for shape, count in timings.repeated_statements(self.n_plus_one_threshold):
+                    metrics.inc("db.n_plus_one")
+                    logger.warning(f"Possible N+1 in {scope['method']} {scope['path']}: {count}x {shape}")
 
 
 def setup_middlewares(app):
@@ -24,6 +79,9 @@ def setup_middlewares(app):
                       "X-Requested-With", "Access-Control-Request-Method",
                       "Access-Control-Request-Headers"],
         expose_headers=["Access-Control-Allow-Origin", "Access-Control-Allow-Methods", 
-                       "Access-Control-Allow-Headers"],
+                       "Access-Control-Allow-Headers", "Server-Timing"],
         max_age=600,
     )
+
+    if config.SERVER_TIMING_ENABLED:
+        app.add_middleware(ServerTimingMiddleware)
@@ -6,6 +6,7 @@ from .car import Car
 from .service import Service
 from .appointment import Appointment
 from .document import Document
+from .login_activity import LoginActivity
 
 __all__ = [
     "Base",
@@ -14,5 +15,6 @@ __all__ = [
     "Car",
     "Service",
     "Appointment",
-    "Document"
+    "Document",
+    "LoginActivity"
 ]
@@ -1,16 +1,24 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, String
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, String, Index
 from sqlalchemy.orm import relationship
 from app.models.base import Base
 
 class Appointment(Base):
     __tablename__ = "appointments"
+    __table_args__ = (
+        # Per-customer and per-mechanic listings ordered by date, status boards
+        Index("ix_appointments_user_id_appointment_date", "user_id", "appointment_date"),
+        Index("ix_appointments_mechanic_id_appointment_date", "mechanic_id", "appointment_date"),
+        Index("ix_appointments_status_appointment_date", "status", "appointment_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    car_id = Column(Integer, ForeignKey("cars.id", ondelete="CASCADE"), nullable=False)
-    service_id = Column(Integer, ForeignKey("services.id", ondelete="CASCADE"), nullable=False)
+    car_id = Column(Integer, ForeignKey("cars.id", ondelete="CASCADE"), nullable=False, index=True)
+    service_id = Column(Integer, ForeignKey("services.id", ondelete="CASCADE"), nullable=False, index=True)
     mechanic_id = Column(Integer, ForeignKey("mechanics.id", ondelete="SET NULL"), nullable=True)
     appointment_date = Column(DateTime, nullable=False)
+    # appointment_date plus the service duration at booking time, for overlap checks
+    ends_at = Column(DateTime, nullable=True, index=True)
     status = Column(String, default="scheduled")
 
     user = relationship("User", back_populates="appointments")
@@ -7,7 +7,7 @@ class Car(Base):
     __tablename__ = "cars"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     brand = Column(String(100), nullable=False)
     model = Column(String(100), nullable=False)
     year = Column(Integer)
@@ -19,4 +19,4 @@ class Car(Base):
     
     # Relationships
     user = relationship("User", back_populates="cars")
-    appointments = relationship("Appointment", back_populates="car")
+    appointments = relationship("Appointment", back_populates="car", passive_deletes=True)
@@ -1,13 +1,13 @@
 from sqlalchemy import Column, Integer, String, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import backref, relationship
 from app.models.base import Base
 
 class Document(Base):
     __tablename__ = "documents"
 
     id = Column(Integer, primary_key=True, index=True)
-    mechanic_id = Column(Integer, ForeignKey("mechanics.id", ondelete="CASCADE"), nullable=False)
+    mechanic_id = Column(Integer, ForeignKey("mechanics.id", ondelete="CASCADE"), nullable=False, index=True)
     type = Column(String, nullable=False)
     file_path = Column(String, nullable=False)
 
-    mechanic = relationship("Mechanic", backref="documents")
+    mechanic = relationship("Mechanic", backref=backref("documents", passive_deletes=True))
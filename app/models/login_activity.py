@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from app.models.base import Base
+
+class LoginActivity(Base):
+    __tablename__ = "login_activity"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    ip_address = Column(String(45))
+    logged_in_at = Column(DateTime, nullable=False)
@@ -17,4 +17,4 @@ class Mechanic(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
-    appointments = relationship("Appointment", back_populates="mechanic")
+    appointments = relationship("Appointment", back_populates="mechanic", passive_deletes=True)
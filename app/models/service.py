@@ -11,9 +11,11 @@ class Service(Base):
     description = Column(Text)
     price = Column(Float, nullable=False)
     duration_minutes = Column(Integer, default=60)
+    # Mechanic specialization the service needs; empty means any mechanic
+    specialization = Column(String(255), nullable=True)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
-    appointments = relationship("Appointment", back_populates="service")
+    appointments = relationship("Appointment", back_populates="service", passive_deletes=True)
@@ -13,9 +13,10 @@ class User(Base):
     phone = Column(String(20))
     role = Column(String(50), default="customer")
     is_active = Column(Boolean, default=True)
+    last_login = Column(DateTime)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     cars = relationship("Car", back_populates="user")
-    appointments = relationship("Appointment", back_populates="user")
+    appointments = relationship("Appointment", back_populates="user", passive_deletes=True)
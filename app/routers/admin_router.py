@@ -1,4 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.dependencies.database import get_db
 from app.models.user import User
@@ -6,81 +10,66 @@ from app.models.mechanic import Mechanic
 from app.models.document import Document
 from app.models.appointment import Appointment
 from app.utils.auth import admin_required
-from typing import List
+from app.dependencies.principal_cache import principal_cache
+from app.utils.metrics import metrics
 from app.schemas.user_schema import UserCreateSchema
+from app.utils.timing import TimedRoute
+from app.utils.pagination import PageParams, page_params, paginate
+from app.schemas.page_schema import Page
+from app.utils.filters import AppointmentFilters, appointment_filters
+from app.utils.projection import page_response
+from app.services.export import (
+    MEDIA_TYPES, ExportEntity, ExportFormat, export_query, stream_export, supports_since,
+)
 
-router = APIRouter(prefix="/admin", tags=["Admin"])
+router = APIRouter(prefix="/admin", tags=["Admin"], route_class=TimedRoute)
 
-@router.get("/users", response_model=List[dict])
-async def get_all_users(db: AsyncSession = Depends(get_db), current_user=Depends(admin_required)):
+@router.get("/users", response_model=Page[dict])
+async def get_all_users(page: PageParams = Depends(page_params), db: AsyncSession = Depends(get_db), current_user=Depends(admin_required)):
     from sqlalchemy.future import select
-    result = await db.execute(select(User))
-    users = result.scalars().all()
-    return [
-        {
-            "id": user.id,
-            "email": user.email,
-            "full_name": user.full_name,
-            "phone": user.phone,
-            "role": user.role,
-            "is_active": user.is_active,
-            "created_at": user.created_at,
-            "updated_at": user.updated_at
-        }
-        for user in users
-    ]
+    query = select(
+        User.id, User.email, User.full_name, User.phone, User.role, User.is_active,
+        User.last_login, User.created_at, User.updated_at,
+    )
+    rows, next_cursor = await paginate(db, query, page, [(User.id, False)])
+    return page_response(rows, next_cursor)
 
-@router.get("/mechanics", response_model=List[dict])
-async def get_all_mechanics(db: AsyncSession = Depends(get_db), current_user=Depends(admin_required)):
+@router.get("/mechanics", response_model=Page[dict])
+async def get_all_mechanics(page: PageParams = Depends(page_params), db: AsyncSession = Depends(get_db), current_user=Depends(admin_required)):
     from sqlalchemy.future import select
-    result = await db.execute(select(Mechanic))
-    mechanics = result.scalars().all()
-    return [
-        {
-            "id": mechanic.id,
-            "full_name": mechanic.full_name,
-            "email": mechanic.email,
-            "phone": mechanic.phone,
-            "specialization": mechanic.specialization,
-            "is_active": mechanic.is_active,
-            "created_at": mechanic.created_at,
-            "updated_at": mechanic.updated_at
-        }
-        for mechanic in mechanics
-    ]
+    query = select(
+        Mechanic.id, Mechanic.full_name, Mechanic.email, Mechanic.phone, Mechanic.specialization,
+        Mechanic.is_active, Mechanic.created_at, Mechanic.updated_at,
+    )
+    rows, next_cursor = await paginate(db, query, page, [(Mechanic.id, False)])
+    return page_response(rows, next_cursor)
 
-@router.get("/documents", response_model=List[dict])
-async def get_all_documents(db: AsyncSession = Depends(get_db), current_user=Depends(admin_required)):
+@router.get("/documents", response_model=Page[dict])
+async def get_all_documents(page: PageParams = Depends(page_params), db: AsyncSession = Depends(get_db), current_user=Depends(admin_required)):
     from sqlalchemy.future import select
-    result = await db.execute(select(Document))
-    documents = result.scalars().all()
-    return [
-        {
-            "id": document.id,
-            "mechanic_id": document.mechanic_id,
-            "type": document.type,
-            "file_path": document.file_path
-        }
-        for document in documents
-    ]
+    query = select(Document.id, Document.mechanic_id, Document.type, Document.file_path)
+    rows, next_cursor = await paginate(db, query, page, [(Document.id, False)])
+    return page_response(rows, next_cursor)
 
-@router.get("/appointments", response_model=List[dict])
-async def get_all_appointments(db: AsyncSession = Depends(get_db), current_user=Depends(admin_required)):
+@router.get("/appointments", response_model=Page[dict])
+async def get_all_appointments(
+    page: PageParams = Depends(page_params),
+    filters: AppointmentFilters = Depends(appointment_filters),
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(admin_required),
+):
     from sqlalchemy.future import select
-    result = await db.execute(select(Appointment))
-    appointments = result.scalars().all()
-    return [
-        {
-            "id": appointment.id,
-            "user_id": appointment.user_id,
-            "car_id": appointment.car_id,
-            "service_id": appointment.service_id,
-            "mechanic_id": appointment.mechanic_id,
-            "appointment_date": appointment.appointment_date,
-            "status": appointment.status
-        }
-        for appointment in appointments
-    ]
+    query = select(
+        Appointment.id, Appointment.user_id, Appointment.car_id, Appointment.service_id,
+        Appointment.mechanic_id, Appointment.appointment_date, Appointment.status,
+    )
+    rows, next_cursor = await paginate(db, filters.apply(query), page, filters.order_by(default="id"))
+    return page_response(rows, next_cursor)
+
+@router.get("/metrics")
+async def get_metrics(current_user=Depends(admin_required)):
+    """In-process metrics of this worker (hashing pool, caches, etc.)"""
+    return metrics.snapshot()
 
 @router.patch("/users/{user_id}/change_role")
 async def change_user_role(user_id: int, user_update: UserCreateSchema, db: AsyncSession = Depends(get_db), current_user=Depends(admin_required)):
@@ -96,7 +85,7 @@ async def change_user_role(user_id: int, user_update: UserCreateSchema, db: Asyn
         if key == "password":
             # Hash password if it's being changed
             from app.utils.password import get_password_hash
-            setattr(db_user, "hashed_password", get_password_hash(value))
+            setattr(db_user, "hashed_password", await get_password_hash(value))
         elif key == "name":
             # Map 'name' to 'full_name'
             setattr(db_user, "full_name", value)
@@ -108,6 +97,7 @@ async def change_user_role(user_id: int, user_update: UserCreateSchema, db: Asyn
     
     await db.commit()
     await db.refresh(db_user)
+    await principal_cache.invalidate("user", db_user.id)
     return {
         "detail": "Роль користувача успішно змінена", 
         "user": {
@@ -121,3 +111,27 @@ async def change_user_role(user_id: int, user_update: UserCreateSchema, db: Asyn
             "updated_at": db_user.updated_at
         }
     }
+
+@router.get("/export/{entity}")
+async def export_entity(
+    entity: ExportEntity,
+    request: Request,
+    format: ExportFormat = Query("ndjson"),
+    since: Optional[datetime] = Query(None, description="Rows updated (appointments: scheduled) at or after this time"),
+    current_user=Depends(admin_required),
+):
+    """Streams a whole table as NDJSON or CSV, gzip-compressed when the client accepts it"""
+    if since is not None and not supports_since(entity):
+        raise HTTPException(status_code=400, detail="Фільтр since не підтримується для цього набору даних")
+    gzip = "gzip" in request.headers.get("accept-encoding", "")
+    headers = {
+        "Content-Disposition": f'attachment; filename="{entity}.{format}"',
+        "Vary": "Accept-Encoding",
+    }
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        stream_export(export_query(entity, since), format, gzip=gzip),
+        media_type=MEDIA_TYPES[format],
+        headers=headers,
+    )
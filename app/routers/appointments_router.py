@@ -1,15 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime, timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.schemas.appointment_schema import AppointmentCreateSchema, AppointmentResponseSchema
+from app.schemas.appointment_schema import AppointmentCreateSchema, AppointmentResponseSchema, AvailabilityResponseSchema, SlotHoldCreateSchema, SlotHoldResponseSchema, AutoAssignResponseSchema
 from app.models.appointment import Appointment
-from app.dependencies.database import get_db
-from app.utils.auth import role_required_with_cache, mechanic_required, admin_required
-from typing import List
+from app.dependencies.database import begin_write, get_db
+from app.utils.auth import role_required_with_cache, mechanic_required, admin_required, get_principal_entity
 from app.services.email_service import send_email
 from app.models.car import Car
+from app.utils.timing import TimedRoute
+from app.services.group_commit import group_commit
+from app.utils.pagination import PageParams, page_params, paginate
+from app.schemas.page_schema import Page
+from app.utils.filters import AppointmentFilters, appointment_filters
+from app.utils.projection import page_response, schema_columns
+from app.utils.tokens import get_utc_now
+from app.services.availability import CANCELLED_STATUS, DEFAULT_DURATION_MINUTES, load_availability, to_naive_utc, within_working_hours
+from app.services.booking import book, ensure_qualified, find_overlap, service_duration
+from app.services.assignment import AssignmentConflict, auto_assign
+from app.services.slot_holds import HELD_BY_OTHER, NOT_FOUND, TOO_MANY_HOLDS, SlotHold, slot_holds
+from app.dependencies.cache import RedisUnavailable
+from app.models.mechanic import Mechanic
+from app.models.service import Service
+from app.config import config
 from sqlalchemy.future import select
 
-router = APIRouter(prefix="/appointments", tags=["Appointments"])
+APPOINTMENT_COLUMNS = schema_columns(AppointmentResponseSchema, Appointment)
+
+router = APIRouter(prefix="/appointments", tags=["Appointments"], route_class=TimedRoute)
 
 @router.post("/", response_model=AppointmentResponseSchema)
 async def create_appointment(appointment: AppointmentCreateSchema, db: AsyncSession = Depends(get_db), current_user=Depends(role_required_with_cache(["customer", "admin"]))):
@@ -18,15 +36,43 @@ async def create_appointment(appointment: AppointmentCreateSchema, db: AsyncSess
     car = result.scalar_one_or_none()
     if not car:
         raise HTTPException(status_code=404, detail="Автомобіль не знайдено або не належить вам")
-    
-    new_appointment = Appointment(user_id=current_user.id, **appointment.model_dump())
-    db.add(new_appointment)
-    await db.commit()
-    await db.refresh(new_appointment)
+
+    appointment.appointment_date = to_naive_utc(appointment.appointment_date)
+    hold = None
+    if appointment.hold_id:
+        hold = SlotHold.parse(appointment.hold_id)
+        if hold is None:
+            raise HTTPException(status_code=404, detail="Резервування не знайдено або воно закінчилось")
+        if appointment.mechanic_id is None:
+            appointment.mechanic_id = hold.mechanic_id
+        if hold.mechanic_id != appointment.mechanic_id or hold.start != appointment.appointment_date:
+            raise HTTPException(status_code=400, detail="Резервування не відповідає запису")
+
+    duration = None
+    if appointment.mechanic_id is not None:
+        # Other customers' holds block the slot; the caller's own hold must still be live
+        duration = await service_duration(db, appointment.service_id)
+        outcome = await slot_holds.check(
+            current_user.id, appointment.mechanic_id, appointment.appointment_date,
+            appointment.appointment_date + duration, hold,
+        )
+        if outcome == NOT_FOUND:
+            raise HTTPException(status_code=404, detail="Резервування не знайдено або воно закінчилось")
+        if outcome == HELD_BY_OTHER:
+            raise HTTPException(status_code=409, detail="Цей час зарезервовано іншим клієнтом")
+
+    async def insert_appointment(session: AsyncSession):
+        new_appointment = Appointment(user_id=current_user.id, **appointment.model_dump(exclude={"hold_id"}))
+        return await book(session, new_appointment, duration)
+
+    new_appointment = await group_commit.run(db, insert_appointment)
+    if hold:
+        await slot_holds.release(current_user.id, hold)
     # Send email (asynchronously)
     try:
+        user = await get_principal_entity(db, current_user)
         await send_email(
-            to_email=current_user.email,
+            to_email=user.email,
             subject="Підтвердження запису на обслуговування",
             message=f"Ваш запис на {new_appointment.appointment_date} створено!"
         )
@@ -34,46 +80,141 @@ async def create_appointment(appointment: AppointmentCreateSchema, db: AsyncSess
         pass
     return new_appointment
 
-@router.get("/", response_model=List[AppointmentResponseSchema])
-async def get_appointments(db: AsyncSession = Depends(get_db), current_user=Depends(role_required_with_cache(["customer", "admin"]))):
-    result = await db.execute(select(Appointment).where(Appointment.user_id == current_user.id))
-    return result.scalars().all()
+@router.get("/", response_model=Page[AppointmentResponseSchema])
+async def get_appointments(page: PageParams = Depends(page_params), db: AsyncSession = Depends(get_db), current_user=Depends(role_required_with_cache(["customer", "admin"]))):
+    rows, next_cursor = await paginate(
+        db,
+        select(*APPOINTMENT_COLUMNS).where(Appointment.user_id == current_user.id),
+        page,
+        [(Appointment.appointment_date, False), (Appointment.id, False)],
+    )
+    return page_response(rows, next_cursor, AppointmentResponseSchema)
+
+@router.get("/my", response_model=Page[AppointmentResponseSchema])
+async def get_my_appointments(page: PageParams = Depends(page_params), filters: AppointmentFilters = Depends(appointment_filters), db: AsyncSession = Depends(get_db), current_user=Depends(mechanic_required)):
+    """Appointments assigned to the mechanic; date_from/date_to give e.g. a "today" view"""
+    filters.mechanic_id = current_user.id
+    filters.unassigned = False
+    rows, next_cursor = await paginate(
+        db,
+        filters.apply(select(*APPOINTMENT_COLUMNS)),
+        page,
+        filters.order_by(default="date"),
+    )
+    return page_response(rows, next_cursor, AppointmentResponseSchema)
+
+@router.get("/history", response_model=Page[AppointmentResponseSchema])
+async def get_appointment_history(page: PageParams = Depends(page_params), db: AsyncSession = Depends(get_db), current_user=Depends(role_required_with_cache(["customer", "admin"]))):
+    """Get all appointment history for the customer (including completed ones), newest first"""
+    rows, next_cursor = await paginate(
+        db,
+        select(*APPOINTMENT_COLUMNS).where(Appointment.user_id == current_user.id),
+        page,
+        [(Appointment.appointment_date, True), (Appointment.id, True)],
+    )
+    return page_response(rows, next_cursor, AppointmentResponseSchema)
+
+@router.get("/availability", response_model=AvailabilityResponseSchema)
+async def get_availability(
+    service_id: int,
+    start: datetime = Query(..., alias="from"),
+    end: datetime = Query(..., alias="to"),
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(role_required_with_cache(["customer", "admin"])),
+):
+    """Free slots for a service within working hours, with the mechanics free for each"""
+    start, end = to_naive_utc(start), to_naive_utc(end)
+    if end <= start:
+        raise HTTPException(status_code=400, detail="Кінець періоду має бути пізніше за початок")
+    if end - start > timedelta(days=config.AVAILABILITY_MAX_DAYS):
+        raise HTTPException(status_code=400, detail=f"Період не може перевищувати {config.AVAILABILITY_MAX_DAYS} днів")
+    service = (await db.execute(select(Service).where(Service.id == service_id))).scalar_one_or_none()
+    if not service:
+        raise HTTPException(status_code=404, detail="Послугу не знайдено")
 
-@router.get("/my", response_model=List[AppointmentResponseSchema])
-async def get_my_appointments(db: AsyncSession = Depends(get_db), current_user=Depends(mechanic_required)):
-    result = await db.execute(select(Appointment).where(Appointment.mechanic_id == current_user.id))
-    return result.scalars().all()
+    duration_minutes = service.duration_minutes or DEFAULT_DURATION_MINUTES
+    availability = await load_availability(db, start, end, service.specialization)
+    availability.add_busy(await slot_holds.held_intervals(availability.schedules, start, end, current_user.id))
+    slots = [
+        {"start": slot_start, "end": slot_end, "mechanic_ids": mechanic_ids}
+        for slot_start, slot_end, mechanic_ids in availability.slots(start, end, timedelta(minutes=duration_minutes))
+    ]
+    return {"service_id": service.id, "duration_minutes": duration_minutes, "slots": slots}
 
-@router.get("/history", response_model=List[AppointmentResponseSchema])
-async def get_appointment_history(db: AsyncSession = Depends(get_db), current_user=Depends(role_required_with_cache(["customer", "admin"]))):
-    """Get all appointment history for the customer (including completed ones)"""
-    result = await db.execute(select(Appointment).where(Appointment.user_id == current_user.id).order_by(Appointment.appointment_date.desc()))
-    return result.scalars().all()
+@router.post("/holds", response_model=SlotHoldResponseSchema)
+async def create_slot_hold(hold: SlotHoldCreateSchema, db: AsyncSession = Depends(get_db), current_user=Depends(role_required_with_cache(["customer", "admin"]))):
+    """Reserves a mechanic's slot for SLOT_HOLD_TTL_SECONDS while the customer fills in the booking"""
+    service = (await db.execute(
+        select(Service.duration_minutes, Service.specialization).where(Service.id == hold.service_id)
+    )).one_or_none()
+    if not service:
+        raise HTTPException(status_code=404, detail="Послугу не знайдено")
+    mechanic = (await db.execute(
+        select(Mechanic.is_active, Mechanic.specialization).where(Mechanic.id == hold.mechanic_id)
+    )).one_or_none()
+    if not mechanic or mechanic.is_active is False:
+        raise HTTPException(status_code=404, detail="Механіка не знайдено")
+    ensure_qualified(mechanic.specialization, service.specialization)
+
+    start = to_naive_utc(hold.start)
+    end = start + timedelta(minutes=service.duration_minutes or DEFAULT_DURATION_MINUTES)
+    if start < get_utc_now():
+        raise HTTPException(status_code=422, detail="Не можна резервувати час у минулому")
+    if not within_working_hours(start, end):
+        raise HTTPException(status_code=422, detail="Резервування можливе лише в робочий час")
+    if await find_overlap(db, hold.mechanic_id, start, end):
+        raise HTTPException(status_code=409, detail="Механік уже зайнятий у цей час")
+    try:
+        outcome, slot_hold = await slot_holds.place(current_user.id, hold.mechanic_id, start, end)
+    except RedisUnavailable:
+        raise HTTPException(status_code=503, detail="Резервування тимчасово недоступне")
+    if outcome == HELD_BY_OTHER:
+        raise HTTPException(status_code=409, detail="Цей час зарезервовано іншим клієнтом")
+    if outcome == TOO_MANY_HOLDS:
+        raise HTTPException(status_code=429, detail=f"Не більше {config.SLOT_HOLD_MAX_PER_USER} резервувань одночасно")
+    return {
+        "id": slot_hold.id,
+        "mechanic_id": slot_hold.mechanic_id,
+        "start": slot_hold.start,
+        "end": slot_hold.end,
+        "expires_at": get_utc_now() + timedelta(seconds=config.SLOT_HOLD_TTL_SECONDS),
+    }
+
+@router.delete("/holds/{hold_id}")
+async def delete_slot_hold(hold_id: str, current_user=Depends(role_required_with_cache(["customer", "admin"]))):
+    """Releases the caller's own hold before it expires"""
+    hold = SlotHold.parse(hold_id)
+    if hold is None:
+        raise HTTPException(status_code=404, detail="Резервування не знайдено або воно закінчилось")
+    await slot_holds.release(current_user.id, hold)
+    return {"detail": "Резервування скасовано"}
 
 @router.put("/{appointment_id}", response_model=AppointmentResponseSchema)
 async def update_appointment(appointment_id: int, appointment: AppointmentCreateSchema, db: AsyncSession = Depends(get_db), current_user=Depends(role_required_with_cache(["customer", "admin"]))):
-    result = await db.execute(select(Appointment).where(Appointment.id == appointment_id))
-    db_appointment = result.scalar_one_or_none()
-    if not db_appointment:
-        raise HTTPException(status_code=404, detail="Запис не знайдено")
-    if db_appointment.user_id != current_user.id and current_user.role != "admin":
-        raise HTTPException(status_code=403, detail="Немає доступу")
-    
-    # Check if the car belongs to the user (if changing)
-    if appointment.car_id != db_appointment.car_id:
-        result = await db.execute(select(Car).where(Car.id == appointment.car_id, Car.user_id == current_user.id))
-        car = result.scalar_one_or_none()
-        if not car:
-            raise HTTPException(status_code=404, detail="Автомобіль не знайдено або не належить вам")
-    
-    # Update fields except user_id
-    appointment_data = appointment.model_dump()
-    for key, value in appointment_data.items():
-        setattr(db_appointment, key, value)
-    
-    await db.commit()
-    await db.refresh(db_appointment)
-    return db_appointment
+    appointment.appointment_date = to_naive_utc(appointment.appointment_date)
+
+    async def apply_update(session: AsyncSession):
+        result = await session.execute(select(Appointment).where(Appointment.id == appointment_id))
+        db_appointment = result.scalar_one_or_none()
+        if not db_appointment:
+            raise HTTPException(status_code=404, detail="Запис не знайдено")
+        if db_appointment.user_id != current_user.id and current_user.role != "admin":
+            raise HTTPException(status_code=403, detail="Немає доступу")
+
+        # Check if the car belongs to the user (if changing)
+        if appointment.car_id != db_appointment.car_id:
+            result = await session.execute(select(Car).where(Car.id == appointment.car_id, Car.user_id == current_user.id))
+            car = result.scalar_one_or_none()
+            if not car:
+                raise HTTPException(status_code=404, detail="Автомобіль не знайдено або не належить вам")
+
+        # Update fields except user_id
+        appointment_data = appointment.model_dump(exclude={"hold_id"})
+        for key, value in appointment_data.items():
+            setattr(db_appointment, key, value)
+        return await book(session, db_appointment)
+
+    return await group_commit.run(db, apply_update)
 
 @router.delete("/{appointment_id}")
 async def delete_appointment(appointment_id: int, db: AsyncSession = Depends(get_db), current_user=Depends(role_required_with_cache(["customer", "admin"]))):
@@ -89,33 +230,70 @@ async def delete_appointment(appointment_id: int, db: AsyncSession = Depends(get
 
 @router.patch("/{appointment_id}/assign_mechanic")
 async def assign_mechanic(appointment_id: int, mechanic_id: int, db: AsyncSession = Depends(get_db), current_user=Depends(admin_required)):
+    await begin_write(db)
     result = await db.execute(select(Appointment).where(Appointment.id == appointment_id))
     db_appointment = result.scalar_one_or_none()
     if not db_appointment:
         raise HTTPException(status_code=404, detail="Запис не знайдено")
     db_appointment.mechanic_id = mechanic_id
-    await db.commit()
+    try:
+        await book(db, db_appointment)
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
     await db.refresh(db_appointment)
     return {"detail": "Механіка призначено"}
 
+@router.post("/auto_assign", response_model=AutoAssignResponseSchema)
+async def auto_assign_mechanics(
+    start: datetime = Query(..., alias="from"),
+    end: datetime = Query(..., alias="to"),
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(admin_required),
+):
+    """Assigns mechanics to every unassigned booking starting in the window, in one transaction"""
+    start, end = to_naive_utc(start), to_naive_utc(end)
+    if end <= start:
+        raise HTTPException(status_code=400, detail="Кінець періоду має бути пізніше за початок")
+    if end - start > timedelta(days=config.AVAILABILITY_MAX_DAYS):
+        raise HTTPException(status_code=400, detail=f"Період не може перевищувати {config.AVAILABILITY_MAX_DAYS} днів")
+    try:
+        result = await auto_assign(db, start, end)
+    except AssignmentConflict:
+        raise HTTPException(status_code=409, detail="Записи змінилися під час призначення, спробуйте ще раз")
+    return {
+        "assigned": [
+            {"appointment_id": appointment_id, "mechanic_id": mechanic_id}
+            for appointment_id, mechanic_id in result.assignments.items()
+        ],
+        "unassigned_ids": result.unassigned,
+    }
+
 @router.patch("/{appointment_id}/status")
 async def update_appointment_status(appointment_id: int, status: str, db: AsyncSession = Depends(get_db), current_user=Depends(role_required_with_cache(["customer", "admin"]))):
     """Update appointment status (only admin or appointment owner)"""
-    result = await db.execute(select(Appointment).where(Appointment.id == appointment_id))
-    db_appointment = result.scalar_one_or_none()
-    if not db_appointment:
-        raise HTTPException(status_code=404, detail="Запис не знайдено")
-    
-    # Check access rights
-    if db_appointment.user_id != current_user.id and current_user.role != "admin":
-        raise HTTPException(status_code=403, detail="Немає доступу")
-    
     # Validate status
     valid_statuses = ["Заплановано", "В роботі", "Завершено", "Скасовано"]
     if status not in valid_statuses:
         raise HTTPException(status_code=400, detail=f"Недійсний статус. Дозволені: {', '.join(valid_statuses)}")
-    
-    db_appointment.status = status
-    await db.commit()
-    await db.refresh(db_appointment)
+
+    async def apply_status(session: AsyncSession):
+        result = await session.execute(select(Appointment).where(Appointment.id == appointment_id))
+        db_appointment = result.scalar_one_or_none()
+        if not db_appointment:
+            raise HTTPException(status_code=404, detail="Запис не знайдено")
+
+        # Check access rights
+        if db_appointment.user_id != current_user.id and current_user.role != "admin":
+            raise HTTPException(status_code=403, detail="Немає доступу")
+
+        reactivated = db_appointment.status == CANCELLED_STATUS and status != CANCELLED_STATUS
+        db_appointment.status = status
+        if reactivated:
+            # The slot may have been given to someone else while this booking was cancelled
+            await book(session, db_appointment)
+        return db_appointment
+
+    db_appointment = await group_commit.run(db, apply_status)
     return {"detail": f"Статус запису змінено на '{status}'", "appointment": db_appointment}
@@ -5,25 +5,32 @@ from app.schemas.user_schema import (
 )
 from app.models.user import User
 from app.utils.auth import authenticate_user, get_user_by_email
-from app.utils.tokens import create_access_token, create_refresh_token, decode_jwt_token, create_password_reset_token
+from app.utils.tokens import create_access_token, create_refresh_token, decode_principal_token, create_password_reset_token, claims_cache
 from app.utils.password import get_password_hash, validate_password, update_password, validate_password_schema
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.dependencies.database import get_db
-from app.dependencies.cache import redis_client
+from app.dependencies.cache import RedisUnavailable, redis_client
+from app.dependencies.principal_cache import principal_cache
+from app.dependencies.revocation import revocation_list
+from app.dependencies.throttling import login_throttle, recovery_throttle
 from app.services.email_service import send_email
+from app.services.login_activity import login_activity
+from app.services.group_commit import group_commit
 from app.config import config
 import logging
 from fastapi import status, Request
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from app.utils.tokens import get_utc_now
+from app.utils.timing import TimedRoute
 
 # Logger for authentication events
 logger = logging.getLogger("auth")
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/sign-in-swagger")
 
-router = APIRouter(prefix="/auth", tags=["Authentication"])
+router = APIRouter(prefix="/auth", tags=["Authentication"], route_class=TimedRoute)
 
 @router.post("/register", response_model=UserResponseSchema)
 async def register(user: UserRegisterSchema, db: AsyncSession = Depends(get_db)):
@@ -33,17 +40,23 @@ async def register(user: UserRegisterSchema, db: AsyncSession = Depends(get_db))
     db_user = result.scalar_one_or_none()
     if db_user:
         raise HTTPException(status_code=400, detail="Користувач уже існує")
-    hashed_password = get_password_hash(user.password)
-    new_user = User(
-        full_name=user.name,
-        email=user.email.lower(),
-        hashed_password=hashed_password,
-        role="customer"  # Automatically set to customer
-    )
-    db.add(new_user)
-    await db.commit()
-    await db.refresh(new_user)
-    return new_user
+    hashed_password = await get_password_hash(user.password)
+
+    async def insert_user(session: AsyncSession):
+        new_user = User(
+            full_name=user.name,
+            email=user.email.lower(),
+            hashed_password=hashed_password,
+            role="customer"  # Automatically set to customer
+        )
+        session.add(new_user)
+        return new_user
+
+    try:
+        return await group_commit.run(db, insert_user)
+    except IntegrityError:
+        # Lost a race with a concurrent registration for the same email
+        raise HTTPException(status_code=400, detail="Користувач уже існує")
 
 
 # /auth/login: for frontend and API clients (JSON, not for Swagger UI)
@@ -53,6 +66,7 @@ async def login(
     login_data: LoginRequest,
     db: AsyncSession = Depends(get_db),
 ):
+    await login_throttle.enforce(request, login_data.email)
     user = await authenticate_user(db, login_data.email, login_data.password)
     if not user:
         raise HTTPException(
@@ -64,15 +78,12 @@ async def login(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Your account is blocked or inactive",
         )
-    client_ip = request.client.host
+    client_ip = request.client.host if request.client else None
     current_time = get_utc_now()
     logger.info(
         f"User login: email={user.email}, ip={client_ip}, time={current_time}"
     )
-    user.last_login = current_time
-    db.add(user)
-    await db.commit()
-    await db.refresh(user)
+    login_activity.record(user.id, client_ip, current_time)
     access_token = create_access_token(user)
     refresh_token = create_refresh_token(user)
     return TokenResponse(
@@ -95,30 +106,38 @@ async def change_password(email: str, new_password: str, db: AsyncSession = Depe
 
 @router.post("/logout", response_model=LogoutResponse, status_code=status.HTTP_200_OK)
 async def logout(token: str):
-    
-    redis = await redis_client.get_redis()
-    
-    if await redis.exists(f"blacklist:{token}"):
-        raise HTTPException(status_code=401, detail="Token already revoked")
 
     try:
-        decode_jwt_token(token)
+        token_data = decode_principal_token(token)
     except HTTPException:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    await redis.setex(f"blacklist:{token}", 7 * 24 * 60 * 60, "revoked")
-    logger.info(f"Token revoked: {token}")
+    if await revocation_list.is_revoked(token_data["jti"]):
+        raise HTTPException(status_code=401, detail="Token already revoked")
+
+    claims_cache.discard(token)
+    try:
+        async with redis_client.pipeline() as pipe:
+            revocation_list.revoke(token_data["jti"], token_data["exp"], pipe)
+            principal_cache.invalidate_token(token, pipe)
+    except RedisUnavailable as e:
+        # Revoked on this worker only; other workers would still accept the token
+        logger.error(f"Could not store revocation jti={token_data['jti']}: {e}")
+        raise HTTPException(status_code=503, detail="Temporary server issue. Try again later.")
+    logger.info(f"Token revoked: jti={token_data['jti']}")
 
     return LogoutResponse(message="Successfully logged out")
 
 
 @router.post("/password-recovery", status_code=status.HTTP_200_OK)
 async def password_recovery(
+    request: Request,
     data: PasswordResetRequest,
     db: AsyncSession = Depends(get_db),
 ):
     """Запит на скидання пароля та надсилання email з посиланням"""
-    
+    await recovery_throttle.enforce(request, data.email)
+
     user = await get_user_by_email(db, data.email)
     
     response_message = {
@@ -130,12 +149,15 @@ async def password_recovery(
 
     token = create_password_reset_token(user.email)
     
-    redis = await redis_client.get_redis()
-    await redis.setex(
-        f"password-reset:{token}",
-        config.RESET_TOKEN_EXPIRE_MINUTES * 60,
-        user.email,
-    )
+    try:
+        await redis_client.run(lambda redis: redis.setex(
+            f"password-reset:{token}",
+            config.RESET_TOKEN_EXPIRE_MINUTES * 60,
+            user.email,
+        ))
+    except RedisUnavailable as e:
+        logger.error(f"Error accessing Redis: {e}")
+        raise HTTPException(status_code=503, detail="Temporary server issue. Try again later.")
 
     reset_link = f"{config.FRONTEND_URL}/auth/reset-password?token={token}"
 
@@ -156,18 +178,16 @@ async def password_reset(
     data: PasswordReset,
     db: AsyncSession = Depends(get_db),
 ):
-    redis = await redis_client.get_redis()
     try:
-        email = await redis.get(f"password-reset:{data.token}")
-        if not email:
-            raise HTTPException(status_code=400, detail="Invalid or expired token")
-
-    except Exception as e:
+        email = await redis_client.run(lambda redis: redis.get(f"password-reset:{data.token}"))
+    except RedisUnavailable as e:
         logger.error(f"Error accessing Redis: {e}")
         raise HTTPException(
-            status_code=500,
+            status_code=503,
             detail="Temporary server issue. Try again later. Invalid or expired token.",
         )
+    if not email:
+        raise HTTPException(status_code=400, detail="Invalid or expired token")
 
     user = await get_user_by_email(db, email)
     if not user:
@@ -191,7 +211,10 @@ async def password_reset(
             detail="Could not update password. Try again later.",
         )
     # Видаляємо токен тільки після успішного оновлення пароля
-    await redis.delete(f"password-reset:{data.token}")
+    try:
+        await redis_client.run(lambda redis: redis.delete(f"password-reset:{data.token}"))
+    except RedisUnavailable as e:
+        logger.warning(f"Could not delete used reset token, it expires on its own: {e}")
 
     logger.info(f"Password reset successful for {email}")
     return {"message": "Password has been reset successfully. Please log in again."}
@@ -202,21 +225,19 @@ async def password_reset(
 async def refresh_token(refresh_token: str, db: AsyncSession = Depends(get_db)):
     """Оновлення `access_token` за допомогою `refresh_token`"""
 
-    redis = await redis_client.get_redis()
+    token_data = decode_principal_token(refresh_token)
 
-    # Check if refresh token is blacklisted
-    if await redis.exists(f"blacklist:{refresh_token}"):
-        logger.warning(f"Attempt to use blacklisted refresh token: {refresh_token}")
+    # Check if refresh token is revoked
+    if await revocation_list.is_revoked(token_data["jti"]):
+        logger.warning(f"Attempt to use revoked refresh token: jti={token_data['jti']}")
         raise HTTPException(status_code=401, detail="Refresh token is revoked")
 
-    token_data = decode_jwt_token(refresh_token)
-
     from sqlalchemy.future import select
     result = await db.execute(select(User).where(User.id == token_data["id"]))
     user = result.scalar_one_or_none()
 
     if not user:
-        logger.warning(f"User not found for refresh token: {refresh_token}")
+        logger.warning(f"User not found for refresh token: jti={token_data['jti']}")
         raise HTTPException(status_code=404, detail="User not found")
 
     # Create new access token
@@ -239,9 +260,11 @@ async def refresh_token(refresh_token: str, db: AsyncSession = Depends(get_db)):
     tags=["Authentication"],
 )
 async def sign_in_swagger(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: AsyncSession = Depends(get_db),
 ):
+    await login_throttle.enforce(request, form_data.username)
     user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
@@ -249,11 +272,7 @@ async def sign_in_swagger(
             detail="Invalid email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    current_time = get_utc_now()
-    user.last_login = current_time
-    db.add(user)
-    await db.commit()
-    await db.refresh(user)
+    login_activity.record(user.id, request.client.host if request.client else None, get_utc_now())
     access_token = create_access_token(user)
     return {
         "access_token": access_token,
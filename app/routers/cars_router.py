@@ -4,23 +4,30 @@ from app.schemas.car_schema import CarCreateSchema, CarResponseSchema
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.dependencies.database import get_db
 from app.utils.auth import role_required_with_cache
-from typing import List
+from app.utils.timing import TimedRoute
+from app.services.group_commit import group_commit
+from app.utils.pagination import PageParams, page_params, paginate
+from app.schemas.page_schema import Page
+from app.utils.projection import page_response, schema_columns
 
-router = APIRouter(prefix="/cars", tags=["Cars"])
+router = APIRouter(prefix="/cars", tags=["Cars"], route_class=TimedRoute)
 
 @router.post("/", response_model=CarResponseSchema)
 async def create_car(car: CarCreateSchema, db: AsyncSession = Depends(get_db), current_user=Depends(role_required_with_cache(["customer", "admin"]))):
-    new_car = Car(user_id=current_user.id, **car.model_dump())
-    db.add(new_car)
-    await db.commit()
-    await db.refresh(new_car)
-    return new_car
+    async def insert_car(session: AsyncSession):
+        new_car = Car(user_id=current_user.id, **car.model_dump())
+        session.add(new_car)
+        return new_car
+
+    return await group_commit.run(db, insert_car)
 
-@router.get("/", response_model=List[CarResponseSchema])
-async def get_user_cars(db: AsyncSession = Depends(get_db), current_user=Depends(role_required_with_cache(["customer", "admin"]))):
+@router.get("/", response_model=Page[CarResponseSchema])
+async def get_user_cars(page: PageParams = Depends(page_params), db: AsyncSession = Depends(get_db), current_user=Depends(role_required_with_cache(["customer", "admin"]))):
     from sqlalchemy.future import select
-    result = await db.execute(select(Car).where(Car.user_id == current_user.id))
-    return result.scalars().all()
+    rows, next_cursor = await paginate(
+        db, select(*schema_columns(CarResponseSchema, Car)).where(Car.user_id == current_user.id), page, [(Car.id, False)]
+    )
+    return page_response(rows, next_cursor, CarResponseSchema)
 
 @router.put("/{car_id}", response_model=CarResponseSchema)
 async def update_car(car_id: int, car: CarCreateSchema, db: AsyncSession = Depends(get_db), current_user=Depends(role_required_with_cache(["customer", "admin"]))):
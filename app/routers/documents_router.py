@@ -7,8 +7,9 @@ import shutil
 import os
 from fastapi import HTTPException
 from app.utils.auth import role_required_with_cache
+from app.utils.timing import TimedRoute
 
-router = APIRouter(prefix="/documents", tags=["Documents"])
+router = APIRouter(prefix="/documents", tags=["Documents"], route_class=TimedRoute)
 
 UPLOAD_FOLDER = "documents"
 
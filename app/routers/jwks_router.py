@@ -0,0 +1,22 @@
+import hashlib
+import json
+
+from fastapi import APIRouter, Request, Response
+
+from app.config import config
+from app.utils.keys import signing_keys
+from app.utils.timing import TimedRoute
+
+router = APIRouter(tags=["Authentication"], route_class=TimedRoute)
+
+_body = json.dumps(signing_keys.jwks(), separators=(",", ":")).encode()
+_etag = f'"{hashlib.blake2b(_body, digest_size=8).hexdigest()}"'
+
+
+@router.get("/.well-known/jwks.json")
+async def get_jwks(request: Request):
+    """Public keys for verifying access tokens offline (empty for HS256)"""
+    headers = {"Cache-Control": f"public, max-age={config.JWKS_MAX_AGE}", "ETag": _etag}
+    if request.headers.get("if-none-match") == _etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=_body, media_type="application/json", headers=headers)
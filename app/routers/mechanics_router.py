@@ -1,17 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from app.models.mechanic import Mechanic
 from app.schemas.mechanic_schema import MechanicCreateSchema, MechanicResponseSchema, MechanicLoginSchema
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.dependencies.database import get_db
-from typing import List
 from app.utils.auth import admin_required, authenticate_mechanic
 from app.utils.tokens import create_access_token
 from app.utils.password import get_password_hash
-from passlib.context import CryptContext
+from app.dependencies.principal_cache import principal_cache
+from app.dependencies.throttling import login_throttle
+from app.utils.timing import TimedRoute
+from app.utils.pagination import PageParams, page_params, paginate
+from app.schemas.page_schema import Page
+from app.utils.projection import page_response, schema_columns
 
-router = APIRouter(prefix="/mechanics", tags=["Mechanics"])
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+router = APIRouter(prefix="/mechanics", tags=["Mechanics"], route_class=TimedRoute)
 
 @router.post("/", response_model=MechanicResponseSchema)
 async def create_mechanic(mechanic: MechanicCreateSchema, db: AsyncSession = Depends(get_db), current_user=Depends(admin_required)):
@@ -24,7 +26,7 @@ async def create_mechanic(mechanic: MechanicCreateSchema, db: AsyncSession = Dep
         raise HTTPException(status_code=400, detail="Механік з такою поштою вже існує")
     
     # Hash password
-    hashed_password = get_password_hash(mechanic.password)
+    hashed_password = await get_password_hash(mechanic.password)
     mechanic_data = mechanic.model_dump()
     mechanic_data["hashed_password"] = hashed_password
     del mechanic_data["password"]
@@ -36,8 +38,9 @@ async def create_mechanic(mechanic: MechanicCreateSchema, db: AsyncSession = Dep
     return new_mechanic
 
 @router.post("/login")
-async def mechanic_login(login_data: MechanicLoginSchema, db: AsyncSession = Depends(get_db)):
+async def mechanic_login(request: Request, login_data: MechanicLoginSchema, db: AsyncSession = Depends(get_db)):
     """Login for mechanics using email/password from mechanics table"""
+    await login_throttle.enforce(request, login_data.email)
     mechanic = await authenticate_mechanic(db, login_data.email, login_data.password)
     
     if not mechanic:
@@ -47,11 +50,13 @@ async def mechanic_login(login_data: MechanicLoginSchema, db: AsyncSession = Dep
     token = create_access_token(mechanic)
     return {"access_token": token, "token_type": "bearer"}
 
-@router.get("/", response_model=List[MechanicResponseSchema])
-async def get_mechanics(db: AsyncSession = Depends(get_db)):
+@router.get("/", response_model=Page[MechanicResponseSchema])
+async def get_mechanics(page: PageParams = Depends(page_params), db: AsyncSession = Depends(get_db)):
     from sqlalchemy.future import select
-    result = await db.execute(select(Mechanic))
-    return result.scalars().all()
+    rows, next_cursor = await paginate(
+        db, select(*schema_columns(MechanicResponseSchema, Mechanic)), page, [(Mechanic.id, False)]
+    )
+    return page_response(rows, next_cursor, MechanicResponseSchema)
 
 @router.put("/{mechanic_id}", response_model=MechanicResponseSchema)
 async def update_mechanic(mechanic_id: int, mechanic: MechanicCreateSchema, db: AsyncSession = Depends(get_db), current_user=Depends(admin_required)):
@@ -65,7 +70,7 @@ async def update_mechanic(mechanic_id: int, mechanic: MechanicCreateSchema, db:
     # Hash password if it's being changed
     mechanic_data = mechanic.model_dump()
     if mechanic_data.get("password"):
-        mechanic_data["hashed_password"] = get_password_hash(mechanic_data["password"])
+        mechanic_data["hashed_password"] = await get_password_hash(mechanic_data["password"])
         del mechanic_data["password"]
     
     for key, value in mechanic_data.items():
@@ -73,6 +78,7 @@ async def update_mechanic(mechanic_id: int, mechanic: MechanicCreateSchema, db:
     
     await db.commit()
     await db.refresh(db_mechanic)
+    await principal_cache.invalidate("mechanic", db_mechanic.id)
     return db_mechanic
 
 @router.delete("/{mechanic_id}")
@@ -86,4 +92,5 @@ async def delete_mechanic(mechanic_id: int, db: AsyncSession = Depends(get_db),
     
     await db.delete(db_mechanic)
     await db.commit()
+    await principal_cache.invalidate("mechanic", mechanic_id)
     return {"detail": "Механіка видалено"}
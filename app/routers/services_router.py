@@ -3,10 +3,13 @@ from app.models.service import Service
 from app.schemas.service_schema import ServiceCreateSchema, ServiceResponseSchema
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.dependencies.database import get_db
-from typing import List
 from app.utils.auth import admin_required
+from app.utils.timing import TimedRoute
+from app.utils.pagination import PageParams, page_params, paginate
+from app.schemas.page_schema import Page
+from app.utils.projection import page_response, schema_columns
 
-router = APIRouter(prefix="/services", tags=["Services"])
+router = APIRouter(prefix="/services", tags=["Services"], route_class=TimedRoute)
 
 @router.post("/", response_model=ServiceResponseSchema)
 async def create_service(service: ServiceCreateSchema, db: AsyncSession = Depends(get_db), current_user=Depends(admin_required)):
@@ -16,11 +19,13 @@ async def create_service(service: ServiceCreateSchema, db: AsyncSession = Depend
     await db.refresh(new_service)
     return new_service
 
-@router.get("/", response_model=List[ServiceResponseSchema])
-async def get_all_services(db: AsyncSession = Depends(get_db)):
+@router.get("/", response_model=Page[ServiceResponseSchema])
+async def get_all_services(page: PageParams = Depends(page_params), db: AsyncSession = Depends(get_db)):
     from sqlalchemy.future import select
-    result = await db.execute(select(Service))
-    return result.scalars().all()
+    rows, next_cursor = await paginate(
+        db, select(*schema_columns(ServiceResponseSchema, Service)), page, [(Service.id, False)]
+    )
+    return page_response(rows, next_cursor, ServiceResponseSchema)
 
 @router.put("/{service_id}", response_model=ServiceResponseSchema)
 async def update_service(service_id: int, service: ServiceCreateSchema, db: AsyncSession = Depends(get_db), current_user=Depends(admin_required)):
@@ -1,12 +1,13 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.models.user import User
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.user_schema import UserResponseSchema
 from app.dependencies.database import get_db
-from app.utils.auth import role_required_with_cache
+from app.utils.auth import role_required_with_cache, get_principal_entity
+from app.utils.timing import TimedRoute
 
-router = APIRouter(prefix="/users", tags=["Users"])
+router = APIRouter(prefix="/users", tags=["Users"], route_class=TimedRoute)
 
 @router.get("/me", response_model=UserResponseSchema)
-async def get_profile(current_user=Depends(role_required_with_cache(["customer", "mechanic", "admin"]))):
-    return current_user
+async def get_profile(db: AsyncSession = Depends(get_db), current_user=Depends(role_required_with_cache(["customer", "mechanic", "admin"]))):
+    entity = await get_principal_entity(db, current_user)
+    return UserResponseSchema(id=entity.id, full_name=entity.full_name, email=entity.email, role=current_user.role)
@@ -1,6 +1,6 @@
 from app.schemas.base_schema import BaseSchema
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 class AppointmentCreateSchema(BaseSchema):
     car_id: int
@@ -8,6 +8,7 @@ class AppointmentCreateSchema(BaseSchema):
     mechanic_id: Optional[int] = None
     appointment_date: datetime
     status: Optional[str] = "Заплановано"
+    hold_id: Optional[str] = None  # slot hold from POST /appointments/holds, consumed by the booking
 
 class AppointmentResponseSchema(BaseSchema):
     id: int
@@ -20,3 +21,33 @@ class AppointmentResponseSchema(BaseSchema):
 
     class Config:
         from_attributes = True
+
+class AvailabilitySlotSchema(BaseSchema):
+    start: datetime
+    end: datetime
+    mechanic_ids: List[int]
+
+class AvailabilityResponseSchema(BaseSchema):
+    service_id: int
+    duration_minutes: int
+    slots: List[AvailabilitySlotSchema]
+
+class SlotHoldCreateSchema(BaseSchema):
+    service_id: int
+    mechanic_id: int
+    start: datetime
+
+class SlotHoldResponseSchema(BaseSchema):
+    id: str
+    mechanic_id: int
+    start: datetime
+    end: datetime
+    expires_at: datetime
+
+class AutoAssignmentSchema(BaseSchema):
+    appointment_id: int
+    mechanic_id: int
+
+class AutoAssignResponseSchema(BaseSchema):
+    assigned: List[AutoAssignmentSchema]
+    unassigned_ids: List[int]
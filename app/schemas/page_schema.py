@@ -0,0 +1,9 @@
+from typing import Generic, List, Optional, TypeVar
+
+from app.schemas.base_schema import BaseSchema
+
+T = TypeVar("T")
+
+class Page(BaseSchema, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
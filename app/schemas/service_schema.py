@@ -1,17 +1,21 @@
+from typing import Optional
+
 from app.schemas.base_schema import BaseSchema
 
 class ServiceCreateSchema(BaseSchema):
     name: str
-    description: str
+    description: Optional[str] = None
     price: float
-    duration: int
+    duration_minutes: int = 60
+    specialization: Optional[str] = None
 
 class ServiceResponseSchema(BaseSchema):
     id: int
     name: str
-    description: str
+    description: Optional[str] = None
     price: float
-    duration: int
+    duration_minutes: int
+    specialization: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -0,0 +1,264 @@
+import asyncio
+import heapq
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import func, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.config import config
+from app.dependencies.cache import RedisUnavailable, redis_client
+from app.dependencies.database import AsyncSessionLocal, begin_write
+from app.models.appointment import Appointment
+from app.models.mechanic import Mechanic
+from app.models.service import Service
+from app.services.availability import (
+    CANCELLED_STATUS,
+    DEFAULT_DURATION_MINUTES,
+    Availability,
+    booking_end,
+    load_availability,
+    longest_booking,
+    normalize_specialization,
+)
+from app.utils.metrics import metrics
+from app.utils.tokens import get_utc_now
+
+logger = logging.getLogger("app")
+
+MAX_ATTEMPTS = 3
+
+# (appointment id, start, end, required specialization or None)
+Booking = tuple[int, datetime, datetime, Optional[str]]
+
+
+class AssignmentConflict(Exception):
+    """Bookings changed between planning and writing the assignment"""
+
+
+@dataclass
+class AssignmentResult:
+    assignments: dict[int, int] = field(default_factory=dict)  # appointment id -> mechanic id
+    unassigned: list[int] = field(default_factory=list)  # no qualifying mechanic was free
+
+
+def plan_assignments(availability: Availability, specializations: dict[int, Optional[str]], bookings: list[Booking]) -> AssignmentResult:
+    """Greedy plan over the mechanics' schedules; `availability` is updated in place.
+
+    The most constrained bookings go first: fewest qualifying mechanics, then
+    earliest. Each one goes to the qualifying mechanic with the fewest booked
+    minutes who is free for the whole booking. Per specialization, a heap
+    keyed by booked time finds that mechanic without scanning the roster.
+    Heap entries go stale when a mechanic's load changes and are dropped
+    when popped.
+    """
+    load = {mechanic_id: schedule.booked() for mechanic_id, schedule in availability.schedules.items()}
+    groups: dict[Optional[str], list[int]] = defaultdict(list)
+    for mechanic_id in availability.schedules:
+        groups[None].append(mechanic_id)
+        if specializations.get(mechanic_id):
+            groups[specializations[mechanic_id]].append(mechanic_id)
+    heaps = {spec: [(load[mechanic_id], mechanic_id) for mechanic_id in ids] for spec, ids in groups.items()}
+    for heap in heaps.values():
+        heapq.heapify(heap)
+
+    result = AssignmentResult()
+    for appointment_id, start, end, spec in sorted(bookings, key=lambda b: (len(groups.get(b[3], ())), b[1], b[0])):
+        heap = heaps.get(spec, [])
+        busy, chosen = [], None
+        while heap:
+            entry = heapq.heappop(heap)
+            booked, mechanic_id = entry
+            if booked != load[mechanic_id]:
+                continue
+            if availability.schedules[mechanic_id].is_free(start, end):
+                chosen = mechanic_id
+                break
+            busy.append(entry)
+        for entry in busy:
+            heapq.heappush(heap, entry)
+        if chosen is None:
+            result.unassigned.append(appointment_id)
+            continue
+
+        availability.schedules[chosen].add(start, end)
+        load[chosen] += end - start
+        result.assignments[appointment_id] = chosen
+        heapq.heappush(heaps[None], (load[chosen], chosen))
+        if specializations.get(chosen):
+            heapq.heappush(heaps[specializations[chosen]], (load[chosen], chosen))
+    return result
+
+
+def _live():
+    return or_(Appointment.status.is_(None), Appointment.status != CANCELLED_STATUS)
+
+
+async def load_unassigned(db: AsyncSession, start: datetime, end: datetime) -> list[Booking]:
+    duration = func.coalesce(Service.duration_minutes, DEFAULT_DURATION_MINUTES)
+    result = await db.execute(
+        select(Appointment.id, Appointment.appointment_date, Appointment.ends_at, duration, Service.specialization)
+        .join(Service, Service.id == Appointment.service_id)
+        .where(
+            Appointment.mechanic_id.is_(None),
+            Appointment.appointment_date >= start,
+            Appointment.appointment_date < end,
+            _live(),
+        )
+    )
+    return [
+        (appointment_id, booked_at, booking_end(booked_at, ends_at, minutes), normalize_specialization(spec))
+        for appointment_id, booked_at, ends_at, minutes, spec in result.all()
+    ]
+
+
+async def _verify(db: AsyncSession, assignments: dict[int, int], start: datetime, end: datetime):
+    """Raises AssignmentConflict unless every planned booking now has its mechanic and overlaps nothing"""
+    longest = await longest_booking(db, start)
+    duration = func.coalesce(Service.duration_minutes, DEFAULT_DURATION_MINUTES)
+    result = await db.execute(
+        select(Appointment.id, Appointment.mechanic_id, Appointment.appointment_date, Appointment.ends_at, duration)
+        .join(Service, Service.id == Appointment.service_id)
+        .where(
+            Appointment.mechanic_id.in_(set(assignments.values())),
+            Appointment.appointment_date >= start - longest,
+            Appointment.appointment_date < end + longest,
+            _live(),
+        )
+    )
+    intervals = defaultdict(list)
+    owner = {}
+    for appointment_id, mechanic_id, booked_at, ends_at, minutes in result.all():
+        intervals[mechanic_id].append((booked_at, booking_end(booked_at, ends_at, minutes), appointment_id))
+        owner[appointment_id] = mechanic_id
+    if any(owner.get(appointment_id) != mechanic_id for appointment_id, mechanic_id in assignments.items()):
+        raise AssignmentConflict("a planned booking was changed meanwhile")
+    for mechanic_id, mechanic_intervals in intervals.items():
+        # Sweep by start time: an interval overlaps an earlier one iff it starts before the latest end seen
+        latest_end = latest_assigned_end = datetime.min
+        for booked_at, ends_at, appointment_id in sorted(mechanic_intervals):
+            assigned = appointment_id in assignments
+            if booked_at < (latest_end if assigned else latest_assigned_end):
+                raise AssignmentConflict(f"booking {appointment_id} overlaps another booking of mechanic {mechanic_id}")
+            latest_end = max(latest_end, ends_at)
+            if assigned:
+                latest_assigned_end = max(latest_assigned_end, ends_at)
+
+
+async def _assign_once(db: AsyncSession, start: datetime, end: datetime) -> AssignmentResult:
+    bookings = await load_unassigned(db, start, end)
+    if not bookings:
+        return AssignmentResult()
+    window_end = max(booking_end for _, _, booking_end, _ in bookings)
+    availability = await load_availability(db, start, window_end)
+    roster = await db.execute(select(Mechanic.id, Mechanic.specialization))
+    specializations = {mechanic_id: normalize_specialization(spec) for mechanic_id, spec in roster.all()}
+    result = plan_assignments(availability, specializations, bookings)
+    if not result.assignments:
+        return result
+
+    # One executemany UPDATE; a booking assigned by someone else meanwhile is left alone
+    await db.execute(
+        update(Appointment).where(Appointment.mechanic_id.is_(None)).execution_options(synchronize_session=None),
+        [{"id": appointment_id, "mechanic_id": mechanic_id} for appointment_id, mechanic_id in result.assignments.items()],
+    )
+    # Same lock as a single booking (PostgreSQL); on SQLite the UPDATE already holds the write lock
+    await db.execute(
+        select(Mechanic.id).where(Mechanic.id.in_(set(result.assignments.values()))).order_by(Mechanic.id).with_for_update()
+    )
+    await _verify(db, result.assignments, start, window_end)
+    return result
+
+
+async def auto_assign(db: AsyncSession, start: datetime, end: datetime) -> AssignmentResult:
+    """Assigns mechanics to the unassigned bookings starting in [start, end), in one transaction.
+
+    The plan is computed from a read of the current bookings and written
+    optimistically. If a concurrent booking or assignment invalidates it, the
+    transaction is rolled back and the run starts over, up to MAX_ATTEMPTS.
+    """
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        try:
+            await begin_write(db)
+            result = await _assign_once(db, start, end)
+            await db.commit()
+        except AssignmentConflict as e:
+            await db.rollback()
+            metrics.inc("auto_assign.conflicts")
+            logger.warning(f"Auto-assignment attempt {attempt} rolled back: {e}")
+            if attempt == MAX_ATTEMPTS:
+                raise
+            continue
+        except Exception:
+            await db.rollback()
+            raise
+        metrics.inc("auto_assign.assigned", len(result.assignments))
+        metrics.inc("auto_assign.unassigned", len(result.unassigned))
+        if result.assignments or result.unassigned:
+            logger.info(
+                f"Auto-assigned {len(result.assignments)} bookings in {start:%Y-%m-%d %H:%M} - {end:%Y-%m-%d %H:%M}, "
+                f"{len(result.unassigned)} left without a free mechanic"
+            )
+        return result
+
+
+class AutoAssignJob:
+    """Background auto-assignment of the bookings in the next AUTO_ASSIGN_HORIZON_HOURS.
+
+    With several workers a short Redis lock lets one of them run per
+    interval. Without Redis every worker runs, which is still safe: an
+    assignment only ever touches bookings that are unassigned at write time.
+    """
+
+    LOCK_KEY = "auto_assign:lock"
+
+    def __init__(self, interval_minutes: int, horizon_hours: int):
+        self.interval = interval_minutes * 60
+        self.horizon = timedelta(hours=horizon_hours)
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self) -> Optional[AssignmentResult]:
+        try:
+            acquired = await redis_client.run(
+                lambda redis: redis.set(self.LOCK_KEY, "1", nx=True, ex=max(1, self.interval - 1))
+            )
+            if not acquired:
+                return None
+        except RedisUnavailable as e:
+            logger.debug(f"Auto-assignment running without the lock: {e}")
+        start = get_utc_now()  # bookings are compared as naive UTC
+        async with AsyncSessionLocal() as db:
+            return await auto_assign(db, start, start + self.horizon)
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Auto-assignment failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+auto_assign_job = AutoAssignJob(
+    interval_minutes=config.AUTO_ASSIGN_INTERVAL_MINUTES,
+    horizon_hours=config.AUTO_ASSIGN_HORIZON_HOURS,
+)
@@ -0,0 +1,232 @@
+import math
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, Optional
+
+from sqlalchemy import Float, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.future import select
+from sqlalchemy.sql.functions import FunctionElement
+
+from app.config import config
+from app.models.appointment import Appointment
+from app.models.mechanic import Mechanic
+from app.models.service import Service
+
+CANCELLED_STATUS = "Скасовано"
+DEFAULT_DURATION_MINUTES = 60
+
+
+class minutes_between(FunctionElement):
+    """Minutes from the first datetime column to the second; there is no portable SQL for it"""
+
+    type = Float()
+    inherit_cache = True
+
+
+@compiles(minutes_between)
+def _minutes_between(element, compiler, **kw):
+    start, end = (compiler.process(clause, **kw) for clause in element.clauses)
+    return f"EXTRACT(EPOCH FROM {end} - {start}) / 60"
+
+
+@compiles(minutes_between, "sqlite")
+def _minutes_between_sqlite(element, compiler, **kw):
+    start, end = (compiler.process(clause, **kw) for clause in element.clauses)
+    return f"(julianday({end}) - julianday({start})) * 1440"
+
+
+@compiles(minutes_between, "mysql")
+def _minutes_between_mysql(element, compiler, **kw):
+    start, end = (compiler.process(clause, **kw) for clause in element.clauses)
+    return f"TIMESTAMPDIFF(MINUTE, {start}, {end})"
+
+
+class MechanicSchedule:
+    """One mechanic's busy intervals, merged and sorted for O(log n) lookups"""
+
+    __slots__ = ("starts", "ends")
+
+    def __init__(self, intervals: list[tuple[datetime, datetime]]):
+        self.starts: list[datetime] = []
+        self.ends: list[datetime] = []
+        for start, end in sorted(intervals):
+            if self.ends and start <= self.ends[-1]:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def is_free(self, start: datetime, end: datetime) -> bool:
+        i = bisect_right(self.starts, start)
+        if i and self.ends[i - 1] > start:
+            return False
+        return i == len(self.starts) or self.starts[i] >= end
+
+    def add(self, start: datetime, end: datetime):
+        """Books a range already checked with `is_free`"""
+        i = bisect_right(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+
+    def booked(self) -> timedelta:
+        return sum((end - start for start, end in zip(self.starts, self.ends)), timedelta())
+
+
+class IntervalCounter:
+    """Counts intervals overlapping a range; used for bookings without a mechanic"""
+
+    __slots__ = ("starts", "ends")
+
+    def __init__(self, intervals: list[tuple[datetime, datetime]]):
+        self.starts = sorted(start for start, _ in intervals)
+        self.ends = sorted(end for _, end in intervals)
+
+    def overlapping(self, start: datetime, end: datetime) -> int:
+        return bisect_left(self.starts, end) - bisect_right(self.ends, start)
+
+
+@dataclass
+class Availability:
+    """Interval indexes for every active mechanic over one search window.
+
+    A booking without a mechanic still needs someone, so a range is only
+    bookable while more mechanics are free than unassigned bookings overlap it.
+    """
+
+    schedules: dict[int, MechanicSchedule]
+    unassigned: IntervalCounter = field(default_factory=lambda: IntervalCounter([]))
+
+    def free_mechanics(self, start: datetime, end: datetime) -> list[int]:
+        free = [mechanic_id for mechanic_id, schedule in self.schedules.items() if schedule.is_free(start, end)]
+        return free if len(free) > self.unassigned.overlapping(start, end) else []
+
+    def add_busy(self, busy: dict[int, list[tuple[datetime, datetime]]]):
+        """Marks extra intervals per mechanic as taken, e.g. other customers' slot holds"""
+        for mechanic_id, intervals in busy.items():
+            schedule = self.schedules.get(mechanic_id)
+            if schedule is not None:
+                self.schedules[mechanic_id] = MechanicSchedule(list(zip(schedule.starts, schedule.ends)) + intervals)
+
+    def slots(self, start: datetime, end: datetime, duration: timedelta) -> Iterator[tuple[datetime, datetime, list[int]]]:
+        step = timedelta(minutes=config.SLOT_STEP_MINUTES)
+        for day_start, day_end in working_windows(start, end):
+            slot = day_start
+            while slot + duration <= day_end:
+                free = self.free_mechanics(slot, slot + duration)
+                if free:
+                    yield slot, slot + duration, free
+                slot += step
+
+
+def normalize_specialization(value: Optional[str]) -> Optional[str]:
+    value = (value or "").strip().casefold()
+    return value or None
+
+
+def qualifies(mechanic_specialization: Optional[str], required: Optional[str]) -> bool:
+    """Whether a mechanic can take a service needing `required`; a service without one takes anyone"""
+    required = normalize_specialization(required)
+    return required is None or normalize_specialization(mechanic_specialization) == required
+
+
+def to_naive_utc(value: datetime) -> datetime:
+    """Bookings are stored as naive UTC; an offset-aware query parameter is converted to match"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def working_days() -> set[int]:
+    return {int(day) for day in config.WORKING_DAYS.split(",") if day.strip()}
+
+
+def working_windows(start: datetime, end: datetime) -> Iterator[tuple[datetime, datetime]]:
+    """Working hours of each working day, clipped to [start, end); slot starts stay on the step grid"""
+    days = working_days()
+    step = timedelta(minutes=config.SLOT_STEP_MINUTES)
+    day = start.date()
+    while day <= end.date():
+        if day.weekday() in days:
+            opens = datetime.combine(day, config.WORKDAY_START)
+            closes = min(datetime.combine(day, config.WORKDAY_END), end)
+            if start > opens:
+                opens += -((opens - start) // step) * step
+            if opens < closes:
+                yield opens, closes
+        day += timedelta(days=1)
+
+
+def within_working_hours(start: datetime, end: datetime) -> bool:
+    """Whether [start, end) lies inside one working day's hours"""
+    day = start.date()
+    return (
+        day.weekday() in working_days()
+        and datetime.combine(day, config.WORKDAY_START) <= start
+        and end <= datetime.combine(day, config.WORKDAY_END)
+    )
+
+
+async def longest_booking(db: AsyncSession, start: datetime) -> timedelta:
+    """Longest booking still running at `start`; a search that far back sees every booking overlapping it.
+
+    Uses each booking's stored `ends_at`, so shortening a service later does
+    not shorten the bookings already made with it. Rows without `ends_at`
+    count with their service's current duration.
+    """
+    span = func.coalesce(
+        minutes_between(Appointment.appointment_date, Appointment.ends_at),
+        Service.duration_minutes,
+        DEFAULT_DURATION_MINUTES,
+    )
+    result = await db.execute(
+        select(func.max(span))
+        .select_from(Appointment)
+        .outerjoin(Service, Service.id == Appointment.service_id)
+        .where(or_(Appointment.ends_at > start, Appointment.ends_at.is_(None)))
+    )
+    return timedelta(minutes=math.ceil(result.scalar() or DEFAULT_DURATION_MINUTES))
+
+
+def booking_end(booked_at: datetime, ends_at: Optional[datetime], minutes: int) -> datetime:
+    """Stored end of a booking, or its service's current duration for rows saved before `ends_at` existed"""
+    return ends_at or booked_at + timedelta(minutes=minutes)
+
+
+async def load_availability(db: AsyncSession, start: datetime, end: datetime, specialization: Optional[str] = None) -> Availability:
+    """Builds the interval indexes from the bookings that can overlap [start, end).
+
+    Only active mechanics qualified for `specialization` are scheduled.
+    """
+    # The roster is small; reading it whole is cheaper than an index on is_active
+    roster = (await db.execute(select(Mechanic.id, Mechanic.is_active, Mechanic.specialization))).all()
+    mechanic_ids = [
+        mechanic_id for mechanic_id, is_active, mechanic_specialization in roster
+        if is_active is not False and qualifies(mechanic_specialization, specialization)
+    ]
+    longest = await longest_booking(db, start)
+
+    duration = func.coalesce(Service.duration_minutes, DEFAULT_DURATION_MINUTES)
+    result = await db.execute(
+        select(Appointment.mechanic_id, Appointment.appointment_date, Appointment.ends_at, duration)
+        .join(Service, Service.id == Appointment.service_id)
+        .where(
+            or_(Appointment.mechanic_id.in_(mechanic_ids), Appointment.mechanic_id.is_(None)),
+            Appointment.appointment_date >= start - longest,
+            Appointment.appointment_date < end,
+            or_(Appointment.status.is_(None), Appointment.status != CANCELLED_STATUS),
+        )
+    )
+    busy: dict[int, list] = {mechanic_id: [] for mechanic_id in mechanic_ids}
+    unassigned = []
+    for mechanic_id, booked_at, ends_at, minutes in result.all():
+        interval = (booked_at, booking_end(booked_at, ends_at, minutes))
+        if interval[1] <= start:
+            continue
+        (busy[mechanic_id] if mechanic_id is not None else unassigned).append(interval)
+    return Availability(
+        schedules={mechanic_id: MechanicSchedule(intervals) for mechanic_id, intervals in busy.items()},
+        unassigned=IntervalCounter(unassigned),
+    )
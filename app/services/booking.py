@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.appointment import Appointment
+from app.models.mechanic import Mechanic
+from app.models.service import Service
+from app.services.availability import CANCELLED_STATUS, DEFAULT_DURATION_MINUTES, longest_booking, qualifies
+from app.utils.metrics import metrics
+
+
+async def service_duration(db: AsyncSession, service_id: int) -> timedelta:
+    result = await db.execute(select(Service.duration_minutes).where(Service.id == service_id))
+    return timedelta(minutes=result.scalar() or DEFAULT_DURATION_MINUTES)
+
+
+async def lock_mechanic(db: AsyncSession, mechanic_id: int, service_id: int):
+    """Takes the mechanic's row lock so bookings for one mechanic are checked one at a time.
+
+    FOR UPDATE serializes concurrent checks on PostgreSQL; SQLite ignores it,
+    where the write lock taken by begin_write does the same job. The same read
+    checks that the mechanic has the specialization the service needs.
+    """
+    required = select(Service.specialization).where(Service.id == service_id).scalar_subquery()
+    result = await db.execute(select(Mechanic.specialization, required).where(Mechanic.id == mechanic_id).with_for_update())
+    row = result.one_or_none()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Механіка не знайдено")
+    ensure_qualified(*row)
+
+
+def ensure_qualified(mechanic_specialization: Optional[str], required: Optional[str]):
+    if not qualifies(mechanic_specialization, required):
+        raise HTTPException(status_code=422, detail="Механік не має спеціалізації, потрібної для цієї послуги")
+
+
+async def find_overlap(db: AsyncSession, mechanic_id: int, start: datetime, end: datetime, exclude_id: Optional[int] = None) -> Optional[int]:
+    """Id of a live booking of the mechanic overlapping [start, end), if any"""
+    longest = await longest_booking(db, start)
+    query = select(Appointment.id).where(
+        Appointment.mechanic_id == mechanic_id,
+        Appointment.appointment_date >= start - longest,
+        Appointment.appointment_date < end,
+        Appointment.ends_at > start,
+        or_(Appointment.status.is_(None), Appointment.status != CANCELLED_STATUS),
+    )
+    if exclude_id is not None:
+        query = query.where(Appointment.id != exclude_id)
+    return (await db.execute(query.limit(1))).scalar()
+
+
+async def ensure_no_overlap(db: AsyncSession, appointment: Appointment):
+    """Rejects the flushed `appointment` if its mechanic already has a booking overlapping it.
+
+    Runs after the write, inside the same transaction: by then this request
+    holds the write lock (SQLite) or the mechanic's row lock (PostgreSQL), so
+    a competing booking either is already committed and visible here or has
+    to wait for this transaction and will see this one.
+    """
+    if appointment.mechanic_id is None or appointment.status == CANCELLED_STATUS:
+        return
+    if await find_overlap(db, appointment.mechanic_id, appointment.appointment_date, appointment.ends_at, appointment.id):
+        metrics.inc("booking.conflicts")
+        raise HTTPException(status_code=409, detail="Механік уже зайнятий у цей час")
+
+
+async def book(db: AsyncSession, appointment: Appointment, duration: Optional[timedelta] = None) -> Appointment:
+    """Sets `ends_at`, flushes `appointment` and checks it against the mechanic's other bookings.
+
+    Must run inside a transaction the caller commits, or rolls back on error.
+    """
+    if duration is None:
+        duration = await service_duration(db, appointment.service_id)
+    appointment.ends_at = appointment.appointment_date + duration
+    if appointment.mechanic_id is not None:
+        await lock_mechanic(db, appointment.mechanic_id, appointment.service_id)
+    db.add(appointment)
+    await db.flush()
+    await ensure_no_overlap(db, appointment)
+    return appointment
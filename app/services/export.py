@@ -0,0 +1,109 @@
+import csv
+import io
+import logging
+import zlib
+from datetime import datetime
+from typing import AsyncIterator, Literal, Optional
+
+import orjson
+from sqlalchemy import select
+from sqlalchemy.sql import Select
+
+from app.config import config
+from app.dependencies.database import ReadSessionLocal
+from app.models.appointment import Appointment
+from app.models.document import Document
+from app.models.mechanic import Mechanic
+from app.models.user import User
+from app.services.availability import to_naive_utc
+from app.utils.metrics import metrics
+
+logger = logging.getLogger("app")
+
+ExportEntity = Literal["users", "mechanics", "appointments", "documents"]
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+# Exported columns and the column `since` filters on; password hashes never leave the database
+EXPORTS = {
+    "users": (
+        [User.id, User.email, User.full_name, User.phone, User.role, User.is_active,
+         User.last_login, User.created_at, User.updated_at],
+        User.updated_at,
+    ),
+    "mechanics": (
+        [Mechanic.id, Mechanic.email, Mechanic.full_name, Mechanic.phone, Mechanic.specialization,
+         Mechanic.is_active, Mechanic.created_at, Mechanic.updated_at],
+        Mechanic.updated_at,
+    ),
+    "appointments": (
+        [Appointment.id, Appointment.user_id, Appointment.car_id, Appointment.service_id,
+         Appointment.mechanic_id, Appointment.appointment_date, Appointment.status],
+        Appointment.appointment_date,
+    ),
+    "documents": (
+        [Document.id, Document.mechanic_id, Document.type, Document.file_path],
+        None,
+    ),
+}
+
+
+def supports_since(entity: ExportEntity) -> bool:
+    return EXPORTS[entity][1] is not None
+
+
+def export_query(entity: ExportEntity, since: Optional[datetime] = None) -> Select:
+    columns, since_column = EXPORTS[entity]
+    query = select(*columns).order_by(columns[0])
+    if since is not None:
+        # Timestamps are stored as naive UTC; an offset-aware `since` is converted, not truncated
+        query = query.where(since_column >= to_naive_utc(since))
+    return query
+
+
+def _plain(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _ndjson(keys: list, rows) -> bytes:
+    return b"".join(orjson.dumps(dict(zip(keys, row)), option=orjson.OPT_APPEND_NEWLINE) for row in rows)
+
+
+def _csv(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows([_plain(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+
+async def stream_export(query: Select, fmt: ExportFormat, gzip: bool = False) -> AsyncIterator[bytes]:
+    """Encodes `query` chunk by chunk from a server-side cursor.
+
+    Only one batch of EXPORT_BATCH_SIZE rows is held in memory at a time, so
+    memory stays flat regardless of table size. The session is opened here
+    rather than taken from `get_db`, because the body is sent after the
+    request dependencies have been closed.
+    """
+    compressor = zlib.compressobj(config.EXPORT_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if gzip else None
+
+    def encode(data: str | bytes) -> bytes:
+        if isinstance(data, str):
+            data = data.encode()
+        return compressor.compress(data) if compressor else data
+
+    exported = 0
+    async with ReadSessionLocal() as session:
+        result = await session.stream(query.execution_options(yield_per=config.EXPORT_BATCH_SIZE))
+        keys = list(result.keys())
+        if fmt == "csv":
+            yield encode(_csv([keys]))
+        async for rows in result.partitions():
+            exported += len(rows)
+            chunk = encode(_ndjson(keys, rows) if fmt == "ndjson" else _csv(rows))
+            if chunk:
+                yield chunk
+    if compressor:
+        yield compressor.flush()
+
+    metrics.inc("export.rows", exported)
+    logger.info(f"Exported {exported} rows as {fmt}{' (gzip)' if gzip else ''}")
@@ -0,0 +1,150 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import config
+from app.dependencies.database import AsyncSessionLocal, begin_write
+from app.utils.metrics import metrics
+
+logger = logging.getLogger("app")
+
+Mutation = Callable[[AsyncSession], Awaitable[Any]]
+
+
+class GroupCommitWriter:
+    """Single writer task that applies concurrent mutations in one transaction.
+
+    A mutation is an async callable that only touches the session it is given
+    (add, update, flush - never commit) and can safely run twice. The batch is
+    applied optimistically with one flush and one commit; if anything fails it
+    is rolled back and replayed with a SAVEPOINT per mutation, so only the
+    failing callers get an exception. Requests that arrive while a batch is
+    being committed form the next batch, so SQLite pays one commit per batch
+    instead of per request.
+
+    Disabled (the default), `run` applies the mutation to the request session
+    and commits it straight away.
+    """
+
+    def __init__(self, enabled: bool, max_batch: int, max_delay: float):
+        self.enabled = enabled
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def run(self, db: AsyncSession, mutation: Mutation):
+        if self._task is None:
+            try:
+                await begin_write(db)
+                result = await mutation(db)
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
+            return result
+
+        # Hand the request's connection back before waiting, or a burst of queued
+        # requests holds the whole pool and the writer cannot get a connection
+        if db.in_transaction():
+            await db.commit()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((mutation, future))
+        return await future
+
+    async def _next_batch(self) -> tuple[list, bool]:
+        """Waits for one mutation, then drains whatever else is queued"""
+        loop = asyncio.get_running_loop()
+        item = await self._queue.get()
+        if item is None:
+            return [], True
+        batch = [item]
+        deadline = loop.time() + self.max_delay
+        while len(batch) < self.max_batch:
+            try:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _apply_isolated(self, session: AsyncSession, batch: list) -> list:
+        applied = []
+        for mutation, future in batch:
+            try:
+                async with session.begin_nested():
+                    result = await mutation(session)
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                applied.append((future, result))
+        return applied
+
+    async def _apply(self, batch: list):
+        batch = [(mutation, future) for mutation, future in batch if not future.done()]
+        async with AsyncSessionLocal() as session:
+            await begin_write(session)
+            try:
+                applied = [(future, await mutation(session)) for mutation, future in batch]
+                await session.flush()
+            except Exception:
+                await session.rollback()
+                metrics.inc("group_commit.replays")
+                await begin_write(session)
+                applied = await self._apply_isolated(session, batch)
+            try:
+                await session.commit()
+            except Exception as e:
+                logger.error(f"Group commit of {len(applied)} mutations failed: {e}")
+                for future, _ in applied:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+        metrics.inc("group_commit.batches")
+        metrics.inc("group_commit.mutations", len(applied))
+        for future, result in applied:
+            if not future.done():
+                future.set_result(result)
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = await self._next_batch()
+            if batch:
+                try:
+                    await self._apply(batch)
+                except Exception as e:
+                    logger.error(f"Group commit writer error: {e}")
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+
+    def start(self):
+        if self.enabled and self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        # Requests queued before shutdown are still applied, later ones commit directly
+        if self._task is not None:
+            task, self._task = self._task, None
+            await self._queue.put(None)
+            await task
+
+
+group_commit = GroupCommitWriter(
+    enabled=config.GROUP_COMMIT_ENABLED,
+    max_batch=config.GROUP_COMMIT_MAX_BATCH,
+    max_delay=config.GROUP_COMMIT_MAX_DELAY_MS / 1000,
+)
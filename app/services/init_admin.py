@@ -26,7 +26,7 @@ async def create_initial_admin():
             admin_user = User(
                 full_name="System Administrator",
                 email="admin@example.com",
-                hashed_password=get_password_hash("admin123"),
+                hashed_password=await get_password_hash("admin123"),
                 role="admin",
                 is_active=True
             )
@@ -63,7 +63,7 @@ async def create_initial_admin_mechanic():
             admin_mechanic = Mechanic(
                 full_name="John Mechanic",
                 email="mechanic@example.com",
-                hashed_password=get_password_hash("mechanic123"),
+                hashed_password=await get_password_hash("mechanic123"),
                 specialization="General Repair",
                 is_active=True
             )
@@ -0,0 +1,93 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import insert, update
+
+from app.config import config
+from app.dependencies.database import AsyncSessionLocal
+from app.models.login_activity import LoginActivity
+from app.models.user import User
+
+logger = logging.getLogger("app")
+
+
+class LoginActivityBuffer:
+    """Write-behind buffer for login bookkeeping.
+
+    Logins only append to an in-memory list; a background task writes the
+    batch in one transaction (bulk UPDATE of users.last_login plus bulk INSERT
+    into login_activity) every `flush_interval` seconds or once `flush_size`
+    events are queued, and once more on shutdown.
+    """
+
+    def __init__(self, flush_interval: float, flush_size: int):
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self._events: list[tuple[int, Optional[str], datetime]] = []
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, user_id: int, ip_address: Optional[str], logged_in_at: datetime):
+        self._events.append((user_id, ip_address, logged_in_at))
+        if len(self._events) >= self.flush_size:
+            self._wakeup.set()
+
+    async def flush(self):
+        events, self._events = self._events, []
+        if not events:
+            return
+
+        last_login: dict[int, datetime] = {}
+        for user_id, _, logged_in_at in events:
+            last_login[user_id] = max(logged_in_at, last_login.get(user_id, logged_in_at))
+
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(User),
+                    [{"id": user_id, "last_login": value} for user_id, value in last_login.items()],
+                )
+                await db.execute(
+                    insert(LoginActivity),
+                    [
+                        {"user_id": user_id, "ip_address": ip_address, "logged_in_at": logged_in_at}
+                        for user_id, ip_address, logged_in_at in events
+                    ],
+                )
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Failed to flush {len(events)} login events: {e}")
+            # Keep the events for the next attempt, but never grow without bound
+            self._events = (events + self._events)[-self.flush_size * 10:]
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self):
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        # Let an in-progress flush finish instead of cancelling it halfway
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+
+login_activity = LoginActivityBuffer(
+    flush_interval=config.LOGIN_ACTIVITY_FLUSH_INTERVAL,
+    flush_size=config.LOGIN_ACTIVITY_FLUSH_SIZE,
+)
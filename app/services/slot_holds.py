@@ -0,0 +1,215 @@
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from app.config import config
+from app.dependencies.cache import RedisUnavailable, redis_client
+from app.services.availability import working_windows
+from app.utils.metrics import metrics
+
+logger = logging.getLogger("app")
+
+EPOCH = datetime(1970, 1, 1)
+
+PLACED, HELD_BY_OTHER, TOO_MANY_HOLDS, NOT_FOUND = 1, -1, -2, -3
+
+# Holds live in one sorted set per mechanic and day, scored by expiry time, so an
+# expired hold is just a member below `now` and pruning is one ZREMRANGEBYSCORE.
+# Members are "start:end:user_id:token" in epoch seconds.
+PLACE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local ttl = tonumber(ARGV[2])
+local start, finish, user = tonumber(ARGV[3]), tonumber(ARGV[4]), ARGV[5]
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', now)
+for _, member in ipairs(redis.call('ZRANGE', KEYS[1], 0, -1)) do
+    local held_start, held_end, owner = string.match(member, '^(%d+):(%d+):(%d+):')
+    if owner ~= user and tonumber(held_start) < finish and tonumber(held_end) > start then
+        return -1
+    end
+end
+if redis.call('ZCARD', KEYS[2]) >= tonumber(ARGV[7]) then
+    return -2
+end
+redis.call('ZADD', KEYS[1], now + ttl, ARGV[3] .. ':' .. ARGV[4] .. ':' .. user .. ':' .. ARGV[6])
+redis.call('ZADD', KEYS[2], now + ttl, ARGV[6])
+redis.call('PEXPIRE', KEYS[1], ttl)
+redis.call('PEXPIRE', KEYS[2], ttl)
+return 1
+"""
+
+# Booking check: the caller's own hold (if any, on the first day's key) must still
+# be live and no other customer may hold an overlapping interval on any of the days
+CHECK_SCRIPT = """
+local now = tonumber(ARGV[1])
+local start, finish, user = tonumber(ARGV[2]), tonumber(ARGV[3]), ARGV[4]
+if ARGV[5] ~= '' then
+    local expires = redis.call('ZSCORE', KEYS[1], ARGV[5])
+    if not expires or tonumber(expires) <= now then
+        return -3
+    end
+end
+for _, key in ipairs(KEYS) do
+    for _, member in ipairs(redis.call('ZRANGEBYSCORE', key, '(' .. now, '+inf')) do
+        local held_start, held_end, owner = string.match(member, '^(%d+):(%d+):(%d+):')
+        if owner ~= user and tonumber(held_start) < finish and tonumber(held_end) > start then
+            return -1
+        end
+    end
+end
+return 1
+"""
+
+
+def _seconds(value: datetime) -> int:
+    return int((value.replace(tzinfo=None) - EPOCH).total_seconds())
+
+
+def _datetime(seconds: int) -> datetime:
+    return EPOCH + timedelta(seconds=seconds)
+
+
+@dataclass
+class SlotHold:
+    """A reserved (mechanic, interval); the id carries everything needed to find it again"""
+
+    mechanic_id: int
+    start: datetime
+    end: datetime
+    token: str
+
+    @property
+    def id(self) -> str:
+        return f"{self.mechanic_id}:{_seconds(self.start)}:{_seconds(self.end)}:{self.token}"
+
+    @classmethod
+    def parse(cls, hold_id: str) -> Optional["SlotHold"]:
+        try:
+            mechanic_id, start, end, token = hold_id.split(":")
+            return cls(int(mechanic_id), _datetime(int(start)), _datetime(int(end)), token)
+        except ValueError:
+            return None
+
+    def member(self, user_id: int) -> str:
+        return f"{_seconds(self.start)}:{_seconds(self.end)}:{user_id}:{self.token}"
+
+
+class SlotHolds:
+    """Short-lived per-customer reservations of a mechanic's time, kept in Redis.
+
+    A hold blocks other customers from holding or booking an overlapping
+    interval with the same mechanic until it expires or is consumed by
+    POST /appointments/. Each placement or check is one Lua script over a
+    single small key, so holds stay cheap under heavy checkout traffic.
+    Holds are advisory: the database overlap check is what prevents double
+    booking, so while Redis is unavailable bookings go ahead without them.
+    """
+
+    def __init__(self, ttl: int, max_per_user: int):
+        self.ttl = ttl
+        self.max_per_user = max_per_user
+        self._scripts = {}
+
+    @staticmethod
+    def _key(mechanic_id: int, day) -> str:
+        # Keyed by the start day: holds are placed within one working day, so never cross midnight
+        return f"slot_holds:{mechanic_id}:{day.isoformat()}"
+
+    def _keys(self, mechanic_id: int, start: datetime, end: datetime) -> list[str]:
+        """Keys of every day [start, end) touches, for a booking that runs past midnight"""
+        day, last_day = start.date(), max(start, end - timedelta(microseconds=1)).date()
+        keys = [self._key(mechanic_id, day)]
+        while day < last_day:
+            day += timedelta(days=1)
+            keys.append(self._key(mechanic_id, day))
+        return keys
+
+    @staticmethod
+    def _user_key(user_id: int) -> str:
+        return f"slot_holds:user:{user_id}"
+
+    def _script(self, redis, source: str):
+        script = self._scripts.get(source)
+        if script is None or script.registered_client is not redis:
+            script = self._scripts[source] = redis.register_script(source)
+        return script
+
+    async def place(self, user_id: int, mechanic_id: int, start: datetime, end: datetime) -> tuple[int, Optional[SlotHold]]:
+        """Returns PLACED and the hold, or HELD_BY_OTHER / TOO_MANY_HOLDS and None"""
+        hold = SlotHold(mechanic_id, start, end, uuid.uuid4().hex[:16])
+
+        async def call(redis):
+            return await self._script(redis, PLACE_SCRIPT)(
+                keys=[self._key(mechanic_id, start.date()), self._user_key(user_id)],
+                args=[int(time.time() * 1000), self.ttl * 1000, _seconds(start), _seconds(end),
+                      user_id, hold.token, self.max_per_user],
+            )
+
+        outcome = int(await redis_client.run(call))
+        metrics.inc("slot_holds.placed" if outcome == PLACED else "slot_holds.rejected")
+        return outcome, hold if outcome == PLACED else None
+
+    async def check(self, user_id: int, mechanic_id: int, start: datetime, end: datetime, hold: Optional[SlotHold] = None) -> int:
+        """PLACED if the user may book [start, end) with the mechanic, else HELD_BY_OTHER or NOT_FOUND.
+
+        Falls back to PLACED while Redis is unavailable.
+        """
+        try:
+            outcome = await redis_client.run(lambda redis: self._script(redis, CHECK_SCRIPT)(
+                keys=self._keys(mechanic_id, start, end),
+                args=[int(time.time() * 1000), _seconds(start), _seconds(end), user_id,
+                      hold.member(user_id) if hold else ""],
+            ))
+        except RedisUnavailable as e:
+            metrics.inc("slot_holds.fallback")
+            logger.warning(f"Slot hold check skipped: {e}")
+            return PLACED
+        return int(outcome)
+
+    async def release(self, user_id: int, hold: SlotHold):
+        """Drops a consumed or abandoned hold; an unreleased one still expires on its own"""
+        try:
+            async with redis_client.pipeline() as pipe:
+                pipe.zrem(self._key(hold.mechanic_id, hold.start.date()), hold.member(user_id))
+                pipe.zrem(self._user_key(user_id), hold.token)
+        except RedisUnavailable as e:
+            logger.warning(f"Slot hold {hold.id} not released: {e}")
+
+    async def held_intervals(self, mechanic_ids: Iterable[int], start: datetime, end: datetime, user_id: int) -> dict[int, list]:
+        """Live holds of other customers overlapping [start, end), per mechanic"""
+        mechanic_ids = list(mechanic_ids)
+        days = [day_start.date() for day_start, _ in working_windows(start, end)]
+        if not mechanic_ids or not days:
+            return {}
+        keys = [(mechanic_id, self._key(mechanic_id, day)) for mechanic_id in mechanic_ids for day in days]
+        now = int(time.time() * 1000)
+
+        async def read(redis):
+            # One round trip for every mechanic and day in the window
+            pipe = redis.pipeline(transaction=False)
+            for _, key in keys:
+                pipe.zrangebyscore(key, f"({now}", "+inf")
+            return await pipe.execute()
+
+        try:
+            replies = await redis_client.run(read)
+        except RedisUnavailable as e:
+            metrics.inc("slot_holds.fallback")
+            logger.warning(f"Availability served without slot holds: {e}")
+            return {}
+
+        held: dict[int, list] = {}
+        owner_id = str(user_id)
+        for (mechanic_id, _), members in zip(keys, replies):
+            for member in members:
+                held_start, held_end, owner, _ = member.split(":")
+                held_start, held_end = _datetime(int(held_start)), _datetime(int(held_end))
+                if owner != owner_id and held_start < end and held_end > start:
+                    held.setdefault(mechanic_id, []).append((held_start, held_end))
+        return held
+
+
+slot_holds = SlotHolds(ttl=config.SLOT_HOLD_TTL_SECONDS, max_per_user=config.SLOT_HOLD_MAX_PER_USER)
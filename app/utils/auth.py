@@ -1,20 +1,19 @@
-from http.cookies import SimpleCookie
 from typing import List
 
-from fastapi import Depends, HTTPException, Request, WebSocket, status
-from passlib.context import CryptContext
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.sql import func
-from fastapi.security import OAuth2PasswordBearer
 
-from app.dependencies.cache import redis_client
+from app.dependencies.cache import RedisUnavailable, redis_client
 from app.dependencies.database import get_db
-from app.models.user import User
+from app.dependencies.principal_cache import Principal, principal_cache
+from app.dependencies.revocation import revocation_list
 from app.models.mechanic import Mechanic
-from app.utils.tokens import decode_jwt_token
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.models.user import User
+from app.utils.hashing import verify_password
+from app.utils.timing import timed
+from app.utils.tokens import decode_principal_token
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/sign-in-swagger")
 
@@ -38,7 +37,7 @@ async def get_current_user_id(request: Request) -> int:
     if not token:
         raise HTTPException(status_code=401, detail="Not authenticated")
 
-    token_data = decode_jwt_token(token)
+    token_data = decode_principal_token(token)
     user_id = int(token_data["id"])
     return user_id
 
@@ -48,7 +47,7 @@ async def authenticate_user(db: AsyncSession, email: str, password: str) -> User
     result = await db.execute(select(User).where(User.email == email.lower()))
     user = result.scalar_one_or_none()
 
-    if not user or not pwd_context.verify(password, user.hashed_password):
+    if not user or not await verify_password(password, user.hashed_password):
         return None
     return user
 
@@ -58,16 +57,15 @@ async def authenticate_mechanic(db: AsyncSession, email: str, password: str) ->
     result = await db.execute(select(Mechanic).where(Mechanic.email == email.lower()))
     mechanic = result.scalar_one_or_none()
 
-    if not mechanic or not pwd_context.verify(password, mechanic.hashed_password):
+    if not mechanic or not await verify_password(password, mechanic.hashed_password):
         return None
     return mechanic
 
 
 async def get_user_from_token(token: str, db: AsyncSession):
-    token_data = decode_jwt_token(token)
+    token_data = decode_principal_token(token)
     user_type = token_data.get("type", "user")
     user_id = int(token_data["id"])
-    role = token_data.get("role")
     if user_type == "user":
         user = await db.get(User, user_id)
         if not user:
@@ -79,70 +77,100 @@ async def get_user_from_token(token: str, db: AsyncSession):
             raise HTTPException(status_code=404, detail="Mechanic not found")
         return mechanic
 
+
+async def get_principal(token: str, db: AsyncSession) -> Principal:
+    """Resolves the token to a cached principal, loading it from the DB on a miss.
+
+    Works without Redis: the JWT check, the local revocation filter and the
+    local principal tier are enough to authenticate while the breaker is open.
+    """
+    with timed("auth"):
+        return await _resolve_principal(token, db)
+
+
+async def _resolve_principal(token: str, db: AsyncSession) -> Principal:
+    token_data = decode_principal_token(token)
+    if await revocation_list.is_revoked(token_data["jti"]):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    principal = await principal_cache.get(token)
+    if principal is None:
+        principal = Principal.from_entity(await get_user_from_token(token, db))
+        try:
+            async with redis_client.pipeline() as pipe:
+                principal_cache.set(token, principal, pipe)
+        except RedisUnavailable:
+            pass
+    if not principal.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Your account is blocked or inactive",
+        )
+    return principal
+
+
+async def get_principal_entity(db: AsyncSession, principal: Principal) -> User | Mechanic:
+    """Loads the full User or Mechanic row for handlers that need more than the principal"""
+    model = User if principal.type == "user" else Mechanic
+    entity = await db.get(model, principal.id)
+    if not entity:
+        raise HTTPException(status_code=404, detail=f"{model.__name__} not found")
+    return entity
+
+
 async def admin_required(
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db),
-    redis = Depends(redis_client.get_redis),
-):
-    cache_key = f"admin_check:{token}"
-    cached = await redis.get(cache_key)
-    # Ignore cache for user object, always return full user
-    user = await get_user_from_token(token, db)
+) -> Principal:
+    user = await get_principal(token, db)
     if user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Access denied: Admin role required",
         )
-    await redis.set(cache_key, f"{user.id}:{user.role}", ex=300)
     return user
 
+
 async def mechanic_required(
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db),
-    redis = Depends(redis_client.get_redis),
-):
-    cache_key = f"mechanic_check:{token}"
-    cached = await redis.get(cache_key)
-    user = await get_user_from_token(token, db)
+) -> Principal:
+    user = await get_principal(token, db)
     if user.role not in ["mechanic", "admin"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Access denied: Mechanic or Admin role required",
         )
-    await redis.set(cache_key, f"{user.id}:{user.role}", ex=300)
     return user
 
+
 async def customer_required(
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db),
-    redis = Depends(redis_client.get_redis),
-):
-    cache_key = f"customer_check:{token}"
-    cached = await redis.get(cache_key)
-    user = await get_user_from_token(token, db)
+) -> Principal:
+    user = await get_principal(token, db)
     if user.role not in ["customer", "mechanic", "admin"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Access denied: Customer, Mechanic or Admin role required",
         )
-    await redis.set(cache_key, f"{user.id}:{user.role}", ex=300)
     return user
 
+
 # Generic role checker with cache
 def role_required_with_cache(roles: List[str]):
     async def dependency(
         token: str = Depends(oauth2_scheme),
         db: AsyncSession = Depends(get_db),
-        redis = Depends(redis_client.get_redis),
-    ):
-        cache_key = f"role_check:{'-'.join(roles)}:{token}"
-        cached = await redis.get(cache_key)
-        user = await get_user_from_token(token, db)
+    ) -> Principal:
+        user = await get_principal(token, db)
         if user.role not in roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Access denied: Required roles: {roles}",
             )
-        await redis.set(cache_key, f"{user.id}:{user.role}", ex=300)
         return user
     return dependency
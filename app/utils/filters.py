@@ -0,0 +1,84 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Literal, Optional
+
+from fastapi import Query
+from sqlalchemy.sql import Select
+
+from app.models.appointment import Appointment
+from app.services.availability import to_naive_utc
+from app.utils.pagination import OrderBy
+
+AppointmentSort = Literal["date", "-date", "id", "-id"]
+
+# Every order ends with the primary key so keyset cursors stay unique
+APPOINTMENT_SORTS: dict[str, OrderBy] = {
+    "date": [(Appointment.appointment_date, False), (Appointment.id, False)],
+    "-date": [(Appointment.appointment_date, True), (Appointment.id, True)],
+    "id": [(Appointment.id, False)],
+    "-id": [(Appointment.id, True)],
+}
+
+
+@dataclass
+class AppointmentFilters:
+    """Appointment list filters pushed down to SQL.
+
+    Equality on user_id, mechanic_id or a single status combined with a date
+    window and `date` sorting is served by the matching (<column>,
+    appointment_date) index as a range read.
+    """
+
+    status: Optional[List[str]] = None
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
+    mechanic_id: Optional[int] = None
+    service_id: Optional[int] = None
+    user_id: Optional[int] = None
+    unassigned: bool = False
+    sort: Optional[AppointmentSort] = None
+
+    def apply(self, query: Select) -> Select:
+        if self.status:
+            query = query.where(
+                Appointment.status == self.status[0] if len(self.status) == 1 else Appointment.status.in_(self.status)
+            )
+        if self.date_from is not None:
+            query = query.where(Appointment.appointment_date >= self.date_from)
+        if self.date_to is not None:
+            query = query.where(Appointment.appointment_date < self.date_to)
+        if self.mechanic_id is not None:
+            query = query.where(Appointment.mechanic_id == self.mechanic_id)
+        if self.service_id is not None:
+            query = query.where(Appointment.service_id == self.service_id)
+        if self.user_id is not None:
+            query = query.where(Appointment.user_id == self.user_id)
+        if self.unassigned:
+            query = query.where(Appointment.mechanic_id.is_(None))
+        return query
+
+    def order_by(self, default: AppointmentSort) -> OrderBy:
+        return APPOINTMENT_SORTS[self.sort or default]
+
+
+def appointment_filters(
+    status: Optional[List[str]] = Query(None, description="Repeat to match any of several statuses"),
+    date_from: Optional[datetime] = Query(None, description="appointment_date >= date_from"),
+    date_to: Optional[datetime] = Query(None, description="appointment_date < date_to"),
+    mechanic_id: Optional[int] = Query(None),
+    service_id: Optional[int] = Query(None),
+    user_id: Optional[int] = Query(None),
+    unassigned: bool = Query(False, description="Only appointments without a mechanic"),
+    sort: Optional[AppointmentSort] = Query(None, description="date, -date, id or -id"),
+) -> AppointmentFilters:
+    return AppointmentFilters(
+        status=status,
+        # appointment_date is naive UTC; an offset-aware bound is converted, not truncated
+        date_from=to_naive_utc(date_from) if date_from is not None else None,
+        date_to=to_naive_utc(date_to) if date_to is not None else None,
+        mechanic_id=mechanic_id,
+        service_id=service_id,
+        user_id=user_id,
+        unassigned=unassigned,
+        sort=sort,
+    )
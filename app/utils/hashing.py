@@ -0,0 +1,97 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from app.config import config
+from app.utils.metrics import metrics
+
+logger = logging.getLogger("app")
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+# Executed inside the pool; module-level so they can be pickled for a process pool
+def _hash(password: str) -> tuple[str, float]:
+    started = time.perf_counter()
+    hashed = pwd_context.hash(password)
+    return hashed, time.perf_counter() - started
+
+
+def _verify(password: str, hashed_password: str) -> tuple[bool, float]:
+    started = time.perf_counter()
+    valid = pwd_context.verify(password, hashed_password)
+    return valid, time.perf_counter() - started
+
+
+class HashingPool:
+    """Runs bcrypt off the event loop with a bounded admission queue.
+
+    At most `size` hashes run at once and at most `queue_size` more wait for a
+    worker; anything beyond that is rejected with 503 instead of piling up.
+    """
+
+    def __init__(self, kind: str, size: int, queue_size: int):
+        self.kind = kind
+        self.size = size
+        self.queue_size = queue_size
+        self._executor: Executor | None = None
+        self._pending = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.size)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="bcrypt")
+        return self._executor
+
+    def _update_gauges(self):
+        metrics.set_gauge("hashing.in_flight", self._pending)
+        metrics.set_gauge("hashing.queue_depth", max(0, self._pending - self.size))
+
+    async def run(self, func, *args):
+        if self._pending >= self.size + self.queue_size:
+            metrics.inc("hashing.rejected")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, try again later",
+                headers={"Retry-After": "1"},
+            )
+        self._pending += 1
+        self._update_gauges()
+        submitted = time.perf_counter()
+        try:
+            result, elapsed = await asyncio.get_running_loop().run_in_executor(
+                self._get_executor(), func, *args
+            )
+        finally:
+            self._pending -= 1
+            self._update_gauges()
+        metrics.observe("hashing.hash_time", elapsed)
+        metrics.observe("hashing.wait_time", time.perf_counter() - submitted - elapsed)
+        return result
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+            logger.info("🔴 Hashing pool stopped")
+
+
+hashing_pool = HashingPool(
+    kind=config.HASH_POOL_KIND,
+    size=config.HASH_POOL_SIZE,
+    queue_size=config.HASH_POOL_QUEUE_SIZE,
+)
+
+
+async def hash_password(password: str) -> str:
+    return await hashing_pool.run(_hash, password)
+
+
+async def verify_password(password: str, hashed_password: str) -> bool:
+    return await hashing_pool.run(_verify, password, hashed_password)
@@ -0,0 +1,91 @@
+import logging
+from pathlib import Path
+from typing import Any, Optional
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from jwt.api_jws import PyJWS
+
+from app.config import config
+
+logger = logging.getLogger("app")
+
+ASYMMETRIC_ALGORITHMS = {"EdDSA", "RS256"}
+
+
+class SigningKeys:
+    """JWT signing and verification keys with rotation support.
+
+    For HS256 the shared SECRET_KEY is used and nothing is published. For
+    EdDSA/RS256 every `<kid>.pem` file in JWT_KEYS_DIR is loaded: private keys
+    can sign, public-only keys are kept for verifying tokens issued before a
+    rotation. JWT_ACTIVE_KID picks the signing key and all public keys are
+    published as a JWKS document.
+    """
+
+    def __init__(self, algorithm: str, keys_dir: Optional[str], active_kid: Optional[str]):
+        self.algorithm = algorithm
+        self.active_kid: Optional[str] = None
+        self._private: dict[str, Any] = {}
+        self._public: dict[str, Any] = {}
+        self._jwks: dict = {"keys": []}
+        if algorithm in ASYMMETRIC_ALGORITHMS:
+            self._load(keys_dir, active_kid)
+
+    def _load(self, keys_dir: Optional[str], active_kid: Optional[str]):
+        for path in sorted(Path(keys_dir).glob("*.pem")) if keys_dir else []:
+            data = path.read_bytes()
+            if b"PRIVATE KEY" in data:
+                private_key = serialization.load_pem_private_key(data, password=None)
+                self._private[path.stem] = private_key
+                self._public[path.stem] = private_key.public_key()
+            else:
+                self._public[path.stem] = serialization.load_pem_public_key(data)
+
+        if not self._private:
+            if config.ENVIRONMENT != "development":
+                raise RuntimeError(f"{self.algorithm} signing needs a private key in JWT_KEYS_DIR")
+            logger.warning("⚠️  No JWT keys configured, using an ephemeral development key")
+            if self.algorithm == "EdDSA":
+                private_key = ed25519.Ed25519PrivateKey.generate()
+            else:
+                private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+            self._private["dev"] = private_key
+            self._public["dev"] = private_key.public_key()
+
+        self.active_kid = active_kid or sorted(self._private)[-1]
+        if self.active_kid not in self._private:
+            raise RuntimeError(f"JWT_ACTIVE_KID '{self.active_kid}' has no private key in JWT_KEYS_DIR")
+
+        jwk_algorithm = PyJWS().get_algorithm_by_name(self.algorithm)
+        self._jwks = {
+            "keys": [
+                {**jwk_algorithm.to_jwk(public_key, as_dict=True), "kid": kid, "alg": self.algorithm, "use": "sig"}
+                for kid, public_key in self._public.items()
+            ]
+        }
+
+    @property
+    def signing_key(self):
+        if self.active_kid is None:
+            return config.SECRET_KEY
+        return self._private[self.active_kid]
+
+    @property
+    def headers(self) -> Optional[dict]:
+        return {"kid": self.active_kid} if self.active_kid else None
+
+    def verification_key(self, kid: Optional[str]):
+        if self.algorithm not in ASYMMETRIC_ALGORITHMS:
+            return config.SECRET_KEY
+        return self._public.get(kid)
+
+    def jwks(self) -> dict:
+        return self._jwks
+
+
+signing_keys = SigningKeys(
+    algorithm=config.ALGORITHM,
+    keys_dir=config.JWT_KEYS_DIR,
+    active_kid=config.JWT_ACTIVE_KID,
+)
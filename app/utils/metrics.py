@@ -0,0 +1,55 @@
+import threading
+from collections import defaultdict, deque
+
+
+class Metrics:
+    """Minimal in-process metrics registry: counters, gauges and timings"""
+
+    def __init__(self, window: int = 1024):
+        self._lock = threading.Lock()
+        self._window = window
+        self._counters: dict[str, float] = defaultdict(float)
+        self._gauges: dict[str, float] = {}
+        self._timings: dict[str, dict] = {}
+
+    def inc(self, name: str, value: float = 1):
+        with self._lock:
+            self._counters[name] += value
+
+    def set_gauge(self, name: str, value: float):
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            timing = self._timings.get(name)
+            if timing is None:
+                timing = self._timings[name] = {
+                    "count": 0, "total": 0.0, "max": 0.0, "recent": deque(maxlen=self._window),
+                }
+            timing["count"] += 1
+            timing["total"] += seconds
+            timing["max"] = max(timing["max"], seconds)
+            timing["recent"].append(seconds)
+
+    def snapshot(self) -> dict:
+        """Returns all values; timing percentiles cover the last `window` observations"""
+        with self._lock:
+            timings = {}
+            for name, timing in self._timings.items():
+                recent = sorted(timing["recent"])
+                timings[name] = {
+                    "count": timing["count"],
+                    "avg": timing["total"] / timing["count"],
+                    "max": timing["max"],
+                    "p50": recent[int(len(recent) * 0.50)],
+                    "p99": recent[min(len(recent) - 1, int(len(recent) * 0.99))],
+                }
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "timings": timings,
+            }
+
+
+metrics = Metrics()
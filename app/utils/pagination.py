@@ -0,0 +1,101 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Sequence
+
+from fastapi import HTTPException, Query
+from sqlalchemy import DateTime, and_, literal, or_, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.config import config
+
+# (column, descending) pairs; the last column must be unique, e.g. the primary key
+OrderBy = Sequence[tuple]
+
+
+@dataclass
+class PageParams:
+    limit: int
+    cursor: Optional[str]
+
+
+def page_params(
+    limit: int = Query(None, ge=1, le=config.PAGE_SIZE_MAX, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+) -> PageParams:
+    return PageParams(limit=limit or config.PAGE_SIZE_DEFAULT, cursor=cursor)
+
+
+def _order_tag(order_by: OrderBy) -> str:
+    return ",".join(f"{'-' if descending else ''}{column.key}" for column, descending in order_by)
+
+
+def encode_cursor(values: list, order_by: OrderBy) -> str:
+    """Sort key of the last row, tagged with the order it belongs to"""
+    payload = json.dumps(
+        [_order_tag(order_by), *[value.isoformat() if isinstance(value, datetime) else value for value in values]],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, order_by: OrderBy) -> list:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(payload, list) or payload[:1] != [_order_tag(order_by)]:
+            raise ValueError("cursor belongs to a different sort order")
+        values = payload[1:]
+        if len(values) != len(order_by):
+            raise ValueError("cursor does not match the sort order")
+        return [
+            datetime.fromisoformat(value) if isinstance(column.type, DateTime) else value
+            for (column, _), value in zip(order_by, values)
+        ]
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _after(order_by: OrderBy, values: list):
+    """Rows strictly after `values` in the given order"""
+    bounds = [literal(value, type_=column.type) for (column, _), value in zip(order_by, values)]
+    directions = {descending for _, descending in order_by}
+    if len(directions) == 1:
+        # Row-value comparison, which SQLite and PostgreSQL serve from a composite index
+        columns = tuple_(*[column for column, _ in order_by])
+        return columns < tuple_(*bounds) if directions.pop() else columns > tuple_(*bounds)
+    clauses = []
+    for i, ((column, descending), bound) in enumerate(zip(order_by, bounds)):
+        equal = [prev_column == prev_bound for (prev_column, _), prev_bound in zip(order_by[:i], bounds[:i])]
+        clauses.append(and_(*equal, column < bound if descending else column > bound))
+    return or_(*clauses)
+
+
+def _selects_entity(query: Select) -> bool:
+    descriptions = query.column_descriptions
+    return len(descriptions) == 1 and isinstance(descriptions[0]["expr"], type)
+
+
+async def paginate(db: AsyncSession, query: Select, page: PageParams, order_by: OrderBy) -> tuple[list, Optional[str]]:
+    """Runs one keyset page of `query`; returns the rows and the cursor of the next page.
+
+    `select(Model)` yields ORM objects; a column projection such as
+    `select(Model.id, Model.name)` yields Core row mappings, which skip the
+    identity map entirely. The projection must include the `order_by` columns.
+    """
+    if page.cursor:
+        query = query.where(_after(order_by, decode_cursor(page.cursor, order_by)))
+    query = query.order_by(
+        *[column.desc() if descending else column.asc() for column, descending in order_by]
+    ).limit(page.limit + 1)
+    entity = _selects_entity(query)
+    result = await db.execute(query)
+    rows = result.scalars().all() if entity else result.mappings().all()
+    if len(rows) <= page.limit:
+        return rows, None
+    rows = rows[:page.limit]
+    last = rows[-1]
+    values = [getattr(last, column.key) if entity else last[column.key] for column, _ in order_by]
+    return rows, encode_cursor(values, order_by)
@@ -1,15 +1,13 @@
 import re
 
 from fastapi import HTTPException
-from passlib.context import CryptContext
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.utils.auth import get_user_by_email
+from app.utils.hashing import hash_password
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+async def get_password_hash(password: str) -> str:
+    return await hash_password(password)
 
 async def update_password(db: AsyncSession, email: str, new_password: str):
     user = await get_user_by_email(db, email)
@@ -17,7 +15,7 @@ async def update_password(db: AsyncSession, email: str, new_password: str):
         return None
 
     validate_password_schema(new_password)
-    user.password = pwd_context.hash(new_password)
+    user.hashed_password = await hash_password(new_password)
     await db.commit()
     return user
 
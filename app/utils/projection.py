@@ -0,0 +1,54 @@
+from functools import lru_cache
+from typing import Annotated, Optional, Sequence
+
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel, Field, TypeAdapter
+from typing_extensions import TypedDict
+
+from app.schemas.page_schema import Page
+
+NEXT_CURSOR_KEY = Page.model_fields["next_cursor"].alias
+
+
+def schema_columns(schema: type[BaseModel], model) -> list:
+    """Model columns backing each field of a response schema, for `select(*columns)`"""
+    return [getattr(model, name) for name in schema.model_fields]
+
+
+@lru_cache(maxsize=None)
+def page_adapter(schema: type[BaseModel]) -> TypeAdapter:
+    """TypeAdapter that dumps a page of plain row dicts in the shape of `Page[schema]`.
+
+    The row type is a TypedDict mirroring the schema's fields and aliases, so
+    pydantic-core serializes the dicts directly to JSON bytes without building
+    or validating a model instance per row.
+    """
+    row = TypedDict(
+        f"{schema.__name__}Row",
+        {name: Annotated[field.annotation, Field(alias=field.alias)] for name, field in schema.model_fields.items()},
+    )
+    page = TypedDict(
+        f"{schema.__name__}Page",
+        {"items": list[row], "next_cursor": Annotated[Optional[str], Field(alias=NEXT_CURSOR_KEY)]},
+    )
+    return TypeAdapter(page)
+
+
+def page_response(
+    rows: Sequence, next_cursor: Optional[str], schema: Optional[type[BaseModel]] = None
+) -> Response:
+    """Serializes a page of Core row mappings straight to JSON bytes.
+
+    Rows come from our own database, so they are trusted and response_model
+    validation is skipped. With `schema`, keys use the schema's camelCase
+    aliases, as response_model would have; without it, rows keep their column
+    names (the admin lists).
+    """
+    items = [dict(row) for row in rows]
+    if schema is None:
+        return ORJSONResponse({"items": items, NEXT_CURSOR_KEY: next_cursor})
+    body = page_adapter(schema).dump_json(
+        {"items": items, "next_cursor": next_cursor}, by_alias=True, warnings=False
+    )
+    return Response(body, media_type="application/json")
+
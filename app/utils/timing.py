@@ -0,0 +1,194 @@
+import dataclasses
+import functools
+import inspect
+import logging
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi import Request
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+
+from app.config import config
+from app.utils.metrics import metrics
+
+logger = logging.getLogger("app")
+
+PHASES = ("auth", "db", "redis", "handler", "serialize")
+
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|%s")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=2048)
+def normalize_sql(statement: str) -> str:
+    """Statement shape: literals and driver placeholders become `?`, IN lists collapse"""
+    shape = _PLACEHOLDER.sub("?", statement)
+    shape = _LITERAL.sub("?", shape)
+    shape = _IN_LIST.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class RequestTimings:
+    """Accumulated wall time per phase for the current request.
+
+    Phases may nest: `auth` and `handler` include the `db` and `redis` time
+    spent inside them, exactly as DevTools shows overlapping Server-Timing
+    entries.
+    """
+
+    __slots__ = ("started", "phases", "handler_ended", "queries", "slowest", "slowest_statement", "statements")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: dict[str, float] = {}
+        self.handler_ended: Optional[float] = None
+        self.queries = 0
+        self.slowest = 0.0
+        self.slowest_statement: Optional[str] = None
+        self.statements: dict[str, int] = {}
+
+    def add(self, phase: str, seconds: float):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def add_query(self, statement: str, seconds: float):
+        self.add("db", seconds)
+        self.queries += 1
+        self.statements[statement] = self.statements.get(statement, 0) + 1
+        if seconds > self.slowest:
+            self.slowest, self.slowest_statement = seconds, statement
+
+    def repeated_statements(self, threshold: int) -> list[tuple[str, int]]:
+        """Statement shapes run at least `threshold` times - the N+1 signature"""
+        shapes: dict[str, int] = {}
+        for statement, count in self.statements.items():
+            shape = normalize_sql(statement)
+            shapes[shape] = shapes.get(shape, 0) + count
+        return [(shape, count) for shape, count in shapes.items() if count >= threshold]
+
+    def db_summary(self) -> str:
+        if not self.queries:
+            return "no queries"
+        return (
+            f"{self.queries} queries, {self.phases.get('db', 0.0) * 1000:.2f}ms in db, "
+            f"slowest {self.slowest * 1000:.2f}ms: {normalize_sql(self.slowest_statement)}"
+        )
+
+    def total(self) -> float:
+        return time.perf_counter() - self.started
+
+    def header(self, total: float) -> str:
+        entries = [
+            f"{phase};dur={self.phases[phase] * 1000:.2f}" + (f';desc="{self.queries} {"query" if self.queries == 1 else "queries"}"' if phase == "db" else "")
+            for phase in PHASES if phase in self.phases
+        ]
+        entries.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(entries)
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def start_request() -> RequestTimings:
+    timings = RequestTimings()
+    _current.set(timings)
+    return timings
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current.get()
+
+
+@contextmanager
+def timed(phase: str):
+    """Adds the block's wall time to `phase`; a no-op outside a request"""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, time.perf_counter() - started)
+
+
+def instrument_engine(sync_engine):
+    """Records every statement's cursor execution time.
+
+    Inside a request the time counts towards the `db` phase together with the
+    statement count and the slowest statement. Statements slower than
+    SLOW_QUERY_THRESHOLD_MS are logged with their normalized SQL wherever they
+    run, including background tasks.
+    """
+    slow_threshold = config.SLOW_QUERY_THRESHOLD_MS / 1000
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        metrics.observe("db.query", elapsed)
+        timings = _current.get()
+        if timings is not None:
+            timings.add_query(statement, elapsed)
+        if slow_threshold and elapsed >= slow_threshold:
+            metrics.inc("db.slow_queries")
+            logger.warning(f"Slow query {elapsed * 1000:.2f}ms: {normalize_sql(statement)}")
+
+
+class TimedRoute(APIRoute):
+    """Route class that splits endpoint time into `handler` and `serialize`.
+
+    `serialize` covers everything after the endpoint returns: response model
+    validation, JSON encoding and dependency teardown.
+    """
+
+    def get_route_handler(self):
+        call = self.dependant.call
+
+        if inspect.iscoroutinefunction(call):
+            @functools.wraps(call)
+            async def endpoint(*args, **kwargs):
+                with timed("handler"):
+                    try:
+                        return await call(*args, **kwargs)
+                    finally:
+                        _mark_handler_end()
+        else:
+            @functools.wraps(call)
+            def endpoint(*args, **kwargs):
+                with timed("handler"):
+                    try:
+                        return call(*args, **kwargs)
+                    finally:
+                        _mark_handler_end()
+
+        original_dependant = self.dependant
+        self.dependant = dataclasses.replace(original_dependant, call=endpoint)
+        try:
+            handler = super().get_route_handler()
+        finally:
+            self.dependant = original_dependant
+
+        async def timed_handler(request: Request):
+            response = await handler(request)
+            timings = _current.get()
+            if timings is not None and timings.handler_ended is not None:
+                timings.add("serialize", time.perf_counter() - timings.handler_ended)
+            return response
+
+        return timed_handler
+
+
+def _mark_handler_end():
+    timings = _current.get()
+    if timings is not None:
+        timings.handler_ended = time.perf_counter()
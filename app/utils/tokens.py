@@ -1,68 +1,108 @@
+import hashlib
+import time
+import uuid
 import jwt
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Any, Optional
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
 from fastapi import HTTPException, status
 from app.config import config
+from app.utils.keys import signing_keys
+
+def token_digest(token: str) -> str:
+    """Short stable digest used instead of the raw JWT in cache keys"""
+    return hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+
+
+class VerifiedClaimsCache:
+    """Bounded LRU of already verified token claims, each entry lives until the token's exp"""
+
+    def __init__(self, maxsize: int, enabled: bool = True):
+        self.maxsize = maxsize
+        self.enabled = enabled
+        self._entries: "OrderedDict[str, tuple[float, Mapping[str, Any]]]" = OrderedDict()
+
+    def get(self, token: str) -> Optional[Mapping[str, Any]]:
+        if not self.enabled:
+            return None
+        digest = token_digest(token)
+        entry = self._entries.get(digest)
+        if entry is None:
+            return None
+        expires_at, claims = entry
+        if expires_at <= time.time():
+            # Let jwt.decode raise the proper "expired" error
+            del self._entries[digest]
+            return None
+        self._entries.move_to_end(digest)
+        return claims
+
+    def set(self, token: str, claims: Mapping[str, Any], expires_at: Optional[float]):
+        if not self.enabled or expires_at is None:
+            return
+        self._entries[token_digest(token)] = (expires_at, claims)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def discard(self, token: str):
+        """Forgets a token so that a revoked token is never served from the cache"""
+        self._entries.pop(token_digest(token), None)
+
+    def clear(self):
+        self._entries.clear()
+
+
+claims_cache = VerifiedClaimsCache(maxsize=config.JWT_CACHE_SIZE, enabled=config.JWT_CACHE_ENABLED)
+
 
 # Get current UTC time
 def get_utc_now():
     """Get current UTC time."""
     return datetime.utcnow()
 
-# Create JWT token
-def create_access_token(user: Any):
-    """Creates a JWT token containing all user information."""
-    expires_delta = timedelta(minutes=config.ACCESS_TOKEN_EXPIRE_MINUTES)
 
+def _principal_claims(user: Any, expires_delta: timedelta) -> dict:
+    """Slim claims shared by access and refresh tokens: id, type, role, jti, exp"""
     # Check if it's a User or Mechanic object by checking for role attribute
     if hasattr(user, 'role'):  # User object
-        to_encode = {
-            "id": str(user.id),
-            "name": user.full_name,
-            "email": user.email,
-            "role": user.role,
-            "type": "user",
-            "exp": get_utc_now() + expires_delta,
-        }
+        role, user_type = user.role, "user"
     else:  # Mechanic object (no role field)
-        to_encode = {
-            "id": str(user.id),
-            "name": user.full_name,
-            "email": user.email,
-            "role": "mechanic",
-            "type": "mechanic",
-            "exp": get_utc_now() + expires_delta,
-        }
+        role, user_type = "mechanic", "mechanic"
+    return {
+        "id": str(user.id),
+        "type": user_type,
+        "role": role,
+        "jti": uuid.uuid4().hex,
+        "exp": get_utc_now() + expires_delta,
+    }
 
-    return jwt.encode(to_encode, config.SECRET_KEY, algorithm=config.ALGORITHM)
 
+def _encode(to_encode: dict) -> str:
+    return jwt.encode(
+        to_encode, signing_keys.signing_key, algorithm=config.ALGORITHM, headers=signing_keys.headers
+    )
 
-# Create refresh JWT token
-def create_refresh_token(user: Any):
-    """Creates a long-term refresh_token containing user information."""
-    expires_delta = timedelta(days=7)  # 7 days for refresh token
 
-    # Check if it's a User or Mechanic object by checking for role attribute
-    if hasattr(user, 'role'):  # User object
-        to_encode = {
-            "id": str(user.id),
-            "name": user.full_name,
-            "email": user.email,
-            "role": user.role,
-            "type": "user",
-            "exp": get_utc_now() + expires_delta,
-        }
-    else:  # Mechanic object (no role field)
-        to_encode = {
-            "id": str(user.id),
-            "name": user.full_name,
-            "email": user.email,
-            "role": "mechanic",
-            "type": "mechanic",
-            "exp": get_utc_now() + expires_delta,
-        }
+def _decode(token: str) -> dict:
+    key = signing_keys.verification_key(jwt.get_unverified_header(token).get("kid"))
+    if key is None:
+        raise jwt.InvalidKeyError("Unknown signing key")
+    return jwt.decode(token, key, algorithms=[config.ALGORITHM])
 
-    return jwt.encode(to_encode, config.SECRET_KEY, algorithm=config.ALGORITHM)
+
+# Create JWT token
+def create_access_token(user: Any):
+    """Creates a short-lived access token for a user or mechanic."""
+    expires_delta = timedelta(minutes=config.ACCESS_TOKEN_EXPIRE_MINUTES)
+    return _encode(_principal_claims(user, expires_delta))
+
+
+# Create refresh JWT token
+def create_refresh_token(user: Any):
+    """Creates a long-term refresh_token for a user or mechanic."""
+    expires_delta = timedelta(days=config.REFRESH_TOKEN_EXPIRE_DAYS)
+    return _encode(_principal_claims(user, expires_delta))
 
 
 # Create password reset token
@@ -76,12 +116,20 @@ def create_password_reset_token(email: str):
         "type": "password_reset",
     }
 
-    return jwt.encode(to_encode, config.SECRET_KEY, algorithm=config.ALGORITHM)
+    return _encode(to_encode)
 
 
 # Single function for decoding tokens (access and refresh)
-def decode_jwt_token(token: str):
-    """Decodes JWT token and returns all its data"""
+def decode_jwt_token(token: str) -> Mapping[str, Any]:
+    """Decodes JWT token and returns all its data.
+
+    Verified claims are memoized until the token expires; the returned mapping
+    is shared between calls and read-only.
+    """
+    cached = claims_cache.get(token)
+    if cached is not None:
+        return cached
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate token",
@@ -89,7 +137,7 @@ def decode_jwt_token(token: str):
     )
 
     try:
-        payload = jwt.decode(token, config.SECRET_KEY, algorithms=[config.ALGORITHM])
+        payload = _decode(token)
 
         # Check token type
         token_type = payload.get("type", "user")  # Default to user for backward compatibility
@@ -99,33 +147,37 @@ def decode_jwt_token(token: str):
             email = payload.get("sub")
             if not email:
                 raise credentials_exception
-            return {"email": email, "type": "password_reset"}
+            claims = MappingProxyType({"email": email, "type": "password_reset"})
+            claims_cache.set(token, claims, payload.get("exp"))
+            return claims
 
         # Get all data from user token
         if token_type == "user":
             user_data = {
                 "id": payload.get("id"),
-                "name": payload.get("name"),
-                "email": payload.get("email"),
                 "role": payload.get("role"),
-                "type": "user"
+                "type": "user",
+                "jti": payload.get("jti"),
+                "exp": payload.get("exp"),
             }
         elif token_type == "mechanic":
             user_data = {
                 "id": payload.get("id"),
-                "name": payload.get("name"),
-                "email": payload.get("email"),
                 "role": "mechanic",
-                "type": "mechanic"
+                "type": "mechanic",
+                "jti": payload.get("jti"),
+                "exp": payload.get("exp"),
             }
         else:
             raise credentials_exception
 
         # Validate required fields
-        if not all([user_data["id"], user_data["email"], user_data["role"]]):
+        if not all([user_data["id"], user_data["role"], user_data["jti"]]):
             raise credentials_exception
 
-        return user_data
+        claims = MappingProxyType(user_data)
+        claims_cache.set(token, claims, payload.get("exp"))
+        return claims
 
     except jwt.ExpiredSignatureError:
         raise HTTPException(
@@ -137,11 +189,23 @@ def decode_jwt_token(token: str):
         raise credentials_exception
 
 
+def decode_principal_token(token: str) -> Mapping[str, Any]:
+    """Decodes an access or refresh token; any other token (e.g. password reset) is rejected."""
+    token_data = decode_jwt_token(token)
+    if token_data.get("type") not in ("user", "mechanic") or not token_data.get("jti"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return token_data
+
+
 # Verify password reset token
 def verify_password_reset_token(token: str) -> Optional[str]:
     """Verifies password reset token and returns email if valid."""
     try:
-        payload = jwt.decode(token, config.SECRET_KEY, algorithms=[config.ALGORITHM])
+        payload = _decode(token)
         
         if payload.get("type") != "password_reset":
             return None
@@ -154,5 +218,5 @@ def verify_password_reset_token(token: str) -> Optional[str]:
         
     except jwt.ExpiredSignatureError:
         return None
-    except jwt.JWTError:
+    except jwt.PyJWTError:
         return None
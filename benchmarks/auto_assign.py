@@ -0,0 +1,122 @@
+"""
+Batch auto-assignment of mechanics on a busy fortnight.
+
+Seeds `--mechanics` mechanics (a quarter of them generalists, the rest
+split across a few specializations) and `--appointments` unassigned
+bookings over `--days` working days into a scratch SQLite database, plus
+some bookings that already have a mechanic. Then runs `auto_assign` over the
+window once - the work behind POST /appointments/auto_assign - and reports:
+
+- time spent planning vs end to end (reads, executemany UPDATE, verification, commit)
+- how many bookings were placed
+- how evenly booked minutes ended up spread across mechanics
+
+    SECRET_KEY=dev python -m benchmarks.auto_assign --appointments 10000 --mechanics 200
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+SCRATCH_DIR = tempfile.mkdtemp()
+DB_PATH = os.path.join(SCRATCH_DIR, "auto_assign.db")
+START = datetime(2030, 1, 7)  # a Monday
+SPECIALIZATIONS = ["Engine", "Electrical", "Bodywork", "Tyres"]
+
+
+def seed(mechanics: int, appointments: int, days: int):
+    rng = random.Random(7)
+    conn = sqlite3.connect(DB_PATH)
+    conn.executemany(
+        "INSERT INTO mechanics (email, hashed_password, full_name, specialization, is_active) VALUES (?, 'x', ?, ?, 1)",
+        [
+            (f"bench-mechanic{i}@example.com", f"Mechanic {i}", None if i % 4 == 0 else SPECIALIZATIONS[i % len(SPECIALIZATIONS)])
+            for i in range(mechanics)
+        ],
+    )
+    services = [(f"General {minutes}", minutes, None) for minutes in (30, 60, 90)]
+    services += [(f"{spec} {minutes}", minutes, spec.lower()) for spec in SPECIALIZATIONS for minutes in (60, 120)]
+    conn.executemany("INSERT INTO services (name, price, duration_minutes, specialization) VALUES (?, 100, ?, ?)", services)
+    mechanic_ids = [row[0] for row in conn.execute("SELECT id FROM mechanics")]
+    service_rows = conn.execute("SELECT id, duration_minutes FROM services").fetchall()
+
+    workdays = [START + timedelta(days=day) for day in range(days * 7 // 5 + 2) if (START + timedelta(days=day)).weekday() < 5][:days]
+    rows = []
+    for i in range(appointments):
+        service_id, minutes = rng.choice(service_rows)
+        at = rng.choice(workdays).replace(hour=rng.randint(9, 16), minute=rng.choice((0, 30)))
+        rows.append((service_id, None, at, at + timedelta(minutes=minutes)))
+    # A few existing bookings per mechanic so the engine has to work around them
+    for mechanic_id in mechanic_ids:
+        for _ in range(days // 2):
+            at = rng.choice(workdays).replace(hour=rng.randint(9, 16))
+            rows.append((service_rows[1][0], mechanic_id, at, at + timedelta(minutes=60)))
+    conn.executemany(
+        "INSERT INTO appointments (user_id, car_id, service_id, mechanic_id, appointment_date, ends_at, status) "
+        "VALUES (1, 1, ?, ?, ?, ?, 'Заплановано')",
+        rows,
+    )
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+    return workdays[0], workdays[-1] + timedelta(days=1)
+
+
+async def main(args):
+    import app.services.assignment as assignment
+    from app.dependencies.database import AsyncSessionLocal, engine, init_db, read_engine
+
+    await init_db()
+    start, end = seed(args.mechanics, args.appointments, args.days)
+    print(f"{args.appointments:,} unassigned bookings, {args.mechanics} mechanics, {args.days} working days")
+
+    planning = []
+    plan = assignment.plan_assignments
+
+    def timed_plan(*plan_args):
+        started = time.perf_counter()
+        result = plan(*plan_args)
+        planning.append(time.perf_counter() - started)
+        return result
+
+    assignment.plan_assignments = timed_plan
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        result = await assignment.auto_assign(db, start, end)
+    elapsed = time.perf_counter() - started
+
+    conn = sqlite3.connect(DB_PATH)
+    minutes = [
+        row[0] for row in conn.execute(
+            "SELECT SUM((julianday(ends_at) - julianday(appointment_date)) * 1440) FROM appointments "
+            "WHERE mechanic_id IS NOT NULL GROUP BY mechanic_id"
+        )
+    ]
+    conn.close()
+
+    print(f"planning {planning[-1] * 1000:.0f}ms, end to end {elapsed * 1000:.0f}ms")
+    print(f"assigned {len(result.assignments):,}, left unassigned {len(result.unassigned):,} (no qualifying mechanic free)")
+    print(f"booked minutes per mechanic: min {min(minutes):.0f}, median {statistics.median(minutes):.0f}, "
+          f"max {max(minutes):.0f}, stdev {statistics.pstdev(minutes):.0f}")
+
+    await read_engine.dispose()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--appointments", type=int, default=10000)
+    parser.add_argument("--mechanics", type=int, default=200)
+    parser.add_argument("--days", type=int, default=10)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+    os.environ.setdefault("DB_ECHO", "False")
+    os.environ.setdefault("SLOW_QUERY_THRESHOLD_MS", "0")
+    asyncio.run(main(args))
@@ -0,0 +1,96 @@
+"""
+Latency of the free-slot search over months of bookings.
+
+Seeds `--mechanics` mechanics with `--months` of bookings (a few per working
+day each, plus some unassigned ones) into a scratch SQLite database, then
+times `load_availability` plus slot generation for one-day, one-week and
+one-month windows - the work behind GET /appointments/availability.
+
+    SECRET_KEY=dev python -m benchmarks.availability --mechanics 20 --months 6
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+SCRATCH_DIR = tempfile.mkdtemp()
+DB_PATH = os.path.join(SCRATCH_DIR, "availability.db")
+START = datetime(2030, 1, 7)  # a Monday
+
+
+def seed(mechanics: int, months: int) -> int:
+    rng = random.Random(7)
+    conn = sqlite3.connect(DB_PATH)
+    conn.executemany(
+        "INSERT INTO mechanics (email, hashed_password, full_name, is_active) VALUES (?, 'x', ?, 1)",
+        [(f"bench-mechanic{i}@example.com", f"Mechanic {i}") for i in range(mechanics)],
+    )
+    conn.executemany(
+        "INSERT INTO services (name, price, duration_minutes) VALUES (?, 100, ?)",
+        [(f"Service {minutes}", minutes) for minutes in (30, 60, 90, 120)],
+    )
+    mechanic_ids = [row[0] for row in conn.execute("SELECT id FROM mechanics")]
+    service_ids = [row[0] for row in conn.execute("SELECT id FROM services")]
+    bookings = []
+    for day in range(months * 30):
+        date = START + timedelta(days=day)
+        if date.weekday() > 4:
+            continue
+        for mechanic_id in mechanic_ids + [None] * (len(mechanic_ids) // 5):
+            for _ in range(rng.randint(2, 4)):
+                at = date.replace(hour=rng.randint(9, 16), minute=rng.choice((0, 30)))
+                bookings.append((1, 1, rng.choice(service_ids), mechanic_id, at, "Заплановано"))
+    conn.executemany(
+        "INSERT INTO appointments (user_id, car_id, service_id, mechanic_id, appointment_date, status) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        bookings,
+    )
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+    return len(bookings)
+
+
+async def main(args):
+    from app.dependencies.database import ReadSessionLocal, engine, init_db, read_engine
+    from app.services.availability import load_availability
+
+    await init_db()
+    total = seed(args.mechanics, args.months)
+    print(f"{total:,} bookings for {args.mechanics} mechanics over {args.months} months")
+
+    for label, days in (("1 day", 1), ("1 week", 7), ("1 month", 31)):
+        samples = []
+        for i in range(args.repeat):
+            start = START + timedelta(days=(i * 11) % (args.months * 30 - days))
+            started = time.perf_counter()
+            async with ReadSessionLocal() as db:
+                availability = await load_availability(db, start, start + timedelta(days=days))
+                slots = list(availability.slots(start, start + timedelta(days=days), timedelta(minutes=60)))
+            samples.append(time.perf_counter() - started)
+        samples.sort()
+        print(
+            f"{label:<8} p50 {statistics.median(samples) * 1000:6.2f}ms  "
+            f"p95 {samples[int(len(samples) * 0.95) - 1] * 1000:6.2f}ms  ({len(slots)} slots in the last window)"
+        )
+
+    await read_engine.dispose()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mechanics", type=int, default=20)
+    parser.add_argument("--months", type=int, default=6)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+    os.environ.setdefault("DB_ECHO", "False")
+    asyncio.run(main(args))
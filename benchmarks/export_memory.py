@@ -0,0 +1,93 @@
+"""
+Peak Python memory of the streamed admin export versus building the full list.
+
+Seeds a scratch SQLite database with `--rows` appointments, then measures the
+tracemalloc peak while consuming `stream_export` at several table sizes. The
+streamed peak should stay flat as the table grows; the list-of-dicts baseline
+(what the paginated admin handlers used to do for a whole table) grows
+linearly.
+
+    SECRET_KEY=dev python -m benchmarks.export_memory --rows 200000
+"""
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+SCRATCH_DIR = tempfile.mkdtemp()
+DB_PATH = os.path.join(SCRATCH_DIR, "export.db")
+
+
+def seed(rows: int):
+    conn = sqlite3.connect(DB_PATH)
+    start = datetime(2026, 1, 1)
+    conn.executemany(
+        "INSERT INTO appointments (user_id, car_id, service_id, mechanic_id, appointment_date, status) "
+        "VALUES (1, 1, 1, NULL, ?, 'Заплановано')",
+        ((start + timedelta(minutes=i),) for i in range(rows)),
+    )
+    conn.commit()
+    conn.close()
+
+
+async def measure(consume) -> tuple[float, float]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    await consume()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 2**20, elapsed
+
+
+async def main(args):
+    from sqlalchemy import select
+
+    from app.dependencies.database import ReadSessionLocal, engine, init_db, read_engine
+    from app.models.appointment import Appointment
+    from app.services.export import export_query, stream_export
+
+    await init_db()
+    seed(args.rows)
+
+    for limit in sorted({min(1000, args.rows), args.rows // 10, args.rows}):
+        query = export_query("appointments").limit(limit)
+
+        async def streamed():
+            async for _ in stream_export(query, args.format, gzip=args.gzip):
+                pass
+
+        async def buffered():
+            async with ReadSessionLocal() as session:
+                result = await session.execute(select(Appointment).order_by(Appointment.id).limit(limit))
+                [
+                    {"id": a.id, "user_id": a.user_id, "appointment_date": a.appointment_date, "status": a.status}
+                    for a in result.scalars().all()
+                ]
+
+        stream_peak, stream_time = await measure(streamed)
+        list_peak, list_time = await measure(buffered)
+        print(
+            f"{limit:>10,} rows   streamed: {stream_peak:7.1f} MiB peak {stream_time:6.2f}s   "
+            f"full list: {list_peak:7.1f} MiB peak {list_time:6.2f}s"
+        )
+
+    await read_engine.dispose()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--gzip", action="store_true")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+    os.environ.setdefault("DB_ECHO", "False")
+    asyncio.run(main(args))
@@ -0,0 +1,99 @@
+"""
+Bookings per second with per-request commits versus the group-commit writer.
+
+Creates a scratch SQLite database with the production connection profile,
+then inserts appointments from `--concurrency` concurrent tasks, once with a
+commit per booking and once through GroupCommitWriter.
+
+    SECRET_KEY=dev python -m benchmarks.group_commit --bookings 2000 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+
+async def book(writer, session_factory, slot: int, ids: dict):
+    from app.models.appointment import Appointment
+
+    async def insert_appointment(session):
+        session.add(Appointment(
+            user_id=ids["user"],
+            car_id=ids["car"],
+            service_id=ids["service"],
+            appointment_date=datetime(2030, 1, 1) + timedelta(minutes=slot),
+        ))
+
+    async with session_factory() as db:
+        await writer.run(db, insert_appointment)
+
+
+async def run(writer, session_factory, bookings: int, concurrency: int, ids: dict, offset: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(slot: int):
+        async with semaphore:
+            await book(writer, session_factory, slot, ids)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(bounded(offset + i) for i in range(bookings)))
+    return bookings / (time.perf_counter() - started)
+
+
+async def seed(session_factory) -> dict:
+    from app.models.car import Car
+    from app.models.service import Service
+    from app.models.user import User
+
+    async with session_factory() as db:
+        user = User(email="bench@example.com", hashed_password="x", full_name="Bench", role="customer")
+        service = Service(name="Oil change", price=100, duration_minutes=60)
+        db.add_all([user, service])
+        await db.flush()
+        car = Car(user_id=user.id, brand="Skoda", model="Octavia", vin="BENCH000000000001")
+        db.add(car)
+        await db.commit()
+        return {"user": user.id, "car": car.id, "service": service.id}
+
+
+async def main(args):
+    from app.dependencies.database import AsyncSessionLocal, engine, init_db
+    from app.services.group_commit import GroupCommitWriter
+    from app.utils.metrics import metrics
+
+    await init_db()
+    ids = await seed(AsyncSessionLocal)
+
+    direct = GroupCommitWriter(enabled=False, max_batch=args.max_batch, max_delay=0)
+    direct_rate = await run(direct, AsyncSessionLocal, args.bookings, args.concurrency, ids, 0)
+
+    grouped = GroupCommitWriter(enabled=True, max_batch=args.max_batch, max_delay=args.max_delay_ms / 1000)
+    grouped.start()
+    grouped_rate = await run(grouped, AsyncSessionLocal, args.bookings, args.concurrency, ids, args.bookings)
+    await grouped.stop()
+
+    counters = metrics.snapshot()["counters"]
+    batches = counters.get("group_commit.batches", 0)
+    print(f"commit per booking: {direct_rate:10,.0f} bookings/s")
+    print(f"group commit:       {grouped_rate:10,.0f} bookings/s ({grouped_rate / direct_rate:.1f}x)")
+    if batches:
+        print(f"average batch: {counters['group_commit.mutations'] / batches:.1f} bookings over {batches:.0f} commits")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bookings", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--max-batch", type=int, default=256)
+    parser.add_argument("--max-delay-ms", type=float, default=1.0)
+    parser.add_argument("--synchronous", default="FULL", help="PRAGMA synchronous for the run (FULL shows fsync cost)")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/group_commit.db")
+    os.environ.setdefault("DB_ECHO", "False")
+    os.environ["DB_SYNCHRONOUS"] = args.synchronous
+    asyncio.run(main(args))
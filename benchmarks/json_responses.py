@@ -0,0 +1,103 @@
+"""
+Per-endpoint cost of rendering one list page, before and after the fast path.
+
+before: FastAPI's response_model path - `Page[Schema]` validation, dump to
+        Python objects and stdlib `JSONResponse`
+after:  `page_response` - cached TypedDict `TypeAdapter` dumping the row dicts
+        straight to bytes (orjson for the admin dict lists)
+
+Rows are synthetic so that only serialization is measured.
+
+    SECRET_KEY=dev python -m benchmarks.json_responses --page-size 200
+"""
+
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+
+
+def sample_rows(n: int) -> dict:
+    start = datetime(2026, 1, 1, 9, 30)
+    appointment = lambda i: {
+        "id": i, "user_id": 10 + i % 7, "car_id": 20 + i % 5, "service_id": 1 + i % 4,
+        "mechanic_id": None if i % 3 else 2, "appointment_date": start + timedelta(hours=i), "status": "Заплановано",
+    }
+    return {
+        "GET /appointments/": [appointment(i) for i in range(n)],
+        "GET /cars/": [
+            {"id": i, "user_id": 10, "brand": "Skoda", "model": "Octavia", "year": 2015,
+             "plate_number": f"AA{i:04d}BB", "vin": f"TMBJJ7NE0F{i:07d}"}
+            for i in range(n)
+        ],
+        "GET /mechanics/": [
+            {"id": i, "email": f"mechanic{i}@example.com", "full_name": f"Mechanic {i}", "phone": "+380501234567",
+             "specialization": "General Repair", "is_active": True, "created_at": start, "updated_at": start}
+            for i in range(n)
+        ],
+        "GET /services/": [
+            {"id": i, "name": f"Service {i}", "description": "Oil and filter change", "price": 1200.0,
+             "duration_minutes": 60, "specialization": None}
+            for i in range(n)
+        ],
+        "GET /admin/users": [
+            {"id": i, "email": f"user{i}@example.com", "full_name": f"User {i}", "phone": None, "role": "customer",
+             "is_active": True, "last_login": start, "created_at": start, "updated_at": start}
+            for i in range(n)
+        ],
+        "GET /admin/appointments": [appointment(i) for i in range(n)],
+    }
+
+
+def per_page(render, iterations: int) -> float:
+    render()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        render()
+    return (time.perf_counter() - started) / iterations
+
+
+def main(args):
+    from fastapi.responses import JSONResponse
+    from pydantic import TypeAdapter
+
+    from app.schemas.appointment_schema import AppointmentResponseSchema
+    from app.schemas.car_schema import CarResponseSchema
+    from app.schemas.mechanic_schema import MechanicResponseSchema
+    from app.schemas.page_schema import Page
+    from app.schemas.service_schema import ServiceResponseSchema
+    from app.utils.projection import page_response
+
+    schemas = {
+        "GET /appointments/": AppointmentResponseSchema,
+        "GET /cars/": CarResponseSchema,
+        "GET /mechanics/": MechanicResponseSchema,
+        "GET /services/": ServiceResponseSchema,
+        "GET /admin/users": None,
+        "GET /admin/appointments": None,
+    }
+
+    print(f"{'endpoint':<24} {'before':>10} {'after':>10} {'speedup':>8}   ({args.page_size} rows per page)")
+    for endpoint, rows in sample_rows(args.page_size).items():
+        schema = schemas[endpoint]
+        adapter = TypeAdapter(Page[schema] if schema else Page[dict])
+
+        def before():
+            page = adapter.validate_python({"items": rows, "next_cursor": None})
+            return JSONResponse(adapter.dump_python(page, mode="json", by_alias=True)).body
+
+        def after():
+            return page_response(rows, None, schema).body
+
+        old, new = per_page(before, args.iterations), per_page(after, args.iterations)
+        print(f"{endpoint:<24} {old * 1e6:8.0f}us {new * 1e6:8.0f}us {old / new:7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    main(args)
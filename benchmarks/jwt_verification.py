@@ -0,0 +1,44 @@
+"""
+Verifications per second of decode_jwt_token with the claims cache on and off.
+
+    python -m benchmarks.jwt_verification --tokens 100 --iterations 200000
+"""
+
+import argparse
+import time
+from types import SimpleNamespace
+
+from app.utils.tokens import claims_cache, create_access_token, decode_jwt_token
+
+
+def run(tokens: list[str], iterations: int) -> float:
+    started = time.perf_counter()
+    for i in range(iterations):
+        decode_jwt_token(tokens[i % len(tokens)])
+    return iterations / (time.perf_counter() - started)
+
+
+def main(args):
+    tokens = [
+        create_access_token(
+            SimpleNamespace(id=i, full_name=f"User {i}", email=f"user{i}@example.com", role="customer")
+        )
+        for i in range(args.tokens)
+    ]
+
+    claims_cache.enabled = False
+    uncached = run(tokens, args.iterations)
+
+    claims_cache.enabled = True
+    claims_cache.clear()
+    cached = run(tokens, args.iterations)
+
+    print(f"cache off: {uncached:12,.0f} verifications/s")
+    print(f"cache on:  {cached:12,.0f} verifications/s ({cached / uncached:.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=200_000)
+    main(parser.parse_args())
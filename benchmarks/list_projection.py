@@ -0,0 +1,104 @@
+"""
+Rows per second and peak memory of a list response built from ORM entities
+versus Core column projection.
+
+Seeds `--rows` appointments into a scratch SQLite database and renders them
+as one page body both ways:
+
+* ORM: `select(Appointment)` into the identity map, then `Page[...]`
+  response_model validation and JSON encoding (the old list handlers)
+* Core: `select(*columns)` row mappings serialized by `page_response`
+
+    SECRET_KEY=dev python -m benchmarks.list_projection --rows 100000
+"""
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+SCRATCH_DIR = tempfile.mkdtemp()
+DB_PATH = os.path.join(SCRATCH_DIR, "projection.db")
+
+
+def seed(rows: int):
+    conn = sqlite3.connect(DB_PATH)
+    start = datetime(2026, 1, 1)
+    conn.executemany(
+        "INSERT INTO appointments (user_id, car_id, service_id, mechanic_id, appointment_date, status) "
+        "VALUES (1, 1, 1, NULL, ?, 'Заплановано')",
+        ((start + timedelta(minutes=i),) for i in range(rows)),
+    )
+    conn.commit()
+    conn.close()
+
+
+async def measure(render, repeat: int) -> tuple[float, float, int]:
+    """Best-of rows/s without tracing, then the peak of one traced run"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows, _ = await render()
+        best = min(best, time.perf_counter() - started)
+    tracemalloc.start()
+    _, size = await render()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return rows / best, peak / 2**20, size
+
+
+async def main(args):
+    from fastapi.responses import JSONResponse
+    from sqlalchemy import select
+
+    from app.dependencies.database import ReadSessionLocal, engine, init_db, read_engine
+    from app.models.appointment import Appointment
+    from app.schemas.appointment_schema import AppointmentResponseSchema
+    from app.schemas.page_schema import Page
+    from app.utils.projection import page_response, schema_columns
+
+    await init_db()
+    seed(args.rows)
+    page_model = Page[AppointmentResponseSchema]
+
+    async def orm():
+        async with ReadSessionLocal() as session:
+            appointments = (await session.execute(select(Appointment).order_by(Appointment.id))).scalars().all()
+            page = page_model(items=appointments, next_cursor=None)
+            body = JSONResponse(page.model_dump(mode="json", by_alias=True)).body
+            return len(appointments), len(body)
+
+    async def core():
+        async with ReadSessionLocal() as session:
+            query = select(*schema_columns(AppointmentResponseSchema, Appointment)).order_by(Appointment.id)
+            rows = (await session.execute(query)).mappings().all()
+            body = page_response(rows, None, AppointmentResponseSchema).body
+            return len(rows), len(body)
+
+    results = {}
+    for name, render in (("ORM + response_model", orm), ("Core projection", core)):
+        results[name] = await measure(render, args.repeat)
+        rate, peak, size = results[name]
+        print(f"{name:<22} {rate:12,.0f} rows/s   peak {peak:7.1f} MiB   body {size / 2**20:.1f} MiB")
+
+    orm_rate, orm_peak, _ = results["ORM + response_model"]
+    core_rate, core_peak, _ = results["Core projection"]
+    print(f"speedup {core_rate / orm_rate:.1f}x, peak memory {core_peak / orm_peak:.0%} of ORM")
+
+    await read_engine.dispose()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+    os.environ.setdefault("DB_ECHO", "False")
+    asyncio.run(main(args))
@@ -0,0 +1,77 @@
+"""
+Latency of an unrelated endpoint while logins saturate the hashing pool.
+
+Run against a live server (needs `pip install httpx`):
+    uvicorn app.main:app --workers 1
+    python -m benchmarks.login_saturation --base-url http://localhost:8000
+
+Compare the baseline p99 with the p99 under login load; with bcrypt on the
+event loop the second number grows with every concurrent login.
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+async def probe(client: httpx.AsyncClient, path: str, duration: float) -> list[float]:
+    latencies = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        await client.get(path)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+async def login_loop(client: httpx.AsyncClient, email: str, password: str, duration: float) -> dict:
+    codes: dict[int, int] = {}
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        response = await client.post("/auth/login", json={"email": email, "password": password})
+        codes[response.status_code] = codes.get(response.status_code, 0) + 1
+    return codes
+
+
+def report(title: str, latencies: list[float]):
+    print(
+        f"{title:<22} requests={len(latencies):<6} "
+        f"p50={percentile(latencies, 0.50) * 1000:7.1f}ms "
+        f"p99={percentile(latencies, 0.99) * 1000:7.1f}ms"
+    )
+
+
+async def main(args):
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+        report("idle", await probe(client, args.probe_path, args.duration))
+
+        logins = [
+            login_loop(client, args.email, args.password, args.duration)
+            for _ in range(args.concurrency)
+        ]
+        results = await asyncio.gather(probe(client, args.probe_path, args.duration), *logins)
+        report(f"{args.concurrency} logins in flight", results[0])
+
+        codes: dict[int, int] = {}
+        for result in results[1:]:
+            for code, count in result.items():
+                codes[code] = codes.get(code, 0) + count
+        print(f"login status codes: {codes}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--probe-path", default="/services/")
+    parser.add_argument("--email", default="admin@example.com")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    asyncio.run(main(parser.parse_args()))
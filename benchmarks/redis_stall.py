@@ -0,0 +1,87 @@
+"""
+Redis stall drill: authenticated requests keep working while Redis hangs.
+
+Points the app at a local stand-in that accepts TCP connections and never
+answers, then logs in and calls an authenticated endpoint repeatedly. The
+first calls pay the per-call timeout until the circuit breaker opens; after
+that requests are served from process-local caches and the JWT check.
+
+    SECRET_KEY=dev python -m benchmarks.redis_stall --requests 200
+"""
+
+import argparse
+import os
+import socket
+import tempfile
+import threading
+import time
+
+
+def start_silent_server() -> int:
+    """Accepts connections and never replies, like a hung Redis"""
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen()
+    held = []
+
+    def accept():
+        while True:
+            connection, _ = server.accept()
+            held.append(connection)
+
+    threading.Thread(target=accept, daemon=True).start()
+    return server.getsockname()[1]
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def main(args):
+    port = start_silent_server()
+    os.environ["REDIS_URL"] = f"redis://127.0.0.1:{port}/0"
+    os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/stall.db")
+    os.environ.setdefault("DB_ECHO", "False")
+
+    import asyncio
+
+    from fastapi.testclient import TestClient
+
+    from app.dependencies.cache import redis_client
+    from app.dependencies.database import init_db
+    from app.main import app
+    from app.utils.metrics import metrics
+
+    asyncio.run(init_db())
+
+    with TestClient(app) as client:
+        started = time.perf_counter()
+        response = client.post("/auth/login", json={"email": args.email, "password": args.password})
+        print(f"login: {response.status_code} in {(time.perf_counter() - started) * 1000:.0f}ms")
+        headers = {"Authorization": f"Bearer {response.json()['tokens']['accessToken']}"}
+
+        latencies, codes = [], {}
+        for _ in range(args.requests):
+            started = time.perf_counter()
+            response = client.get("/users/me", headers=headers)
+            latencies.append(time.perf_counter() - started)
+            codes[response.status_code] = codes.get(response.status_code, 0) + 1
+
+        print(f"/users/me x{args.requests}: status codes {codes}")
+        print(
+            f"p50={percentile(latencies, 0.50) * 1000:.1f}ms "
+            f"p99={percentile(latencies, 0.99) * 1000:.1f}ms "
+            f"max={max(latencies) * 1000:.1f}ms"
+        )
+        print(f"breaker state: {redis_client.breaker.state}")
+        snapshot = metrics.snapshot()
+        print(f"counters: {snapshot['counters']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--email", default="admin@example.com")
+    parser.add_argument("--password", default="admin123")
+    main(parser.parse_args())
@@ -0,0 +1,76 @@
+"""
+Slot hold throughput on a promotion day.
+
+`--shoppers` concurrent customers each try to hold a random one-hour slot of
+one of `--mechanics` mechanics on the same day, then run the booking check
+on it - the Redis work behind POST /appointments/holds and POST
+/appointments/. Reports throughput, latency percentiles and how many holds
+were rejected because someone else got the slot first.
+
+Point REDIS_URL at a real server for meaningful numbers; the default
+in-memory stand-in only shows the per-call overhead.
+
+    SECRET_KEY=dev REDIS_URL=redis://localhost:6379/15 python -m benchmarks.slot_holds --shoppers 5000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+DAY = datetime(2030, 1, 7, 9, 0)  # a Monday
+
+
+async def main(args):
+    from app.dependencies.cache import redis_client
+    from app.services.slot_holds import PLACED, slot_holds
+
+    rng = random.Random(7)
+    outcomes = Counter()
+    latencies = []
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def shopper(user_id: int):
+        mechanic_id = rng.randint(1, args.mechanics)
+        start = DAY + timedelta(minutes=30 * rng.randrange(16))
+        async with semaphore:
+            started = time.perf_counter()
+            outcome, hold = await slot_holds.place(user_id, mechanic_id, start, start + timedelta(hours=1))
+            if outcome == PLACED:
+                outcome = await slot_holds.check(user_id, mechanic_id, hold.start, hold.end, hold)
+            latencies.append(time.perf_counter() - started)
+        outcomes[outcome] += 1
+
+    redis = await redis_client.get_redis()
+    started = time.perf_counter()
+    await asyncio.gather(*(shopper(user_id) for user_id in range(1, args.shoppers + 1)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(f"{args.shoppers} shoppers, {args.mechanics} mechanics, {args.concurrency} in flight: "
+          f"{args.shoppers / elapsed:,.0f} holds/s")
+    print(f"p50 {statistics.median(latencies) * 1000:.2f}ms  p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:.2f}ms "
+          f"(place + check)")
+    print(f"held and checked: {outcomes[PLACED]}, rejected: {args.shoppers - outcomes[PLACED]}")
+
+    keys = [key async for key in redis.scan_iter("slot_holds:*")]
+    if keys:
+        await redis.delete(*keys)
+    await redis_client.close_redis()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shoppers", type=int, default=5000)
+    parser.add_argument("--mechanics", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=200)
+    args = parser.parse_args()
+
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
+    os.environ.setdefault("REDIS_URL", "fakeredis://")
+    asyncio.run(main(args))
@@ -0,0 +1,118 @@
+"""
+Double-booking check under contention.
+
+Migrates a scratch SQLite database, then fires `--requests` parallel
+POST /appointments/ calls for the same mechanic, all starting within one
+service duration of each other so every pair overlaps. Exactly one must be
+accepted and every other one rejected with 409; anything else (two
+successes, a 500, a lock timeout) exits with status 1.
+
+Then books twice more while another connection commits a write between each
+booking's first read and its INSERT - the window in which a deferred SQLite
+transaction (or a group-commit replay) used to fail with "database is
+locked". Both must get a proper answer, 200 and then 409.
+
+    python check_booking_contention.py --requests 300
+    python check_booking_contention.py --group-commit   # same, through the group-commit writer
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from check_query_plans import DB_PATH, SCRATCH_DIR, migrate
+
+
+def main(args):
+    if args.group_commit:
+        os.environ["GROUP_COMMIT_ENABLED"] = "True"
+    migrate("head")
+
+    from fastapi.testclient import TestClient
+
+    import app.routers.appointments_router as appointments_router
+    import app.services.booking as booking
+    from app.main import app
+
+    async def skip_email(to_email, subject, message, html=False):
+        pass
+
+    appointments_router.send_email = skip_email
+
+    lock_mechanic = booking.lock_mechanic
+
+    async def lock_then_interfere(db, mechanic_id, service_id):
+        await lock_mechanic(db, mechanic_id, service_id)
+        conn = sqlite3.connect(DB_PATH, timeout=0.2)
+        try:
+            conn.execute("UPDATE services SET price = price + 1")
+            conn.commit()
+        except sqlite3.OperationalError:
+            pass  # the booking already holds the write lock, as it should
+        finally:
+            conn.close()
+
+    os.chdir(SCRATCH_DIR)
+    with TestClient(app) as client:
+        client.post("/auth/register", json={"name": "Contention", "email": "contention@example.com", "password": "Passw0rd!"})
+        tokens = client.post("/auth/login", json={"email": "contention@example.com", "password": "Passw0rd!"}).json()["tokens"]
+        customer = {"Authorization": f"Bearer {tokens['accessToken']}"}
+        admin_token = client.post(
+            "/auth/sign-in-swagger", data={"username": "admin@example.com", "password": "admin123"}
+        ).json()["access_token"]
+        service = client.post(
+            "/services/", headers={"Authorization": f"Bearer {admin_token}"}, json={"name": "Contention", "price": 100}
+        ).json()
+        car = client.post("/cars/", headers=customer, json={
+            "brand": "Skoda", "model": "Octavia", "year": 2015, "plateNumber": "AA0003AA", "vin": "CONTENTIONVIN0001",
+        }).json()
+
+        def attempt_at(appointment_date: str) -> int:
+            return client.post("/appointments/", headers=customer, json={
+                "carId": car["id"], "serviceId": service["id"], "mechanicId": 1, "appointmentDate": appointment_date,
+            }).status_code
+
+        def attempt(i: int) -> int:
+            # 10:00-10:59 starts against a 60 minute service: every pair of bookings overlaps
+            return attempt_at(f"2030-01-07T10:{i % 60:02d}:00")
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            codes = Counter(pool.map(attempt, range(args.requests)))
+        elapsed = time.perf_counter() - started
+
+        booking.lock_mechanic = lock_then_interfere
+        try:
+            raced = [attempt_at("2030-01-08T10:00:00"), attempt_at("2030-01-08T10:30:00")]
+        finally:
+            booking.lock_mechanic = lock_mechanic
+
+    conn = sqlite3.connect(DB_PATH)
+    booked = conn.execute(
+        "SELECT COUNT(*) FROM appointments WHERE mechanic_id = 1 AND appointment_date < '2030-01-08'"
+    ).fetchone()[0]
+    conn.close()
+
+    print(f"{args.requests} parallel bookings in {elapsed:.2f}s: "
+          + ", ".join(f"{count} x {code}" for code, count in sorted(codes.items())))
+    print(f"{booked} booking(s) stored for the mechanic")
+    if codes != Counter({200: 1, 409: args.requests - 1}) or booked != 1:
+        print("FAIL: expected exactly one booking to succeed and the rest to get 409")
+        sys.exit(1)
+    print(f"bookings racing another writer: {raced}")
+    if raced != [200, 409]:
+        print("FAIL: expected 200 and then 409 while another connection commits mid-booking")
+        sys.exit(1)
+    print("ok")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=100, help="client threads sending at once")
+    parser.add_argument("--group-commit", action="store_true", help="enable GROUP_COMMIT_ENABLED")
+    main(parser.parse_args())
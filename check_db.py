@@ -1,73 +1,53 @@
 import asyncio
-import sqlite3
-from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy import inspect, pool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from app.config import config
+from app.dependencies.engine import build_engine
 from app.models.mechanic import Mechanic
 from app.models.user import User
 
-async def check_database():
-    # Check SQLite database directly
-    print("=== Checking SQLite database directly ===")
-    conn = sqlite3.connect('car_service.db')
-    cursor = conn.cursor()
-    
-    # Get all tables
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-    tables = cursor.fetchall()
+
+def describe_schema(connection):
+    inspector = inspect(connection)
+    tables = inspector.get_table_names()
     print("Tables in database:")
     for table in tables:
-        print(f"  - {table[0]}")
-    
-    # Check mechanics table
-    print("\n=== Mechanics table structure ===")
-    cursor.execute("PRAGMA table_info(mechanics);")
-    columns = cursor.fetchall()
-    for col in columns:
-        print(f"  {col[1]} ({col[2]})")
-    
-    # Check mechanics data
-    print("\n=== Mechanics data ===")
-    cursor.execute("SELECT * FROM mechanics;")
-    mechanics = cursor.fetchall()
-    for mechanic in mechanics:
-        print(f"  {mechanic}")
-    
-    # Check users table
-    print("\n=== Users table structure ===")
-    cursor.execute("PRAGMA table_info(users);")
-    columns = cursor.fetchall()
-    for col in columns:
-        print(f"  {col[1]} ({col[2]})")
-    
-    # Check users data
-    print("\n=== Users data ===")
-    cursor.execute("SELECT * FROM users;")
-    users = cursor.fetchall()
-    for user in users:
-        print(f"  {user}")
-    
-    conn.close()
-    
-    # Check with SQLAlchemy async
+        print(f"  - {table}")
+
+    for table in ("mechanics", "users"):
+        if table not in tables:
+            continue
+        print(f"\n=== {table.capitalize()} table structure ===")
+        for column in inspector.get_columns(table):
+            print(f"  {column['name']} ({column['type']})")
+
+
+async def check_database():
+    # Same engine factory and DATABASE_URL as the app, works for SQLite and server databases
+    engine = build_engine(config.DATABASE_URL, poolclass=pool.NullPool)
+    print(f"=== Checking {engine.url.render_as_string(hide_password=True)} ===")
+
+    async with engine.connect() as conn:
+        await conn.run_sync(describe_schema)
+
     print("\n=== Checking with SQLAlchemy async ===")
-    engine = create_async_engine("sqlite+aiosqlite:///./car_service.db")
-    
-    async with engine.begin() as conn:
+    async with AsyncSession(engine) as session:
         # Check mechanics
-        result = await conn.execute(select(Mechanic))
+        result = await session.execute(select(Mechanic))
         mechanics = result.scalars().all()
         print(f"Found {len(mechanics)} mechanics:")
         for mechanic in mechanics:
             print(f"  ID: {mechanic.id}, Email: {mechanic.email}, Name: {mechanic.full_name}")
-        
+
         # Check users
-        result = await conn.execute(select(User))
+        result = await session.execute(select(User))
         users = result.scalars().all()
         print(f"Found {len(users)} users:")
         for user in users:
             print(f"  ID: {user.id}, Email: {user.email}, Name: {user.full_name}, Role: {user.role}")
-    
+
     await engine.dispose()
 
 if __name__ == "__main__":
-    asyncio.run(check_database()) 
\ No newline at end of file
+    asyncio.run(check_database())
@@ -0,0 +1,295 @@
+"""
+Per-endpoint query budget check against a seeded dataset.
+
+Migrates and seeds a scratch SQLite database (the same dataset as
+check_query_plans.py), calls every API route through the ASGI test client and
+counts the statements each request executes and the rows it fetches. Exits
+with status 1 when a request exceeds its entry in BUDGETS, or when a route
+has no budget or was not exercised.
+
+BUDGETS is the reviewed contract. An N+1, e.g. lazy-loading
+`Appointment.car` per row, shows up as a statement count that grows with the
+page size. A missing LIMIT shows up as a row count that grows with the
+seeded data. Change a budget in the same diff as the code that needs it.
+
+    python check_query_budgets.py
+    python check_query_budgets.py --print   # observed numbers as a BUDGETS table
+"""
+
+import argparse
+import re
+import sys
+
+from check_query_plans import SCRATCH_DIR, migrate, seed
+
+# "METHOD /route/template": (max statements, max rows fetched); None rows = not buffered (streamed)
+BUDGETS = {
+    "POST /auth/register": (2, 0),
+    "POST /auth/login": (1, 1),
+    "POST /auth/change-password": (2, 1),
+    "POST /auth/logout": (0, 0),
+    "POST /auth/password-recovery": (1, 1),
+    "POST /auth/password-reset": (3, 2),
+    "POST /auth/refresh-token": (1, 1),
+    "POST /auth/sign-in-swagger": (1, 1),
+    "GET /users/me": (2, 2),
+    "POST /cars/": (1, 0),
+    "GET /cars/": (1, 51),
+    "PUT /cars/{car_id}": (3, 2),
+    "DELETE /cars/{car_id}": (2, 1),
+    "POST /services/": (3, 2),
+    "GET /services/": (1, 51),
+    "PUT /services/{service_id}": (3, 2),
+    "DELETE /services/{service_id}": (2, 1),
+    "POST /mechanics/": (3, 1),
+    "POST /mechanics/login": (1, 1),
+    "GET /mechanics/": (1, 51),
+    "PUT /mechanics/{mechanic_id}": (3, 2),
+    "DELETE /mechanics/{mechanic_id}": (2, 1),
+    "POST /documents/": (2, 1),
+    "PUT /documents/{document_id}": (3, 2),
+    "DELETE /documents/{document_id}": (2, 1),
+    "POST /appointments/": (7, 5),  # with a mechanic: duration, mechanic lock, max duration, overlap check
+    "GET /appointments/": (1, 51),
+    "GET /appointments/my": (2, 51),
+    "GET /appointments/history": (1, 51),
+    "GET /appointments/availability": (4, 100),  # rows: the roster plus the bookings in a one-week window
+    "POST /appointments/holds": (4, 3),
+    "DELETE /appointments/holds/{hold_id}": (0, 0),
+    "POST /appointments/auto_assign": (9, 150),  # rows: the roster plus the bookings in a one-week window
+    "PUT /appointments/{appointment_id}": (4, 2),
+    "DELETE /appointments/{appointment_id}": (3, 2),
+    "PATCH /appointments/{appointment_id}/assign_mechanic": (7, 5),
+    "PATCH /appointments/{appointment_id}/status": (3, 2),
+    "GET /admin/users": (1, 51),
+    "GET /admin/mechanics": (1, 51),
+    "GET /admin/documents": (1, 51),
+    "GET /admin/appointments": (1, 51),
+    "GET /admin/metrics": (0, 0),
+    "PATCH /admin/users/{user_id}/change_role": (3, 2),
+    "GET /admin/export/{entity}": (1, None),
+    "GET /.well-known/jwks.json": (0, 0),
+}
+
+
+class Recorder:
+    """Statements and buffered rows of the request being measured"""
+
+    def __init__(self):
+        self.statements = 0
+        self.rows = 0
+
+    def reset(self):
+        self.statements = self.rows = 0
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        from app.utils.timing import current_timings
+
+        # Only statements issued inside a request; background writers run in their own context
+        if current_timings() is None or statement.lstrip().upper().startswith(("PRAGMA", "BEGIN", "SAVEPOINT", "RELEASE")):
+            return
+        self.statements += 1
+        # Buffered async cursors hold the whole result; server-side (streamed) ones have no _rows
+        self.rows += len(getattr(cursor, "_rows", ()) or ())
+
+
+def drive(client, recorder: Recorder) -> dict:
+    """Calls every route at least once; returns the worst (statements, rows) per route"""
+    observed: dict[str, tuple[int, int]] = {}
+
+    def call(method, template, expected=200, **kwargs):
+        path_params = {key: kwargs.pop(key) for key in re.findall(r"{(\w+)}", template)}
+        recorder.reset()
+        response = client.request(method, template.format(**path_params), **kwargs)
+        if response.status_code != expected:
+            raise SystemExit(f"{method} {template} -> {response.status_code}: {response.text}")
+        key = f"{method} {template}"
+        worst = observed.get(key, (0, 0))
+        observed[key] = (max(worst[0], recorder.statements), max(worst[1], recorder.rows))
+        return response
+
+    # Reset links are read from the outbox instead of going out over SMTP
+    outbox = []
+
+    async def capture_email(to_email, subject, message, html=False):
+        outbox.append(message)
+
+    import app.routers.appointments_router as appointments_router
+    import app.routers.auth_router as auth_router
+
+    auth_router.send_email = appointments_router.send_email = capture_email
+
+    customer_id = call(
+        "POST", "/auth/register", json={"name": "Budget", "email": "budget@example.com", "password": "Passw0rd!"}
+    ).json()["id"]
+    tokens = call("POST", "/auth/login", json={"email": "budget@example.com", "password": "Passw0rd!"}).json()["tokens"]
+    customer = {"Authorization": f"Bearer {tokens['accessToken']}"}
+    call("POST", "/auth/refresh-token", params={"refresh_token": tokens["refreshToken"]})
+    call("POST", "/auth/change-password", params={"email": "budget@example.com", "new_password": "Passw0rd!2"})
+
+    call("POST", "/auth/password-recovery", json={"email": "budget@example.com"})
+    token = outbox[-1].rsplit("token=", 1)[1]
+    call("POST", "/auth/password-reset", json={"token": token, "new_password": "Passw0rd!3"})
+
+    admin_token = call(
+        "POST", "/auth/sign-in-swagger", data={"username": "admin@example.com", "password": "admin123"}
+    ).json()["access_token"]
+    admin = {"Authorization": f"Bearer {admin_token}"}
+    mechanic_token = call(
+        "POST", "/mechanics/login", json={"email": "mechanic@example.com", "password": "mechanic123"}
+    ).json()["access_token"]
+    mechanic = {"Authorization": f"Bearer {mechanic_token}"}
+    call("GET", "/users/me", headers=customer)
+
+    car = call("POST", "/cars/", headers=customer, json={
+        "brand": "Audi", "model": "A4", "year": 2018, "plateNumber": "AA0002AA", "vin": "BUDGETVIN00000001",
+    }).json()
+    call("GET", "/cars/", headers=customer)
+    call("PUT", "/cars/{car_id}", car_id=car["id"], headers=customer, json={
+        "brand": "Audi", "model": "A6", "year": 2018, "plateNumber": "AA0002AA", "vin": "BUDGETVIN00000001",
+    })
+
+    service = call("POST", "/services/", headers=admin, json={"name": "Budget check", "price": 500}).json()
+    call("GET", "/services/")
+    call("PUT", "/services/{service_id}", service_id=service["id"], headers=admin, json={
+        "name": "Budget check", "price": 600,
+    })
+
+    for day in range(1, 8):
+        appointment = call("POST", "/appointments/", headers=customer, json={
+            "carId": car["id"], "serviceId": service["id"], "appointmentDate": f"2026-04-0{day}T10:00:00",
+        }).json()
+    # With a mechanic the booking is also checked for overlaps; 2027 is clear of the seeded bookings
+    hold = call("POST", "/appointments/holds", headers=customer, json={
+        "serviceId": service["id"], "mechanicId": 1, "start": "2027-04-01T10:00:00",
+    }).json()
+    call("POST", "/appointments/", headers=customer, json={
+        "carId": car["id"], "serviceId": service["id"], "holdId": hold["id"], "appointmentDate": "2027-04-01T10:00:00",
+    })
+    hold = call("POST", "/appointments/holds", headers=customer, json={
+        "serviceId": service["id"], "mechanicId": 1, "start": "2027-04-02T10:00:00",
+    }).json()
+    call("DELETE", "/appointments/holds/{hold_id}", hold_id=hold["id"], headers=customer)
+    call("GET", "/appointments/", headers=customer)
+    call("GET", "/appointments/history", headers=customer)
+    call("GET", "/appointments/availability", headers=customer, params={
+        "service_id": service["id"], "from": "2026-04-06T00:00:00", "to": "2026-04-13T00:00:00",
+    })
+    call("PUT", "/appointments/{appointment_id}", appointment_id=appointment["id"], headers=customer, json={
+        "carId": car["id"], "serviceId": service["id"], "appointmentDate": "2026-04-09T10:00:00",
+    })
+    call("PATCH", "/appointments/{appointment_id}/status", appointment_id=appointment["id"], headers=customer,
+         params={"status": "В роботі"})
+    call("PATCH", "/appointments/{appointment_id}/assign_mechanic", appointment_id=appointment["id"], headers=admin,
+         params={"mechanic_id": 1})
+    call("GET", "/appointments/my", headers=mechanic)
+    call("POST", "/appointments/auto_assign", headers=admin, params={
+        "from": "2026-04-01T00:00:00", "to": "2026-04-08T00:00:00",
+    })
+
+    call("GET", "/admin/users", headers=admin)
+    call("GET", "/admin/mechanics", headers=admin)
+    call("GET", "/admin/documents", headers=admin)
+    call("GET", "/admin/appointments", headers=admin)
+    call("GET", "/admin/appointments", headers=admin, params={"mechanic_id": 1, "sort": "-date"})
+    call("GET", "/admin/metrics", headers=admin)
+    call("GET", "/admin/export/{entity}", entity="appointments", headers=admin)
+    # An offset-aware `since` is the same instant as its naive UTC equivalent, not its wall-clock time
+    exported = call("GET", "/admin/export/{entity}", entity="appointments", headers=admin, params={
+        "since": "2026-04-05T10:00:00",
+    }).text
+    if call("GET", "/admin/export/{entity}", entity="appointments", headers=admin, params={
+        "since": "2026-04-05T13:00:00+03:00",
+    }).text != exported:
+        raise SystemExit("GET /admin/export/{entity}: an offset-aware since exports different rows")
+    call("PATCH", "/admin/users/{user_id}/change_role", user_id=customer_id, headers=admin, json={
+        "name": "Budget", "email": "budget@example.com", "password": "Passw0rd!", "role": "customer",
+    })
+    call("GET", "/mechanics/")
+    call("GET", "/.well-known/jwks.json")
+
+    new_mechanic = call("POST", "/mechanics/", headers=admin, json={
+        "email": "budget-mechanic@example.com", "password": "Passw0rd!", "fullName": "Budget Mechanic",
+    }).json()
+    call("PUT", "/mechanics/{mechanic_id}", mechanic_id=new_mechanic["id"], headers=admin, json={
+        "email": "budget-mechanic@example.com", "password": "Passw0rd!", "fullName": "Budget Mechanic 2",
+    })
+    document = call(
+        "POST", "/documents/", headers=mechanic,
+        data={"mechanic_id": new_mechanic["id"], "type": "invoice"},
+        files={"file": ("budget.txt", b"budget", "text/plain")},
+    ).json()
+    call("PUT", "/documents/{document_id}", document_id=document["id"], headers=admin, data={"type": "receipt"})
+    call("DELETE", "/documents/{document_id}", document_id=document["id"], headers=admin)
+    call("DELETE", "/mechanics/{mechanic_id}", mechanic_id=new_mechanic["id"], headers=admin)
+
+    call("DELETE", "/appointments/{appointment_id}", appointment_id=appointment["id"], headers=customer)
+    call("DELETE", "/services/{service_id}", service_id=service["id"], headers=admin)
+    call("DELETE", "/cars/{car_id}", car_id=car["id"], headers=customer)
+    call("POST", "/auth/logout", params={"token": customer["Authorization"][7:]})
+    return observed
+
+
+def compare(observed: dict, routes: set) -> list[str]:
+    failures = []
+    for key in sorted(routes | set(BUDGETS) | set(observed)):
+        budget, seen = BUDGETS.get(key), observed.get(key)
+        if budget is None:
+            failures.append(f"{key}: no budget")
+            continue
+        if seen is None:
+            failures.append(f"{key}: not exercised" if key in routes else f"{key}: budget for a route that does not exist")
+            continue
+        max_statements, max_rows = budget
+        over = seen[0] > max_statements or (max_rows is not None and seen[1] > max_rows)
+        print(f"{'FAIL' if over else 'ok  '} {key:<55} statements {seen[0]:>2}/{max_statements:<2} "
+              f"rows {seen[1]:>3}/{'-' if max_rows is None else max_rows}")
+        if over:
+            failures.append(f"{key}: {seen[0]} statements, {seen[1]} rows over budget {budget}")
+    return failures
+
+
+def main(args):
+    import os
+
+    migrate("head")
+    seed(args.users)
+
+    from fastapi.routing import APIRoute
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+
+    from app.dependencies.database import engine, read_engine
+    from app.main import app
+
+    routes = {
+        f"{method} {route.path}"
+        for route in app.routes if isinstance(route, APIRoute)
+        for method in route.methods
+    }
+    recorder = Recorder()
+    os.chdir(SCRATCH_DIR)  # document uploads are written relative to the working directory
+    with TestClient(app) as client:
+        for sync_engine in {engine.sync_engine, read_engine.sync_engine}:
+            event.listen(sync_engine, "after_cursor_execute", recorder.after_cursor_execute)
+        observed = drive(client, recorder)
+
+    if args.print:
+        print("BUDGETS = {")
+        for key, (statements, rows) in observed.items():
+            print(f'    "{key}": ({statements}, {None if BUDGETS.get(key, (0, 0))[1] is None else rows}),')
+        print("}")
+        return
+
+    failures = compare(observed, routes)
+    for failure in failures:
+        print(f"  {failure}")
+    print(f"\n{len(observed)} routes measured, {len(failures)} over budget or unbudgeted")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=500, help="seeded customers (x2 cars, x10 appointments)")
+    parser.add_argument("--print", action="store_true", help="print the observed numbers instead of checking")
+    main(parser.parse_args())
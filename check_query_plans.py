@@ -0,0 +1,251 @@
+"""
+EXPLAIN QUERY PLAN regression check for the queries the routers issue.
+
+Migrates a scratch SQLite database with alembic, seeds it, drives every
+endpoint through the app while recording the SQL it runs, then explains each
+distinct statement. Exits with status 1 when a filtered query scans a table
+or sorts through a temporary B-tree instead of using an index; unfiltered
+listings (admin tables, services, mechanics) are expected to scan.
+
+    python check_query_plans.py --users 2000
+"""
+
+import argparse
+import os
+import random
+import re
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+SCRATCH_DIR = tempfile.mkdtemp()
+DB_PATH = os.path.join(SCRATCH_DIR, "plans.db")
+
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+os.environ.pop("ALEMBIC_DATABASE_URL", None)
+os.environ.setdefault("SECRET_KEY", "query-plan-check")
+os.environ.setdefault("REDIS_URL", "fakeredis://")
+os.environ["DB_ECHO"] = "False"
+
+STATUSES = ["Заплановано", "В роботі", "Завершено", "Скасовано"]
+
+
+def migrate(revision: str):
+    from alembic import command
+    from alembic.config import Config
+
+    command.upgrade(Config(os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")), revision)
+
+
+def seed(users: int):
+    """Bulk rows owned by other accounts so that a scan is measurably wrong"""
+    rng = random.Random(42)
+    conn = sqlite3.connect(DB_PATH)
+    now = datetime(2026, 1, 1)
+    conn.executemany(
+        "INSERT INTO users (email, hashed_password, full_name, role, is_active, created_at, updated_at) "
+        "VALUES (?, 'x', ?, 'customer', 1, ?, ?)",
+        [(f"seed{i}@example.com", f"Seed {i}", now, now) for i in range(users)],
+    )
+    conn.executemany(
+        "INSERT INTO mechanics (email, hashed_password, full_name, is_active, created_at, updated_at) "
+        "VALUES (?, 'x', ?, 1, ?, ?)",
+        [(f"seed-mechanic{i}@example.com", f"Mechanic {i}", now, now) for i in range(max(5, users // 100))],
+    )
+    conn.executemany(
+        "INSERT INTO services (name, description, price, duration_minutes) VALUES (?, '', ?, ?)",
+        [(f"Service {i}", 100 + i, 30 + 15 * (i % 6)) for i in range(20)],
+    )
+    user_ids = [row[0] for row in conn.execute("SELECT id FROM users")]
+    mechanic_ids = [row[0] for row in conn.execute("SELECT id FROM mechanics")]
+    service_ids = [row[0] for row in conn.execute("SELECT id FROM services")]
+    conn.executemany(
+        "INSERT INTO cars (user_id, brand, model, year, vin, created_at, updated_at) VALUES (?, 'Skoda', 'Octavia', 2015, ?, ?, ?)",
+        [(rng.choice(user_ids), f"SEEDVIN{i:010d}", now, now) for i in range(users * 2)],
+    )
+    cars = conn.execute("SELECT id, user_id FROM cars").fetchall()
+    appointments = []
+    for _ in range(users * 10):
+        car_id, user_id = rng.choice(cars)
+        appointments.append((
+            user_id, car_id, rng.choice(service_ids), rng.choice(mechanic_ids),
+            now + timedelta(hours=rng.randrange(24 * 365)), rng.choice(STATUSES),
+        ))
+    conn.executemany(
+        "INSERT INTO appointments (user_id, car_id, service_id, mechanic_id, appointment_date, status) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        appointments,
+    )
+    conn.executemany(
+        "INSERT INTO documents (mechanic_id, type, file_path) VALUES (?, 'invoice', ?)",
+        [(rng.choice(mechanic_ids), f"documents/seed{i}.pdf") for i in range(users)],
+    )
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+
+
+def drive(client):
+    """Calls every endpoint that touches the database at least once"""
+
+    def call(method, path, expected=200, **kwargs):
+        response = client.request(method, path, **kwargs)
+        if response.status_code != expected:
+            raise SystemExit(f"{method} {path} -> {response.status_code}: {response.text}")
+        return response
+
+    def walk(path, headers=None, **filters):
+        """First page plus the page after it, so both keyset queries are explained"""
+        page = call("GET", path, headers=headers, params={"limit": 2, **filters}).json()
+        if page["nextCursor"]:
+            call("GET", path, headers=headers, params={"limit": 2, "cursor": page["nextCursor"], **filters})
+        return page["items"]
+
+    customer_id = call(
+        "POST", "/auth/register", json={"name": "Plan", "email": "plan@example.com", "password": "Passw0rd!"}
+    ).json()["id"]
+    tokens = call("POST", "/auth/login", json={"email": "plan@example.com", "password": "Passw0rd!"}).json()["tokens"]
+    customer = {"Authorization": f"Bearer {tokens['accessToken']}"}
+    call("POST", "/auth/refresh-token", params={"refresh_token": tokens["refreshToken"]})
+    call("POST", "/auth/change-password", params={"email": "plan@example.com", "new_password": "Passw0rd!2"})
+
+    admin_token = call(
+        "POST", "/auth/sign-in-swagger", data={"username": "admin@example.com", "password": "admin123"}
+    ).json()["access_token"]
+    admin = {"Authorization": f"Bearer {admin_token}"}
+    mechanic_token = call(
+        "POST", "/mechanics/login", json={"email": "mechanic@example.com", "password": "mechanic123"}
+    ).json()["access_token"]
+    mechanic = {"Authorization": f"Bearer {mechanic_token}"}
+
+    call("GET", "/users/me", headers=customer)
+    car = call("POST", "/cars/", headers=customer, json={
+        "brand": "Audi", "model": "A4", "year": 2018, "plateNumber": "AA0001AA", "vin": "PLANVIN0000000001",
+    }).json()
+    walk("/cars/", headers=customer)
+    call("PUT", f"/cars/{car['id']}", headers=customer, json={
+        "brand": "Audi", "model": "A6", "year": 2018, "plateNumber": "AA0001AA", "vin": "PLANVIN0000000001",
+    })
+
+    service_id = walk("/services/")[0]["id"]
+    for day in (2, 4, 5):
+        appointment = call("POST", "/appointments/", headers=customer, json={
+            "carId": car["id"], "serviceId": service_id, "appointmentDate": f"2026-03-0{day}T10:00:00",
+        }).json()
+    hold = call("POST", "/appointments/holds", headers=customer, json={
+        "serviceId": service_id, "mechanicId": 1, "start": "2027-03-01T10:00:00",
+    }).json()
+    call("POST", "/appointments/", headers=customer, json={
+        "carId": car["id"], "serviceId": service_id, "holdId": hold["id"], "appointmentDate": "2027-03-01T10:00:00",
+    })
+    walk("/appointments/", headers=customer)
+    call("GET", "/appointments/availability", headers=customer, params={
+        "service_id": service_id, "from": "2026-03-02T00:00:00", "to": "2026-03-09T00:00:00",
+    })
+    # Offset-aware bounds are converted to naive UTC rather than compared against naive bookings
+    call("GET", "/appointments/availability", headers=customer, params={
+        "service_id": service_id, "from": "2026-03-02T02:00:00+02:00", "to": "2026-03-09T00:00:00Z",
+    })
+    walk("/appointments/history", headers=customer)
+    # An offset-aware date is stored as naive UTC, the same as on create
+    updated = call("PUT", f"/appointments/{appointment['id']}", headers=customer, json={
+        "carId": car["id"], "serviceId": service_id, "appointmentDate": "2026-03-03T12:00:00+02:00",
+    }).json()
+    if updated["appointmentDate"] != "2026-03-03T10:00:00":
+        raise SystemExit(f"PUT /appointments/{{id}} stored {updated['appointmentDate']} instead of naive UTC")
+    call("PATCH", f"/appointments/{appointment['id']}/status", headers=customer, params={"status": "В роботі"})
+    call("PATCH", f"/appointments/{appointment['id']}/assign_mechanic", headers=admin, params={"mechanic_id": 1})
+    # Mixed naive and offset-aware bounds are both read as UTC
+    call("POST", "/appointments/auto_assign", headers=admin, params={
+        "from": "2026-03-01T00:00:00Z", "to": "2026-03-08T00:00:00",
+    })
+    walk("/appointments/my", headers=mechanic)
+    walk("/appointments/my", headers=mechanic, date_from="2026-03-03T00:00:00", date_to="2026-03-04T00:00:00")
+
+    walk("/admin/users", headers=admin)
+    walk("/admin/mechanics", headers=admin)
+    walk("/admin/documents", headers=admin)
+    walk("/admin/appointments", headers=admin)
+    window = walk("/admin/appointments", headers=admin, status=STATUSES[0], sort="date", date_from="2026-06-01T00:00:00")
+    # The same bound given with an offset must select the same rows
+    if walk("/admin/appointments", headers=admin, status=STATUSES[0], sort="date", date_from="2026-06-01T03:00:00+03:00") != window:
+        raise SystemExit("GET /admin/appointments: an offset-aware date_from selects a different window")
+    walk("/admin/appointments", headers=admin, mechanic_id=2, sort="-date")
+    walk("/admin/appointments", headers=admin, user_id=customer_id, sort="date")
+    call("PATCH", f"/admin/users/{customer_id}/change_role", headers=admin, json={
+        "name": "Plan", "email": "plan@example.com", "password": "Passw0rd!", "role": "customer",
+    })
+    walk("/mechanics/")
+
+    new_mechanic = call("POST", "/mechanics/", headers=admin, json={
+        "email": "plan-mechanic@example.com", "password": "Passw0rd!", "fullName": "Plan Mechanic",
+    }).json()
+    call("PUT", f"/mechanics/{new_mechanic['id']}", headers=admin, json={
+        "email": "plan-mechanic@example.com", "password": "Passw0rd!", "fullName": "Plan Mechanic 2",
+    })
+    document = call(
+        "POST", "/documents/", headers=mechanic,
+        data={"mechanic_id": new_mechanic["id"], "type": "invoice"},
+        files={"file": ("plan.txt", b"plan", "text/plain")},
+    ).json()
+    call("PUT", f"/documents/{document['id']}", headers=admin, data={"type": "receipt"})
+    call("DELETE", f"/documents/{document['id']}", headers=admin)
+    call("DELETE", f"/mechanics/{new_mechanic['id']}", headers=admin)
+
+    call("DELETE", f"/appointments/{appointment['id']}", headers=customer)
+    call("DELETE", f"/cars/{car['id']}", headers=customer)
+
+
+def explain(statements: dict) -> list[str]:
+    conn = sqlite3.connect(DB_PATH)
+    failures = []
+    for statement, parameters in statements.items():
+        plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+        filtered = re.search(r"\bWHERE\b", statement) is not None
+        bad = [
+            step for step in plan
+            if filtered and (step.startswith("SCAN ") or step.startswith("USE TEMP B-TREE"))
+        ]
+        marker = "FAIL" if bad else "ok  "
+        print(f"{marker} {' '.join(statement.split())[:110]}")
+        for step in plan:
+            print(f"       {step}")
+        if bad:
+            failures.append(statement)
+    conn.close()
+    return failures
+
+
+def main(args):
+    migrate(args.revision)
+    seed(args.users)
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+
+    from app.dependencies.database import engine, read_engine
+    from app.main import app
+
+    statements: dict[str, tuple] = {}
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            statements.setdefault(statement, tuple(parameters or ()))
+
+    os.chdir(SCRATCH_DIR)  # document uploads are written relative to the working directory
+    with TestClient(app) as client:
+        for sync_engine in {engine.sync_engine, read_engine.sync_engine}:
+            event.listen(sync_engine, "before_cursor_execute", record)
+        drive(client)
+
+    failures = explain(statements)
+    print(f"\n{len(statements)} distinct statements, {len(failures)} without a usable index")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--revision", default="head", help="alembic revision to check, e.g. one before an index change")
+    parser.add_argument("--users", type=int, default=2000, help="seeded customers (x2 cars, x10 appointments)")
+    main(parser.parse_args())